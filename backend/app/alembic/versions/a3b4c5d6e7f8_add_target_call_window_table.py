@@ -0,0 +1,38 @@
+"""add target call window table
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-03-10 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "a3b4c5d6e7f8"
+down_revision: str | None = "f2a3b4c5d6e7"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "target_call_window",
+        sa.Column("target_id", sa.Uuid(), nullable=False),
+        sa.Column("answered", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("voicemail", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("best_hours", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("built_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["target_id"], ["representativetarget.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("target_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("target_call_window")
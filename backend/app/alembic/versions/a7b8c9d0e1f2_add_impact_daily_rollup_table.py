@@ -0,0 +1,83 @@
+"""add impact daily rollup table
+
+Revision ID: a7b8c9d0e1f2
+Revises: f4a5b6c7d8e9
+Create Date: 2026-03-02 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import ENUM
+
+# revision identifiers, used by Alembic.
+revision: str = "a7b8c9d0e1f2"
+down_revision: str | None = "f4a5b6c7d8e9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+action_type_enum = ENUM(
+    "CALL",
+    "EMAIL",
+    "BOYCOTT",
+    "EVENT",
+    name="actiontype",
+    create_type=False,
+)
+action_log_status_enum = ENUM(
+    "COMPLETED",
+    "SKIPPED",
+    name="actionlogstatus",
+    create_type=False,
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "impact_daily_rollup",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("campaign_id", sa.Uuid(), nullable=False),
+        sa.Column("target_id", sa.Uuid(), nullable=True),
+        sa.Column("action_type", action_type_enum, nullable=False),
+        sa.Column("status", action_log_status_enum, nullable=False),
+        sa.Column("action_count", sa.Integer(), nullable=False),
+        sa.Column("last_action_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["campaign_id"], ["campaign.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_impact_daily_rollup_key",
+        "impact_daily_rollup",
+        ["day", "campaign_id", "target_id", "action_type", "status"],
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+    op.create_index(
+        op.f("ix_impact_daily_rollup_day"), "impact_daily_rollup", ["day"], unique=False
+    )
+    op.create_index(
+        op.f("ix_impact_daily_rollup_campaign_id"),
+        "impact_daily_rollup",
+        ["campaign_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_impact_daily_rollup_target_id"),
+        "impact_daily_rollup",
+        ["target_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_impact_daily_rollup_target_id"), table_name="impact_daily_rollup")
+    op.drop_index(
+        op.f("ix_impact_daily_rollup_campaign_id"), table_name="impact_daily_rollup"
+    )
+    op.drop_index(op.f("ix_impact_daily_rollup_day"), table_name="impact_daily_rollup")
+    op.drop_index("ix_impact_daily_rollup_key", table_name="impact_daily_rollup")
+    op.drop_table("impact_daily_rollup")
@@ -0,0 +1,38 @@
+"""add updated_at to user profiles
+
+Revision ID: a9b0c1d2e3f4
+Revises: f8a9b0c1d2e3
+Create Date: 2026-03-16 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a9b0c1d2e3f4"
+down_revision: str | None = "f8a9b0c1d2e3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Existing profiles start out as last updated when they were created.
+    op.add_column(
+        "userprofile",
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.execute("UPDATE userprofile SET updated_at = created_at")
+    op.create_index(
+        op.f("ix_userprofile_updated_at"),
+        "userprofile",
+        ["updated_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_userprofile_updated_at"), table_name="userprofile")
+    op.drop_column("userprofile", "updated_at")
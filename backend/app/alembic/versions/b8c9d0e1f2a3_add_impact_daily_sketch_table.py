@@ -0,0 +1,66 @@
+"""add impact daily sketch table
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-03-05 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b8c9d0e1f2a3"
+down_revision: str | None = "a7b8c9d0e1f2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "impact_daily_sketch",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("campaign_id", sa.Uuid(), nullable=True),
+        sa.Column("target_id", sa.Uuid(), nullable=True),
+        sa.Column("registers", sa.LargeBinary(), nullable=False),
+        sa.Column("members", postgresql.ARRAY(sa.Uuid()), nullable=False),
+        sa.Column("exact", sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(["campaign_id"], ["campaign.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_impact_daily_sketch_key",
+        "impact_daily_sketch",
+        ["day", "campaign_id", "target_id"],
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+    op.create_index(
+        op.f("ix_impact_daily_sketch_day"), "impact_daily_sketch", ["day"], unique=False
+    )
+    op.create_index(
+        op.f("ix_impact_daily_sketch_campaign_id"),
+        "impact_daily_sketch",
+        ["campaign_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_impact_daily_sketch_target_id"),
+        "impact_daily_sketch",
+        ["target_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_impact_daily_sketch_target_id"), table_name="impact_daily_sketch")
+    op.drop_index(
+        op.f("ix_impact_daily_sketch_campaign_id"), table_name="impact_daily_sketch"
+    )
+    op.drop_index(op.f("ix_impact_daily_sketch_day"), table_name="impact_daily_sketch")
+    op.drop_index("ix_impact_daily_sketch_key", table_name="impact_daily_sketch")
+    op.drop_table("impact_daily_sketch")
@@ -0,0 +1,94 @@
+"""add action log composite indexes
+
+Revision ID: c5d6e7f8a9b0
+Revises: b4c5d6e7f8a9
+Create Date: 2026-03-12 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5d6e7f8a9b0"
+down_revision: str | None = "b4c5d6e7f8a9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+# The composite indexes lead with the same columns as the single-column
+# indexes they replace. CREATE/DROP INDEX CONCURRENTLY cannot run inside a
+# transaction, and building without it would block action log writes.
+SUPERSEDED_INDEXES = (
+    ("ix_useractionlog_user_id", "user_id"),
+    ("ix_useractionlog_campaign_id", "campaign_id"),
+    ("ix_useractionlog_target_id", "target_id"),
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_useractionlog_user_created",
+            "useractionlog",
+            ["user_id", "created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_useractionlog_campaign_created",
+            "useractionlog",
+            ["campaign_id", "created_at"],
+            unique=False,
+            postgresql_include=["action_type", "status", "user_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_useractionlog_target_created",
+            "useractionlog",
+            ["target_id", "created_at"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, _ in SUPERSEDED_INDEXES:
+            op.drop_index(
+                name,
+                table_name="useractionlog",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, column in SUPERSEDED_INDEXES:
+            op.create_index(
+                name,
+                "useractionlog",
+                [column],
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        op.drop_index(
+            "ix_useractionlog_target_created",
+            table_name="useractionlog",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_useractionlog_campaign_created",
+            table_name="useractionlog",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_useractionlog_user_created",
+            table_name="useractionlog",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,79 @@
+"""add leaderboard entry table
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-03-06 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c9d0e1f2a3b4"
+down_revision: str | None = "b8c9d0e1f2a3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "leaderboard_entry",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("window_days", sa.Integer(), nullable=False),
+        sa.Column("campaign_id", sa.Uuid(), nullable=True),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("built_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["campaign_id"], ["campaign.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_leaderboard_entry_user",
+        "leaderboard_entry",
+        ["window_days", "campaign_id", "user_id"],
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+    op.create_index(
+        "ix_leaderboard_entry_rank",
+        "leaderboard_entry",
+        ["window_days", "campaign_id", "rank"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_leaderboard_entry_campaign_id"),
+        "leaderboard_entry",
+        ["campaign_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_leaderboard_entry_user_id"),
+        "leaderboard_entry",
+        ["user_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_userprivacysettings_leaderboard_opt_in",
+        "userprivacysettings",
+        ["user_id"],
+        unique=False,
+        postgresql_where=sa.text("show_on_leaderboard"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_userprivacysettings_leaderboard_opt_in", table_name="userprivacysettings"
+    )
+    op.drop_index(op.f("ix_leaderboard_entry_user_id"), table_name="leaderboard_entry")
+    op.drop_index(
+        op.f("ix_leaderboard_entry_campaign_id"), table_name="leaderboard_entry"
+    )
+    op.drop_index("ix_leaderboard_entry_rank", table_name="leaderboard_entry")
+    op.drop_index("ix_leaderboard_entry_user", table_name="leaderboard_entry")
+    op.drop_table("leaderboard_entry")
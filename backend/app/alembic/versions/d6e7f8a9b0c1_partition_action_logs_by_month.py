@@ -0,0 +1,206 @@
+"""partition action logs by month
+
+Revision ID: d6e7f8a9b0c1
+Revises: c5d6e7f8a9b0
+Create Date: 2026-03-13 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from alembic import op
+from sqlalchemy.dialects.postgresql import ENUM
+
+# revision identifiers, used by Alembic.
+revision: str = "d6e7f8a9b0c1"
+down_revision: str | None = "c5d6e7f8a9b0"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+# The populated table is not copied: it becomes the partition for everything
+# before next month. A validated CHECK constraint proves its rows fit that
+# range, so neither SET NOT NULL nor ATTACH PARTITION has to scan it while
+# holding locks, and the unique index backing its share of the new primary
+# key is built concurrently beforehand. Only catalog changes run under
+# exclusive locks.
+LEGACY_PARTITION = "useractionlog_legacy"
+LEGACY_RANGE_CHECK = "ck_useractionlog_legacy_range"
+LEGACY_PRIMARY_KEY_INDEX = "useractionlog_legacy_id_created_at_key"
+DEFAULT_PARTITION = "useractionlog_default"
+MONTHS_AHEAD = 3
+
+INDEXES = (
+    ("ix_useractionlog_template_id", ["template_id"], {}),
+    ("ix_useractionlog_user_created", ["user_id", "created_at", "id"], {}),
+    (
+        "ix_useractionlog_campaign_created",
+        ["campaign_id", "created_at"],
+        {"postgresql_include": ["action_type", "status", "user_id"]},
+    ),
+    ("ix_useractionlog_target_created", ["target_id", "created_at"], {}),
+)
+
+
+def _columns() -> list[sa.Column]:
+    return [
+        sa.Column(
+            "action_type",
+            ENUM(name="actiontype", create_type=False),
+            nullable=False,
+        ),
+        sa.Column(
+            "status",
+            ENUM(name="actionlogstatus", create_type=False),
+            nullable=False,
+        ),
+        sa.Column(
+            "outcome",
+            ENUM(name="actionoutcome", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("confidence_score", sa.Integer(), nullable=True),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("campaign_id", sa.Uuid(), nullable=False),
+        sa.Column("target_id", sa.Uuid(), nullable=True),
+        sa.Column("template_id", sa.Uuid(), nullable=True),
+        sa.Column(
+            "idempotency_key",
+            sqlmodel.sql.sqltypes.AutoString(length=255),
+            nullable=True,
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["campaign_id"], ["campaign.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["target_id"], ["representativetarget.id"], ondelete="SET NULL"
+        ),
+        sa.ForeignKeyConstraint(
+            ["template_id"], ["actiontemplate.id"], ondelete="SET NULL"
+        ),
+    ]
+
+
+def _create_indexes(table: str) -> None:
+    for name, columns, options in INDEXES:
+        op.create_index(name, table, columns, unique=False, **options)
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def upgrade() -> None:
+    now = datetime.now(timezone.utc)
+    first_month = _add_months(datetime(now.year, now.month, 1, tzinfo=timezone.utc), 1)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            LEGACY_PRIMARY_KEY_INDEX,
+            "useractionlog",
+            ["id", "created_at"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.execute(
+            "UPDATE useractionlog SET created_at = now() WHERE created_at IS NULL"
+        )
+        op.execute(
+            f"ALTER TABLE useractionlog ADD CONSTRAINT {LEGACY_RANGE_CHECK} "
+            f"CHECK (created_at IS NOT NULL "
+            f"AND created_at < '{first_month.isoformat()}') NOT VALID"
+        )
+        # Only blocks schema changes, not writes, while it scans.
+        op.execute(
+            f"ALTER TABLE useractionlog VALIDATE CONSTRAINT {LEGACY_RANGE_CHECK}"
+        )
+
+    op.alter_column("useractionlog", "created_at", nullable=False)
+    op.rename_table("useractionlog", LEGACY_PARTITION)
+    # ATTACH PARTITION only reuses an index that already backs a primary key,
+    # so the (id, created_at) index is promoted to one; with both columns NOT
+    # NULL this changes nothing but the catalog.
+    op.drop_constraint("useractionlog_pkey", LEGACY_PARTITION, type_="primary")
+    op.execute(
+        f"ALTER TABLE {LEGACY_PARTITION} ADD CONSTRAINT {LEGACY_PARTITION}_pkey "
+        f"PRIMARY KEY USING INDEX {LEGACY_PRIMARY_KEY_INDEX}"
+    )
+    for name, _, _ in INDEXES:
+        legacy_name = name.replace("ix_useractionlog", f"ix_{LEGACY_PARTITION}")
+        op.execute(f"ALTER INDEX {name} RENAME TO {legacy_name}")
+
+    op.create_table(
+        "useractionlog",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    _create_indexes("useractionlog")
+    op.execute(
+        f"ALTER TABLE useractionlog ATTACH PARTITION {LEGACY_PARTITION} "
+        f"FOR VALUES FROM (MINVALUE) TO ('{first_month.isoformat()}')"
+    )
+    for offset in range(MONTHS_AHEAD + 1):
+        start = _add_months(first_month, offset)
+        end = _add_months(first_month, offset + 1)
+        op.execute(
+            f"CREATE TABLE useractionlog_y{start.year}m{start.month:02d} "
+            f"PARTITION OF useractionlog "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    op.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF useractionlog DEFAULT")
+
+    op.create_table(
+        "action_log_idempotency_key",
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column(
+            "idempotency_key",
+            sqlmodel.sql.sqltypes.AutoString(length=255),
+            nullable=False,
+        ),
+        sa.Column("log_id", sa.Uuid(), nullable=False),
+        sa.Column("log_created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "idempotency_key"),
+    )
+    # Served by the legacy unique index, which is dropped only afterwards.
+    op.execute(
+        "INSERT INTO action_log_idempotency_key "
+        "(user_id, idempotency_key, log_id, log_created_at) "
+        "SELECT user_id, idempotency_key, id, created_at FROM useractionlog "
+        "WHERE idempotency_key IS NOT NULL"
+    )
+    op.drop_index("uq_useractionlog_idempotency_key", table_name=LEGACY_PARTITION)
+
+
+def downgrade() -> None:
+    # Copies every attached row back into a plain table under an exclusive
+    # lock; detached partitions are left alone.
+    op.rename_table("useractionlog", "useractionlog_partitioned")
+    op.execute(
+        "ALTER TABLE useractionlog_partitioned "
+        "RENAME CONSTRAINT useractionlog_pkey TO useractionlog_partitioned_pkey"
+    )
+    op.create_table(
+        "useractionlog",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO useractionlog SELECT * FROM useractionlog_partitioned")
+    op.drop_table("action_log_idempotency_key")
+    op.execute("DROP TABLE useractionlog_partitioned")
+    _create_indexes("useractionlog")
+    op.create_index(
+        "uq_useractionlog_idempotency_key",
+        "useractionlog",
+        ["user_id", "idempotency_key"],
+        unique=True,
+        postgresql_where=sa.text("idempotency_key IS NOT NULL"),
+    )
+    op.alter_column("useractionlog", "created_at", nullable=True)
@@ -0,0 +1,29 @@
+"""drop platform daily sketches
+
+Revision ID: e7f8a9b0c1d2
+Revises: d6e7f8a9b0c1
+Create Date: 2026-03-14 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7f8a9b0c1d2"
+down_revision: str | None = "d6e7f8a9b0c1"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+# Platform counts now merge the campaign sketches, so the platform-wide rows
+# are no longer written or read.
+def upgrade() -> None:
+    op.execute("DELETE FROM impact_daily_sketch WHERE campaign_id IS NULL")
+
+
+def downgrade() -> None:
+    # The platform rows cannot be rebuilt in SQL; run `backfill-sketches`
+    # after downgrading.
+    pass
@@ -0,0 +1,37 @@
+"""add geography indexes
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-03-09 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f2a3b4c5d6e7"
+down_revision: str | None = "e1f2a3b4c5d6"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_representativetarget_geo",
+        "representativetarget",
+        ["state_code", "district_code"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_userprofile_geo",
+        "userprofile",
+        ["state_code", "district_code"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_userprofile_geo", table_name="userprofile")
+    op.drop_index("ix_representativetarget_geo", table_name="representativetarget")
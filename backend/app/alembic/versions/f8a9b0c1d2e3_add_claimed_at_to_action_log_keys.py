@@ -0,0 +1,47 @@
+"""add claimed_at to action log idempotency keys
+
+Revision ID: f8a9b0c1d2e3
+Revises: e7f8a9b0c1d2
+Create Date: 2026-03-15 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f8a9b0c1d2e3"
+down_revision: str | None = "e7f8a9b0c1d2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Keys already claimed get a full TTL from now rather than from their
+    # log's possibly backdated created_at.
+    op.add_column(
+        "action_log_idempotency_key",
+        sa.Column(
+            "claimed_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.alter_column("action_log_idempotency_key", "claimed_at", server_default=None)
+    op.create_index(
+        op.f("ix_action_log_idempotency_key_claimed_at"),
+        "action_log_idempotency_key",
+        ["claimed_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_action_log_idempotency_key_claimed_at"),
+        table_name="action_log_idempotency_key",
+    )
+    op.drop_column("action_log_idempotency_key", "claimed_at")
@@ -0,0 +1,200 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import ColumnElement, Select, and_, select
+from sqlmodel import Session, SQLModel, col, func
+
+from app.models import (
+    ActionLogStatus,
+    ActionOutcome,
+    ActionType,
+    OutcomeBreakdownPublic,
+    SeriesBucket,
+    UserActionLog,
+)
+
+
+class ActionAggregate(SQLModel):
+    total_actions: int = 0
+    completed_actions: int = 0
+    skipped_actions: int = 0
+    calls: int = 0
+    emails: int = 0
+    boycotts: int = 0
+    events: int = 0
+    unique_participants: int = 0
+    last_action_at: datetime | None = None
+
+
+def utc_day(value: datetime) -> date:
+    return value.astimezone(timezone.utc).date()
+
+
+def day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def first_whole_day(start: datetime) -> date:
+    """
+    First UTC day that lies entirely inside a window beginning at `start`.
+    """
+    day = utc_day(start)
+    if start != day_start(day):
+        day += timedelta(days=1)
+    return day
+
+
+def bucket_floor(value: datetime, bucket: SeriesBucket) -> datetime:
+    """
+    Start of the UTC bucket containing `value`, matching Postgres `date_trunc`
+    (weeks start on Monday).
+    """
+    value = value.astimezone(timezone.utc)
+    if bucket == SeriesBucket.HOUR:
+        return value.replace(minute=0, second=0, microsecond=0)
+    floor = day_start(value.date())
+    if bucket == SeriesBucket.WEEK:
+        floor -= timedelta(days=floor.weekday())
+    return floor
+
+
+def _action_counters() -> dict[str, ColumnElement[bool] | None]:
+    return {
+        "total_actions": None,
+        "completed_actions": col(UserActionLog.status) == ActionLogStatus.COMPLETED,
+        "skipped_actions": col(UserActionLog.status) == ActionLogStatus.SKIPPED,
+        "calls": col(UserActionLog.action_type) == ActionType.CALL,
+        "emails": col(UserActionLog.action_type) == ActionType.EMAIL,
+        "boycotts": col(UserActionLog.action_type) == ActionType.BOYCOTT,
+        "events": col(UserActionLog.action_type) == ActionType.EVENT,
+    }
+
+
+def counter_conditions(
+    *conditions: ColumnElement[bool] | None,
+) -> ColumnElement[bool] | None:
+    present = [condition for condition in conditions if condition is not None]
+    return and_(*present) if present else None
+
+
+def action_counter_columns(
+    within: ColumnElement[bool] | None = None, suffix: str = ""
+) -> list[Any]:
+    """
+    Every impact counter over the log rows, optionally restricted to the rows
+    matching `within` and labelled with `suffix`, so several periods can be
+    counted side by side in one statement.
+    """
+    columns = []
+    for name, condition in _action_counters().items():
+        counter: Any = func.count()
+        combined = counter_conditions(within, condition)
+        if combined is not None:
+            counter = counter.filter(combined)
+        columns.append(counter.label(name + suffix))
+    return columns
+
+
+def action_aggregate_statement(*filters: ColumnElement[bool]) -> Select[Any]:
+    """
+    Build a single-row statement computing every impact counter with FILTER
+    clauses, so callers never need to load the matching rows.
+    """
+    return select(
+        *action_counter_columns(),
+        func.count(func.distinct(UserActionLog.user_id)).label("unique_participants"),
+        func.max(UserActionLog.created_at).label("last_action_at"),
+    ).where(*filters)
+
+
+def aggregate_action_logs(
+    session: Session, *filters: ColumnElement[bool]
+) -> ActionAggregate:
+    row = session.execute(action_aggregate_statement(*filters)).one()
+    return ActionAggregate.model_validate(dict(row._mapping))
+
+
+def merge_aggregates(
+    first: ActionAggregate, second: ActionAggregate
+) -> ActionAggregate:
+    """
+    Combine the additive counters of two disjoint aggregates.
+
+    Unique participants cannot be summed across overlapping user sets, so the
+    result carries the larger of the two and callers recompute it when exact
+    values matter.
+    """
+    last_times = [t for t in (first.last_action_at, second.last_action_at) if t]
+    return ActionAggregate(
+        total_actions=first.total_actions + second.total_actions,
+        completed_actions=first.completed_actions + second.completed_actions,
+        skipped_actions=first.skipped_actions + second.skipped_actions,
+        calls=first.calls + second.calls,
+        emails=first.emails + second.emails,
+        boycotts=first.boycotts + second.boycotts,
+        events=first.events + second.events,
+        unique_participants=max(first.unique_participants, second.unique_participants),
+        last_action_at=max(last_times, default=None),
+    )
+
+
+def outcome_breakdown(
+    session: Session, *filters: ColumnElement[bool]
+) -> list[OutcomeBreakdownPublic]:
+    """
+    Outcome and confidence-score histograms of completed actions per action
+    type, from one GROUP BY over the matching logs.
+    """
+    rows = session.execute(
+        select(
+            col(UserActionLog.action_type),
+            col(UserActionLog.outcome),
+            col(UserActionLog.confidence_score),
+            func.count().label("count"),
+        )
+        .where(col(UserActionLog.status) == ActionLogStatus.COMPLETED, *filters)
+        .group_by(
+            col(UserActionLog.action_type),
+            col(UserActionLog.outcome),
+            col(UserActionLog.confidence_score),
+        )
+    ).all()
+
+    breakdowns: dict[ActionType, OutcomeBreakdownPublic] = {}
+    for action_type, outcome, confidence_score, count in rows:
+        breakdown = breakdowns.setdefault(
+            action_type,
+            OutcomeBreakdownPublic(
+                action_type=action_type,
+                total_actions=0,
+                outcomes=dict.fromkeys(ActionOutcome, 0),
+                confidence_scores=dict.fromkeys(range(1, 6), 0),
+                unscored=0,
+            ),
+        )
+        breakdown.total_actions += count
+        breakdown.outcomes[outcome] += count
+        if confidence_score is None:
+            breakdown.unscored += count
+        else:
+            breakdown.confidence_scores[confidence_score] += count
+
+    for breakdown in breakdowns.values():
+        answered = breakdown.outcomes[ActionOutcome.ANSWERED]
+        reached = answered + breakdown.outcomes[ActionOutcome.VOICEMAIL]
+        if reached:
+            breakdown.answer_rate = answered / reached
+        scored = breakdown.total_actions - breakdown.unscored
+        if scored:
+            breakdown.average_confidence = (
+                sum(
+                    score * count
+                    for score, count in breakdown.confidence_scores.items()
+                )
+                / scored
+            )
+    return [
+        breakdowns[action_type]
+        for action_type in ActionType
+        if action_type in breakdowns
+    ]
@@ -1,8 +1,9 @@
-from collections.abc import Generator
+import hashlib
+from collections.abc import Callable, Generator, Hashable
 from typing import Annotated
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
@@ -11,6 +12,8 @@ from sqlmodel import Session
 from app.core import security
 from app.core.config import settings
 from app.core.db import engine
+from app.core.pagination import Cursor, decode_cursor
+from app.core.timewindows import TimeWindow, WindowAlign, time_window
 from app.models import TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -48,6 +51,11 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
+# Client-chosen key that makes a retried create return the first result.
+IdempotencyKey = Annotated[
+    str | None, Header(alias="Idempotency-Key", min_length=1, max_length=255)
+]
+
 
 def get_current_active_superuser(current_user: CurrentUser) -> User:
     if not current_user.is_superuser:
@@ -55,3 +63,71 @@ def get_current_active_superuser(current_user: CurrentUser) -> User:
             status_code=403, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def conditional_get(
+    version: Callable[..., Hashable],
+) -> Callable[..., None]:
+    """
+    Build a route dependency that answers conditional GETs.
+
+    `version` is itself a dependency returning a cheap token that changes
+    whenever the resource does, e.g. a row count and latest `created_at`.
+    An endpoint serving a cached value should have `version` depend on the
+    same dependency it uses for that value: FastAPI resolves it once per
+    request, and the ETag then describes exactly the body that is sent.
+    The ETag hashes it with the request URL; a matching `If-None-Match`
+    gets a 304 before the endpoint runs its query or serializes anything.
+    The caller is authenticated first, so a 304 never leaks past auth.
+    """
+
+    def validate(
+        request: Request,
+        response: Response,
+        _current_user: CurrentUser,
+        token: Annotated[Hashable, Depends(version)],
+    ) -> None:
+        resource = f"{request.url.path}?{request.url.query}|{token!r}"
+        digest = hashlib.sha256(resource.encode()).hexdigest()
+        etag = f'"{digest[:32]}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return validate
+
+
+def resolve_window(
+    window: str,
+    *,
+    align: WindowAlign = WindowAlign.DAY,
+    timezone_name: str | None = None,
+) -> TimeWindow:
+    """
+    Parse a `window` query parameter into an aligned time window, answering
+    malformed values with 400.
+    """
+    try:
+        return time_window(window, align=align, timezone_name=timezone_name)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def resolve_cursor(cursor: str | None) -> Cursor | None:
+    """
+    Decode a `cursor` query parameter, answering malformed values with 400.
+    """
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
@@ -3,6 +3,7 @@ from fastapi import APIRouter
 from app.api.routes import (
     actions,
     campaigns,
+    exports,
     impact,
     items,
     login,
@@ -24,6 +25,7 @@ api_router.include_router(impact.router)
 api_router.include_router(onboarding.router)
 api_router.include_router(actions.router)
 api_router.include_router(referrals.router)
+api_router.include_router(exports.router)
 
 
 if settings.ENVIRONMENT == "local":
@@ -1,90 +1,141 @@
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from fastapi import APIRouter, HTTPException, Query
-from sqlmodel import col, func, select
+from fastapi import APIRouter, HTTPException, Query, Response
+from sqlmodel import Session, col, func, select
 
-from app.api.deps import CurrentUser, SessionDep
+from app import badges, crud, streaks, today
+from app.analytics import aggregate_action_logs
+from app.api.deps import (
+    CurrentUser,
+    IdempotencyKey,
+    SessionDep,
+    resolve_cursor,
+    resolve_window,
+)
+from app.core.cache import SingleFlightCache
+from app.core.config import settings
+from app.core.db import engine
+from app.core.pagination import keyset_page
+from app.ingest import ActionLogWriter, IngestQueueFull
 from app.models import (
     ActionStatsPublic,
     ActionTemplate,
-    ActionType,
+    BadgePublic,
+    BadgesPublic,
     Campaign,
-    DailyActionPlan,
+    IngestAck,
     RepresentativeTarget,
+    StreakPublic,
+    StreaksPublic,
     TodayActionPublic,
     TodayActionsPublic,
     UserActionLog,
+    UserActionLogBatchCreate,
+    UserActionLogBatchItem,
+    UserActionLogBatchPublic,
+    UserActionLogBatchResult,
     UserActionLogCreate,
     UserActionLogPublic,
     UserActionLogsPublic,
+    UserBadge,
+    UserProfile,
 )
 
 router = APIRouter(prefix="/actions", tags=["actions"])
 
+# Only started when settings.ACTION_LOG_WRITE_BEHIND is on; see app.main.
+action_log_writer = ActionLogWriter(
+    session_factory=lambda: Session(engine),
+    max_queue_rows=settings.ACTION_LOG_QUEUE_MAX_ROWS,
+    flush_rows=settings.ACTION_LOG_FLUSH_ROWS,
+    flush_interval_seconds=settings.ACTION_LOG_FLUSH_INTERVAL_MS / 1000,
+)
+DURABLE_ACK_TIMEOUT_SECONDS = 5
+
+# Client timestamps in a batch may lag by a queued week and lead by a few
+# minutes of clock drift; later ones are clamped to the server clock.
+MAX_BATCH_BACKDATE = timedelta(days=7)
+MAX_BATCH_CLOCK_SKEW = timedelta(minutes=5)
 
-def _window_start(window: str) -> tuple[int, datetime]:
-    value = window.strip().lower()
-    if not value.endswith("d") or not value[:-1].isdigit():
-        raise HTTPException(status_code=400, detail="Window must be like 7d or 30d")
-    days = int(value[:-1])
-    if days <= 0 or days > 365:
-        raise HTTPException(status_code=400, detail="Window days must be between 1 and 365")
-    start = datetime.now(timezone.utc) - timedelta(days=days)
-    return days, start
+today_cache: SingleFlightCache[list[TodayActionPublic]] = SingleFlightCache(
+    ttl_seconds=settings.TODAY_CACHE_TTL_SECONDS,
+    max_entries=settings.TODAY_CACHE_MAX_ENTRIES,
+)
 
 
 @router.get("/today", response_model=TodayActionsPublic)
 def read_actions_today(session: SessionDep, current_user: CurrentUser) -> Any:
-    weekday = datetime.now(timezone.utc).weekday()
-    plans = session.exec(
-        select(DailyActionPlan).where(
-            DailyActionPlan.user_id == current_user.id,
-            DailyActionPlan.is_active.is_(True),
-        )
-    ).all()
+    """
+    The newest templates of every campaign the user plans to act on today, up
+    to each plan's `target_actions_per_day`, with the best time to call.
 
-    actions: list[TodayActionPublic] = []
-    for plan in plans:
-        if len(plan.active_weekdays_mask) != 7 or plan.active_weekdays_mask[weekday] != "1":
-            continue
-        campaign = session.get(Campaign, plan.campaign_id)
-        if not campaign:
-            continue
-        templates = session.exec(
-            select(ActionTemplate)
-            .where(ActionTemplate.campaign_id == plan.campaign_id)
-            .order_by(col(ActionTemplate.created_at).desc())
-            .limit(plan.target_actions_per_day)
-        ).all()
-        for template in templates:
-            actions.append(
-                TodayActionPublic(
-                    campaign_id=campaign.id,
-                    campaign_title=campaign.title,
-                    template_id=template.id,
-                    target_id=template.target_id,
-                    action_type=template.action_type,
-                    title=template.title,
-                    estimated_minutes=template.estimated_minutes,
-                )
-            )
+    "Today" is the user's local day, so evening users west of UTC are not
+    shown tomorrow's plan.
+    """
+    profile = session.get(UserProfile, current_user.id)
+    timezone_name = profile.timezone if profile else None
+    local_date = streaks.local_day(datetime.now(timezone.utc), timezone_name)
+
+    def compute() -> list[TodayActionPublic]:
+        actions = today.planned_actions(
+            session, current_user.id, weekday=local_date.weekday()
+        )
+        today.attach_call_windows(session, actions, timezone_name=timezone_name)
+        return actions
 
+    key = (
+        current_user.id,
+        local_date,
+        timezone_name,
+        today.version(session, current_user.id),
+    )
+    actions = today_cache.get_or_compute(key, compute)
     return TodayActionsPublic(data=actions, count=len(actions))
 
 
-@router.post("/log", response_model=UserActionLogPublic)
+@router.post(
+    "/log",
+    response_model=UserActionLogPublic,
+    responses={202: {"description": "Queued, not yet written"}},
+)
 def create_action_log(
-    *, session: SessionDep, current_user: CurrentUser, body: UserActionLogCreate
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    body: UserActionLogCreate,
+    response: Response,
+    idempotency_key: IdempotencyKey = None,
+    ack: IngestAck = IngestAck.ACCEPTED,
 ) -> Any:
+    """
+    Log one action.
+
+    A retry carrying the same `Idempotency-Key` header (or `idempotency_key`
+    field) as an earlier request returns the earlier log instead of logging
+    the action twice, with an `Idempotent-Replayed: true` header.
+
+    With write-behind ingestion enabled the log is queued and written in a
+    batch: `ack=accepted` answers 202 as soon as it is queued, `ack=durable`
+    waits for the write and answers 200 (or 202 if that takes too long).
+    Otherwise the log is written before answering 200.
+    """
+    if idempotency_key is not None:
+        body = body.model_copy(update={"idempotency_key": idempotency_key})
+
     campaign = session.get(Campaign, body.campaign_id)
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
 
     if body.target_id is not None:
         target = session.get(RepresentativeTarget, body.target_id)
-        if target and target.campaign_id != body.campaign_id:
-            raise HTTPException(status_code=400, detail="Target does not belong to campaign")
+        if target is None:
+            raise HTTPException(status_code=404, detail="Target not found")
+        if target.campaign_id != body.campaign_id:
+            raise HTTPException(
+                status_code=400, detail="Target does not belong to campaign"
+            )
 
     if body.template_id is not None:
         template = session.get(ActionTemplate, body.template_id)
@@ -95,11 +146,145 @@ def create_action_log(
                 status_code=400, detail="Action template does not belong to campaign"
             )
 
-    action_log = UserActionLog.model_validate(body, update={"user_id": current_user.id})
-    session.add(action_log)
-    session.commit()
-    session.refresh(action_log)
-    return action_log
+    log = UserActionLog.model_validate(body, update={"user_id": current_user.id})
+    # Keyed logs skip the queue so that a retry can find the first one.
+    if log.idempotency_key is not None:
+        [(stored, inserted)] = crud.create_action_logs(
+            session=session, action_logs=[log]
+        )
+        if not inserted:
+            response.headers["Idempotent-Replayed"] = "true"
+        return stored
+    if not action_log_writer.running:
+        return crud.create_action_log(
+            session=session, action_log_in=body, user_id=current_user.id
+        )
+
+    try:
+        receipt = action_log_writer.submit(
+            log, timeout=settings.ACTION_LOG_ENQUEUE_TIMEOUT_MS / 1000
+        )
+    except IngestQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many actions are being logged, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    if ack == IngestAck.DURABLE:
+        try:
+            if receipt.wait(DURABLE_ACK_TIMEOUT_SECONDS):
+                return log
+        except Exception:
+            raise HTTPException(status_code=500, detail="Action log was not saved")
+    response.status_code = 202
+    return log
+
+
+def _batch_item_error(
+    item: UserActionLogBatchItem,
+    created_at: datetime,
+    *,
+    campaign_ids: set[uuid.UUID],
+    target_campaigns: dict[uuid.UUID, uuid.UUID],
+    template_campaigns: dict[uuid.UUID, uuid.UUID],
+    now: datetime,
+) -> str | None:
+    if item.campaign_id not in campaign_ids:
+        return "Campaign not found"
+    if item.target_id is not None:
+        if item.target_id not in target_campaigns:
+            return "Target not found"
+        if target_campaigns[item.target_id] != item.campaign_id:
+            return "Target does not belong to campaign"
+    if item.template_id is not None:
+        if item.template_id not in template_campaigns:
+            return "Action template not found"
+        if template_campaigns[item.template_id] != item.campaign_id:
+            return "Action template does not belong to campaign"
+    if created_at > now + MAX_BATCH_CLOCK_SKEW:
+        return "created_at is in the future"
+    if created_at < now - MAX_BATCH_BACKDATE:
+        return "created_at is too far in the past"
+    return None
+
+
+@router.post("/log:batch", response_model=UserActionLogBatchPublic)
+def create_action_logs_batch(
+    *, session: SessionDep, current_user: CurrentUser, body: UserActionLogBatchCreate
+) -> Any:
+    """
+    Log many actions at once, e.g. those queued by an offline client.
+
+    Every item is validated on its own. Valid items are inserted together in
+    one transaction; the others are returned with the reason they were
+    rejected. Items whose `idempotency_key` was already used return the
+    original log and count as replayed.
+    """
+    items = body.data
+    campaign_ids = set(
+        session.exec(
+            select(Campaign.id).where(
+                col(Campaign.id).in_({item.campaign_id for item in items})
+            )
+        ).all()
+    )
+    target_campaigns: dict[uuid.UUID, uuid.UUID] = {}
+    target_ids = {item.target_id for item in items if item.target_id is not None}
+    if target_ids:
+        target_campaigns = dict(
+            session.exec(
+                select(RepresentativeTarget.id, RepresentativeTarget.campaign_id).where(
+                    col(RepresentativeTarget.id).in_(target_ids)
+                )
+            ).all()
+        )
+    template_campaigns: dict[uuid.UUID, uuid.UUID] = {}
+    template_ids = {item.template_id for item in items if item.template_id is not None}
+    if template_ids:
+        template_campaigns = dict(
+            session.exec(
+                select(ActionTemplate.id, ActionTemplate.campaign_id).where(
+                    col(ActionTemplate.id).in_(template_ids)
+                )
+            ).all()
+        )
+
+    now = datetime.now(timezone.utc)
+    results: dict[int, UserActionLogBatchResult] = {}
+    logs: dict[int, UserActionLog] = {}
+    for index, item in enumerate(items):
+        # Naive client timestamps are taken to be UTC.
+        created_at = item.created_at or now
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        error = _batch_item_error(
+            item,
+            created_at,
+            campaign_ids=campaign_ids,
+            target_campaigns=target_campaigns,
+            template_campaigns=template_campaigns,
+            now=now,
+        )
+        if error:
+            results[index] = UserActionLogBatchResult(index=index, error=error)
+            continue
+        logs[index] = UserActionLog.model_validate(
+            item,
+            update={"user_id": current_user.id, "created_at": min(created_at, now)},
+        )
+
+    stored = crud.create_action_logs(session=session, action_logs=list(logs.values()))
+    for index, (log, _) in zip(logs, stored, strict=True):
+        results[index] = UserActionLogBatchResult(
+            index=index, log=UserActionLogPublic.model_validate(log)
+        )
+    created = sum(inserted for _, inserted in stored)
+    return UserActionLogBatchPublic(
+        data=[results[index] for index in range(len(items))],
+        created=created,
+        replayed=len(stored) - created,
+        rejected=len(items) - len(stored),
+    )
 
 
 @router.get("/me", response_model=UserActionLogsPublic)
@@ -108,22 +293,28 @@ def read_my_actions(
     current_user: CurrentUser,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool = False,
 ) -> Any:
+    """
+    The user's action logs, newest first. Pass `next_cursor` back as `cursor`
+    for the next page; the total is only counted with `include_count`.
+    """
     count_statement = (
         select(func.count())
         .select_from(UserActionLog)
         .where(UserActionLog.user_id == current_user.id)
     )
-    count = session.exec(count_statement).one()
-    statement = (
-        select(UserActionLog)
-        .where(UserActionLog.user_id == current_user.id)
-        .order_by(col(UserActionLog.created_at).desc())
-        .offset(skip)
-        .limit(limit)
+    count = session.exec(count_statement).one() if include_count else None
+    logs, next_cursor = keyset_page(
+        session,
+        select(UserActionLog).where(UserActionLog.user_id == current_user.id),
+        UserActionLog,
+        limit=limit,
+        skip=skip,
+        after=resolve_cursor(cursor),
     )
-    logs = session.exec(statement).all()
-    return UserActionLogsPublic(data=logs, count=count)
+    return UserActionLogsPublic(data=logs, count=count, next_cursor=next_cursor)
 
 
 @router.get("/me/stats", response_model=ActionStatsPublic)
@@ -132,30 +323,58 @@ def read_my_action_stats(
     current_user: CurrentUser,
     window: str = Query(default="7d"),
 ) -> Any:
-    window_days, window_start = _window_start(window)
-    logs = session.exec(
-        select(UserActionLog).where(
-            UserActionLog.user_id == current_user.id,
-            UserActionLog.created_at >= window_start,
-        )
-    ).all()
-
-    completed_actions = sum(1 for item in logs if item.status.value == "completed")
-    skipped_actions = sum(1 for item in logs if item.status.value == "skipped")
-    calls = sum(1 for item in logs if item.action_type == ActionType.CALL)
-    emails = sum(1 for item in logs if item.action_type == ActionType.EMAIL)
-    boycotts = sum(1 for item in logs if item.action_type == ActionType.BOYCOTT)
-    events = sum(1 for item in logs if item.action_type == ActionType.EVENT)
-    last_action_at = max((item.created_at for item in logs if item.created_at), default=None)
-
+    profile = session.get(UserProfile, current_user.id)
+    window_days, window_start = resolve_window(
+        window, timezone_name=profile.timezone if profile else None
+    )
+    aggregate = aggregate_action_logs(
+        session,
+        col(UserActionLog.user_id) == current_user.id,
+        col(UserActionLog.created_at) >= window_start,
+    )
     return ActionStatsPublic(
         window_days=window_days,
-        total_actions=len(logs),
-        completed_actions=completed_actions,
-        skipped_actions=skipped_actions,
-        calls=calls,
-        emails=emails,
-        boycotts=boycotts,
-        events=events,
-        last_action_at=last_action_at,
+        total_actions=aggregate.total_actions,
+        completed_actions=aggregate.completed_actions,
+        skipped_actions=aggregate.skipped_actions,
+        calls=aggregate.calls,
+        emails=aggregate.emails,
+        boycotts=aggregate.boycotts,
+        events=aggregate.events,
+        last_action_at=aggregate.last_action_at,
     )
+
+
+@router.get("/me/streaks", response_model=StreaksPublic)
+def read_my_streaks(session: SessionDep, current_user: CurrentUser) -> Any:
+    """
+    Current and longest streaks overall and per campaign, in the user's local
+    days. Off-days in the user's plans do not break a streak.
+    """
+    user_streaks = streaks.read_streaks(session, current_user.id)
+    overall = next(
+        (streak for streak in user_streaks if streak.campaign_id is None),
+        StreakPublic(current_streak=0, longest_streak=0),
+    )
+    campaigns = [streak for streak in user_streaks if streak.campaign_id is not None]
+    return StreaksPublic(overall=overall, campaigns=campaigns)
+
+
+@router.get("/me/badges", response_model=BadgesPublic)
+def read_my_badges(session: SessionDep, current_user: CurrentUser) -> Any:
+    rows = session.exec(
+        select(UserBadge)
+        .where(UserBadge.user_id == current_user.id)
+        .order_by(col(UserBadge.awarded_at))
+    ).all()
+    data = [
+        BadgePublic(
+            code=row.code,
+            title=badges.RULES_BY_CODE[row.code].title,
+            description=badges.RULES_BY_CODE[row.code].description,
+            awarded_at=row.awarded_at,
+        )
+        for row in rows
+        if row.code in badges.RULES_BY_CODE
+    ]
+    return BadgesPublic(data=data, count=len(data))
@@ -1,48 +1,85 @@
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import col, func, select
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import func, select
 
-from app.api.deps import CurrentUser, SessionDep
+from app import call_windows
+from app.api.deps import CurrentUser, SessionDep, conditional_get, resolve_cursor
+from app.core.pagination import keyset_page
 from app.models import (
     ActionTemplate,
     ActionTemplatesPublic,
+    CallWindowsPublic,
     Campaign,
     CampaignPublic,
     CampaignsPublic,
     CampaignStatus,
     RepresentativeTarget,
     RepresentativeTargetsPublic,
+    TargetCallWindow,
+    UserProfile,
 )
 
 router = APIRouter(prefix="/campaigns", tags=["campaigns"])
 
 
-@router.get("/", response_model=CampaignsPublic)
+# Campaigns and templates are only inserted or deleted, never edited through
+# the API, so a row count plus the latest `created_at` identifies a version.
+def _campaigns_version(
+    session: SessionDep, status: CampaignStatus | None = None
+) -> tuple[Any, ...]:
+    statement = select(func.count(), func.max(Campaign.created_at))
+    if status is not None:
+        statement = statement.where(Campaign.status == status)
+    return tuple(session.exec(statement).one())
+
+
+def _templates_version(session: SessionDep, campaign_id: uuid.UUID) -> tuple[Any, ...]:
+    statement = select(func.count(), func.max(ActionTemplate.created_at)).where(
+        ActionTemplate.campaign_id == campaign_id
+    )
+    return tuple(session.exec(statement).one())
+
+
+@router.get(
+    "/",
+    response_model=CampaignsPublic,
+    dependencies=[Depends(conditional_get(_campaigns_version))],
+)
 def read_campaigns(
     session: SessionDep,
     _current_user: CurrentUser,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool = True,
     status: CampaignStatus | None = None,
 ) -> Any:
     """
-    Retrieve campaigns.
+    Retrieve campaigns, newest first. Pass `next_cursor` back as `cursor` for
+    the next page.
     """
     filters = []
     if status is not None:
         filters.append(Campaign.status == status)
 
     count_statement = select(func.count()).select_from(Campaign)
-    statement = select(Campaign).order_by(col(Campaign.created_at).desc())
+    statement = select(Campaign)
     if filters:
         count_statement = count_statement.where(*filters)
         statement = statement.where(*filters)
 
-    count = session.exec(count_statement).one()
-    campaigns = session.exec(statement.offset(skip).limit(limit)).all()
-    return CampaignsPublic(data=campaigns, count=count)
+    count = session.exec(count_statement).one() if include_count else None
+    campaigns, next_cursor = keyset_page(
+        session,
+        statement,
+        Campaign,
+        limit=limit,
+        skip=skip,
+        after=resolve_cursor(cursor),
+    )
+    return CampaignsPublic(data=campaigns, count=count, next_cursor=next_cursor)
 
 
 @router.get("/{campaign_id}", response_model=CampaignPublic)
@@ -67,9 +104,11 @@ def read_campaign_targets(
     campaign_id: uuid.UUID,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool = True,
 ) -> Any:
     """
-    Retrieve representative targets for a campaign.
+    Retrieve representative targets for a campaign, newest first.
     """
     campaign = session.get(Campaign, campaign_id)
     if not campaign:
@@ -80,28 +119,69 @@ def read_campaign_targets(
         .select_from(RepresentativeTarget)
         .where(RepresentativeTarget.campaign_id == campaign_id)
     )
-    count = session.exec(count_statement).one()
-    statement = (
-        select(RepresentativeTarget)
-        .where(RepresentativeTarget.campaign_id == campaign_id)
-        .order_by(col(RepresentativeTarget.created_at).desc())
-        .offset(skip)
-        .limit(limit)
+    count = session.exec(count_statement).one() if include_count else None
+    targets, next_cursor = keyset_page(
+        session,
+        select(RepresentativeTarget).where(
+            RepresentativeTarget.campaign_id == campaign_id
+        ),
+        RepresentativeTarget,
+        limit=limit,
+        skip=skip,
+        after=resolve_cursor(cursor),
+    )
+    return RepresentativeTargetsPublic(
+        data=targets, count=count, next_cursor=next_cursor
+    )
+
+
+@router.get(
+    "/{campaign_id}/targets/{target_id}/call-windows",
+    response_model=CallWindowsPublic,
+)
+def read_target_call_windows(
+    session: SessionDep,
+    current_user: CurrentUser,
+    campaign_id: uuid.UUID,
+    target_id: uuid.UUID,
+) -> Any:
+    """
+    Best hours of the week to call a target, in the caller's timezone, from
+    the periodically rebuilt answer-rate histogram.
+    """
+    target = session.get(RepresentativeTarget, target_id)
+    if not target or target.campaign_id != campaign_id:
+        raise HTTPException(status_code=404, detail="Representative target not found")
+
+    profile = session.get(UserProfile, current_user.id)
+    timezone_name = profile.timezone if profile else "UTC"
+    call_window = session.get(TargetCallWindow, target_id)
+    return CallWindowsPublic(
+        target_id=target_id,
+        timezone=timezone_name,
+        data=call_windows.local_windows(call_window, timezone_name=timezone_name)
+        if call_window
+        else [],
+        generated_at=call_window.built_at if call_window else None,
     )
-    targets = session.exec(statement).all()
-    return RepresentativeTargetsPublic(data=targets, count=count)
 
 
-@router.get("/{campaign_id}/templates", response_model=ActionTemplatesPublic)
+@router.get(
+    "/{campaign_id}/templates",
+    response_model=ActionTemplatesPublic,
+    dependencies=[Depends(conditional_get(_templates_version))],
+)
 def read_campaign_templates(
     session: SessionDep,
     _current_user: CurrentUser,
     campaign_id: uuid.UUID,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool = True,
 ) -> Any:
     """
-    Retrieve action templates for a campaign.
+    Retrieve action templates for a campaign, newest first.
     """
     campaign = session.get(Campaign, campaign_id)
     if not campaign:
@@ -112,13 +192,13 @@ def read_campaign_templates(
         .select_from(ActionTemplate)
         .where(ActionTemplate.campaign_id == campaign_id)
     )
-    count = session.exec(count_statement).one()
-    statement = (
-        select(ActionTemplate)
-        .where(ActionTemplate.campaign_id == campaign_id)
-        .order_by(col(ActionTemplate.created_at).desc())
-        .offset(skip)
-        .limit(limit)
+    count = session.exec(count_statement).one() if include_count else None
+    templates, next_cursor = keyset_page(
+        session,
+        select(ActionTemplate).where(ActionTemplate.campaign_id == campaign_id),
+        ActionTemplate,
+        limit=limit,
+        skip=skip,
+        after=resolve_cursor(cursor),
     )
-    templates = session.exec(statement).all()
-    return ActionTemplatesPublic(data=templates, count=count)
+    return ActionTemplatesPublic(data=templates, count=count, next_cursor=next_cursor)
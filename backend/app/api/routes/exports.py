@@ -0,0 +1,103 @@
+import uuid
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+
+from app import exports
+from app.api.deps import SessionDep, get_current_active_superuser, resolve_window
+from app.core.db import engine
+from app.models import Campaign, ExportFormat
+
+router = APIRouter(
+    prefix="/exports",
+    tags=["exports"],
+    dependencies=[Depends(get_current_active_superuser)],
+)
+
+RowSource = Callable[..., Iterator[dict[str, Any]]]
+
+
+def _stream_export(
+    *,
+    campaign: Campaign,
+    window: str,
+    export_format: ExportFormat,
+    kind: str,
+    rows: RowSource,
+    columns: tuple[str, ...],
+) -> StreamingResponse:
+    window_days, window_start = resolve_window(window)
+    campaign_id = campaign.id
+
+    def content() -> Iterator[str]:
+        # The stream outlives the request's session, so it reads through its own.
+        with Session(engine) as session:
+            yield from exports.encode(
+                rows(session, campaign_id=campaign_id, start=window_start),
+                export_format=export_format,
+                columns=columns,
+            )
+
+    filename = f"{campaign.slug}-{kind}-{window_days}d.{export_format.value}"
+    return StreamingResponse(
+        content(),
+        media_type=exports.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _get_campaign(session: SessionDep, campaign_id: uuid.UUID) -> Campaign:
+    campaign = session.get(Campaign, campaign_id)
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return campaign
+
+
+@router.get(
+    "/campaign/{campaign_id}/actions.{export_format}",
+    response_class=StreamingResponse,
+)
+def export_campaign_actions(
+    session: SessionDep,
+    campaign_id: uuid.UUID,
+    export_format: ExportFormat,
+    window: str = Query(default="30d"),
+) -> Any:
+    """
+    Every action log of a campaign within the window, oldest first. Only
+    participants with public opt-in visibility are named.
+    """
+    return _stream_export(
+        campaign=_get_campaign(session, campaign_id),
+        window=window,
+        export_format=export_format,
+        kind="actions",
+        rows=exports.action_rows,
+        columns=exports.ACTION_COLUMNS,
+    )
+
+
+@router.get(
+    "/campaign/{campaign_id}/impact.{export_format}",
+    response_class=StreamingResponse,
+)
+def export_campaign_impact(
+    session: SessionDep,
+    campaign_id: uuid.UUID,
+    export_format: ExportFormat,
+    window: str = Query(default="30d"),
+) -> Any:
+    """
+    Daily impact counts of a campaign per target, action type and status.
+    """
+    return _stream_export(
+        campaign=_get_campaign(session, campaign_id),
+        window=window,
+        export_format=export_format,
+        kind="impact",
+        rows=exports.impact_rows,
+        columns=exports.IMPACT_COLUMNS,
+    )
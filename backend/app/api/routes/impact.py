@@ -1,35 +1,215 @@
+import time
 import uuid
+from dataclasses import asdict
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Annotated, Any
+from urllib.parse import urlencode
 
-from fastapi import APIRouter, HTTPException, Query
-from sqlmodel import select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlmodel import col, func, select
 
-from app.api.deps import CurrentUser, SessionDep
+from app import leaderboards, rollups, sketches
+from app.analytics import (
+    ActionAggregate,
+    aggregate_action_logs,
+    outcome_breakdown,
+    utc_day,
+)
+from app.api.deps import (
+    CurrentUser,
+    SessionDep,
+    conditional_get,
+    etag_matches,
+    get_current_active_superuser,
+    resolve_window,
+)
+from app.core import timewindows
+from app.core.cache import SingleFlightCache
+from app.core.config import settings
+from app.core.timewindows import TimeWindow, WindowAlign
 from app.models import (
-    ActionType,
+    CacheStatsPublic,
     Campaign,
+    GeoBasis,
+    GeoLevel,
+    ImpactBatchItem,
+    ImpactBatchPublic,
+    ImpactBatchRequest,
+    ImpactCounters,
+    ImpactDailyRollup,
+    ImpactGeoPublic,
     ImpactPublic,
+    ImpactSeriesPublic,
     ImpactShareCardPublic,
+    ImpactWindowPublic,
+    LeaderboardEntry,
+    LeaderboardEntryPublic,
+    LeaderboardPublic,
+    OutcomesPublic,
     RepresentativeTarget,
+    SeriesBucket,
     UserActionLog,
     UserPrivacySettings,
     UserProfile,
     VisibilityMode,
 )
+from app.utils import (
+    generate_share_card_token,
+    render_share_card_svg,
+    share_card_digest,
+    share_card_etag,
+    verify_share_card_token,
+)
 
 router = APIRouter(prefix="/impact", tags=["impact"])
 
+impact_cache: SingleFlightCache[ImpactPublic] = SingleFlightCache(
+    ttl_seconds=settings.IMPACT_CACHE_TTL_SECONDS,
+    max_entries=settings.IMPACT_CACHE_MAX_ENTRIES,
+)
+
+version_cache: SingleFlightCache[tuple[Any, ...]] = SingleFlightCache(
+    ttl_seconds=settings.IMPACT_CACHE_TTL_SECONDS,
+    max_entries=settings.IMPACT_CACHE_MAX_ENTRIES,
+)
+
+share_card_cache: SingleFlightCache[bytes] = SingleFlightCache(
+    ttl_seconds=settings.SHARE_CARD_CACHE_TTL_SECONDS,
+    max_entries=settings.IMPACT_CACHE_MAX_ENTRIES,
+)
+
+
+# Hourly series are read from the raw logs, so their windows stay short.
+MAX_HOURLY_WINDOW_DAYS = 31
+
+MAX_IMPACT_WINDOWS = 5
+
+
+def _series_window(window: str, bucket: SeriesBucket) -> TimeWindow:
+    align = WindowAlign.HOUR if bucket == SeriesBucket.HOUR else WindowAlign.DAY
+    time_window = resolve_window(window, align=align)
+    if bucket == SeriesBucket.HOUR and time_window.days > MAX_HOURLY_WINDOW_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Hourly buckets support windows up to {MAX_HOURLY_WINDOW_DAYS}d",
+        )
+    return time_window
+
+
+def _window_days_list(window: str, windows: str | None) -> tuple[int, ...]:
+    """
+    Days of the primary `window` followed by the other comma-separated
+    `windows`, in ascending order.
+    """
+    window_days = resolve_window(window).days
+    if windows is None:
+        return (window_days,)
+    extra = {
+        resolve_window(value).days for value in windows.split(",") if value.strip()
+    }
+    extra.discard(window_days)
+    if len(extra) + 1 > MAX_IMPACT_WINDOWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_IMPACT_WINDOWS} windows can be requested",
+        )
+    return (window_days, *sorted(extra))
+
+
+def _cache_bucket() -> int:
+    """
+    Current cache TTL period. Part of the ETag version, so a client is never
+    pinned to a cached response older than the rollups it validates against.
+    """
+    ttl = max(settings.IMPACT_CACHE_TTL_SECONDS, 1)
+    return int(time.time() // ttl)
+
+
+def _impact_version(
+    session: SessionDep,
+    *,
+    window: str,
+    windows: str | None = None,
+    campaign_id: uuid.UUID | None = None,
+    target_id: uuid.UUID | None = None,
+    profiles: bool = False,
+) -> tuple[Any, ...]:
+    """
+    Version token for impact responses: the rollup rows they are built from,
+    reduced to a total and the latest action, within the current cache bucket.
+    Tokens are cached for as long as impact responses are, so repeated
+    conditional GETs are answered without a query.
+    """
+    start = resolve_window(window).start
+    if windows is not None:
+        # Windowed responses also read the period before the widest window.
+        start = timewindows.window_start(2 * max(_window_days_list(window, windows)))
+    bucket = _cache_bucket()
+
+    def compute() -> tuple[Any, ...]:
+        statement = select(
+            func.sum(ImpactDailyRollup.action_count),
+            func.max(ImpactDailyRollup.last_action_at),
+        ).where(col(ImpactDailyRollup.day) >= utc_day(start))
+        if campaign_id is not None:
+            statement = statement.where(ImpactDailyRollup.campaign_id == campaign_id)
+        if target_id is not None:
+            statement = statement.where(ImpactDailyRollup.target_id == target_id)
+        version: tuple[Any, ...] = (bucket, *session.exec(statement).one())
+        if profiles:
+            # Actor geography comes from profiles, which users edit.
+            version += tuple(
+                session.exec(
+                    select(func.count(), func.max(UserProfile.updated_at))
+                ).one()
+            )
+        return version
+
+    return version_cache.get_or_compute(
+        (bucket, start, campaign_id, target_id, profiles), compute
+    )
+
+
+def _platform_version(
+    session: SessionDep,
+    window: str = Query(default="7d"),
+    windows: str | None = None,
+) -> tuple[Any, ...]:
+    return _impact_version(session, window=window, windows=windows)
+
 
-def _window_start(window: str) -> tuple[int, datetime]:
-    value = window.strip().lower()
-    if not value.endswith("d") or not value[:-1].isdigit():
-        raise HTTPException(status_code=400, detail="Window must be like 7d or 30d")
-    days = int(value[:-1])
-    if days <= 0 or days > 365:
-        raise HTTPException(status_code=400, detail="Window days must be between 1 and 365")
-    start = datetime.now(timezone.utc) - timedelta(days=days)
-    return days, start
+def _campaign_version(
+    session: SessionDep,
+    campaign_id: uuid.UUID,
+    window: str = Query(default="30d"),
+    windows: str | None = None,
+) -> tuple[Any, ...]:
+    return _impact_version(
+        session, window=window, windows=windows, campaign_id=campaign_id
+    )
+
+
+def _representative_version(
+    session: SessionDep,
+    target_id: uuid.UUID,
+    window: str = Query(default="30d"),
+    windows: str | None = None,
+) -> tuple[Any, ...]:
+    return _impact_version(session, window=window, windows=windows, target_id=target_id)
+
+
+def _geo_version(
+    session: SessionDep,
+    window: str = Query(default="30d"),
+    basis: GeoBasis = Query(default=GeoBasis.TARGET),
+    campaign_id: uuid.UUID | None = None,
+) -> tuple[Any, ...]:
+    return _impact_version(
+        session,
+        window=window,
+        campaign_id=campaign_id,
+        profiles=basis == GeoBasis.ACTOR,
+    )
 
 
 def _participant_range(count: int) -> str:
@@ -44,42 +224,74 @@ def _participant_range(count: int) -> str:
     return "100+"
 
 
-def _build_impact(logs: list[UserActionLog], *, window_days: int) -> ImpactPublic:
-    completed_actions = sum(1 for item in logs if item.status.value == "completed")
-    skipped_actions = sum(1 for item in logs if item.status.value == "skipped")
-    calls = sum(1 for item in logs if item.action_type == ActionType.CALL)
-    emails = sum(1 for item in logs if item.action_type == ActionType.EMAIL)
-    boycotts = sum(1 for item in logs if item.action_type == ActionType.BOYCOTT)
-    events = sum(1 for item in logs if item.action_type == ActionType.EVENT)
-    unique_participants = len({item.user_id for item in logs})
-    last_action_at = max((item.created_at for item in logs if item.created_at), default=None)
-
+def _build_impact(aggregate: ActionAggregate, *, window_days: int) -> ImpactPublic:
     return ImpactPublic(
         window_days=window_days,
-        total_actions=len(logs),
-        completed_actions=completed_actions,
-        skipped_actions=skipped_actions,
-        calls=calls,
-        emails=emails,
-        boycotts=boycotts,
-        events=events,
-        unique_participants=unique_participants,
-        participant_range=_participant_range(unique_participants),
-        last_action_at=last_action_at,
+        total_actions=aggregate.total_actions,
+        completed_actions=aggregate.completed_actions,
+        skipped_actions=aggregate.skipped_actions,
+        calls=aggregate.calls,
+        emails=aggregate.emails,
+        boycotts=aggregate.boycotts,
+        events=aggregate.events,
+        unique_participants=aggregate.unique_participants,
+        participant_range=_participant_range(aggregate.unique_participants),
+        last_action_at=aggregate.last_action_at,
     )
 
 
+def _build_windowed_impact(
+    session: SessionDep,
+    *,
+    window_days: tuple[int, ...],
+    campaign_id: uuid.UUID | None = None,
+    target_id: uuid.UUID | None = None,
+) -> ImpactPublic:
+    """
+    Impact for the primary window (the first of `window_days`) with every
+    window and its previous-period delta attached, from one rollup scan.
+    """
+    origin = timewindows.align_floor(datetime.now(timezone.utc), WindowAlign.DAY)
+    aggregates = rollups.rollup_windows(
+        session,
+        origin=origin,
+        window_days=window_days,
+        campaign_id=campaign_id,
+        target_id=target_id,
+    )
+    primary, _ = aggregates[window_days[0]]
+    primary.unique_participants = sketches.unique_participants(
+        session,
+        start=origin - timedelta(days=window_days[0]),
+        campaign_id=campaign_id,
+        target_id=target_id,
+    )
+    impact = _build_impact(primary, window_days=window_days[0])
+    impact.windows = [
+        ImpactWindowPublic(
+            **{name: getattr(current, name) for name in ImpactCounters.model_fields},
+            window_days=days,
+            last_action_at=current.last_action_at,
+            delta=ImpactCounters(
+                **{
+                    name: getattr(current, name) - getattr(previous, name)
+                    for name in ImpactCounters.model_fields
+                }
+            ),
+        )
+        for days, (current, previous) in sorted(aggregates.items())
+    ]
+    return impact
+
+
 def _build_share_card(
     *,
-    logs: list[UserActionLog],
+    aggregate: ActionAggregate,
     window_days: int,
     visibility_mode: VisibilityMode,
     allow_shareable_card: bool,
     username: str,
 ) -> ImpactShareCardPublic:
-    completed_actions = sum(1 for item in logs if item.status.value == "completed")
-    calls = sum(1 for item in logs if item.action_type == ActionType.CALL)
-    emails = sum(1 for item in logs if item.action_type == ActionType.EMAIL)
     shareable = allow_shareable_card and visibility_mode == VisibilityMode.PUBLIC_OPT_IN
     display_name = username if shareable else None
     message = (
@@ -93,101 +305,642 @@ def _build_share_card(
         visibility_mode=visibility_mode,
         display_name=display_name,
         period_label=f"last_{window_days}_days",
-        total_actions=len(logs),
-        completed_actions=completed_actions,
-        calls=calls,
-        emails=emails,
+        total_actions=aggregate.total_actions,
+        completed_actions=aggregate.completed_actions,
+        calls=aggregate.calls,
+        emails=aggregate.emails,
         message=message,
     )
 
 
-@router.get("/platform", response_model=ImpactPublic)
+def _platform_impact(
+    session: SessionDep,
+    window: str = Query(default="7d"),
+    windows: str | None = Query(default=None, examples=["7d,30d,365d"]),
+) -> ImpactPublic:
+    window_days, window_start = resolve_window(window)
+    all_window_days = _window_days_list(window, windows)
+
+    def compute() -> ImpactPublic:
+        if windows is not None:
+            return _build_windowed_impact(session, window_days=all_window_days)
+        aggregate = rollups.rollup_aggregate(session, start=window_start)
+        return _build_impact(aggregate, window_days=window_days)
+
+    return impact_cache.get_or_compute(
+        ("platform", None, all_window_days, windows is not None, window_start),
+        compute,
+    )
+
+
+def _platform_impact_version(
+    impact: Annotated[ImpactPublic, Depends(_platform_impact)],
+) -> str:
+    """
+    Version token of a response served from `impact_cache`: the cached value
+    itself, which the endpoint then reuses, so the ETag always describes the
+    body that is sent and a cache hit costs no query.
+    """
+    return impact.model_dump_json()
+
+
+@router.get(
+    "/platform",
+    response_model=ImpactPublic,
+    dependencies=[Depends(conditional_get(_platform_impact_version))],
+)
 def read_platform_impact(
+    _current_user: CurrentUser,
+    impact: Annotated[ImpactPublic, Depends(_platform_impact)],
+) -> Any:
+    """
+    Platform-wide impact. With `windows`, every listed window is computed in
+    the same pass and returned with its previous-period delta.
+    """
+    return impact
+
+
+def _campaign_impact(
+    session: SessionDep,
+    campaign_id: uuid.UUID,
+    window: str = Query(default="30d"),
+    windows: str | None = Query(default=None, examples=["7d,30d,365d"]),
+) -> ImpactPublic:
+    window_days, window_start = resolve_window(window)
+    all_window_days = _window_days_list(window, windows)
+
+    def compute() -> ImpactPublic:
+        campaign = session.get(Campaign, campaign_id)
+        if not campaign:
+            raise HTTPException(status_code=404, detail="Campaign not found")
+        if windows is not None:
+            impact = _build_windowed_impact(
+                session, window_days=all_window_days, campaign_id=campaign_id
+            )
+        else:
+            aggregate = rollups.rollup_aggregate(
+                session, start=window_start, campaign_id=campaign_id
+            )
+            impact = _build_impact(aggregate, window_days=window_days)
+        impact.campaign_id = campaign.id
+        impact.campaign_title = campaign.title
+        return impact
+
+    return impact_cache.get_or_compute(
+        (
+            "campaign",
+            campaign_id,
+            all_window_days,
+            windows is not None,
+            window_start,
+        ),
+        compute,
+    )
+
+
+def _campaign_impact_version(
+    impact: Annotated[ImpactPublic, Depends(_campaign_impact)],
+) -> str:
+    return impact.model_dump_json()
+
+
+@router.get(
+    "/campaign/{campaign_id}",
+    response_model=ImpactPublic,
+    dependencies=[Depends(conditional_get(_campaign_impact_version))],
+)
+def read_campaign_impact(
+    _current_user: CurrentUser,
+    impact: Annotated[ImpactPublic, Depends(_campaign_impact)],
+) -> Any:
+    return impact
+
+
+@router.get(
+    "/representative/{target_id}",
+    response_model=ImpactPublic,
+    dependencies=[Depends(conditional_get(_representative_version))],
+)
+def read_representative_impact(
+    session: SessionDep,
+    _current_user: CurrentUser,
+    target_id: uuid.UUID,
+    window: str = Query(default="30d"),
+    windows: str | None = Query(default=None, examples=["7d,30d,365d"]),
+) -> Any:
+    target = session.get(RepresentativeTarget, target_id)
+    if not target:
+        raise HTTPException(status_code=404, detail="Representative target not found")
+
+    window_days, window_start = resolve_window(window)
+    if windows is not None:
+        impact = _build_windowed_impact(
+            session,
+            window_days=_window_days_list(window, windows),
+            target_id=target_id,
+        )
+    else:
+        aggregate = rollups.rollup_aggregate(
+            session, start=window_start, target_id=target_id
+        )
+        impact = _build_impact(aggregate, window_days=window_days)
+    campaign = session.get(Campaign, target.campaign_id)
+    if campaign:
+        impact.campaign_id = campaign.id
+        impact.campaign_title = campaign.title
+    return impact
+
+
+@router.post("/campaigns:batch", response_model=ImpactBatchPublic)
+def read_campaign_impacts_batch(
+    session: SessionDep,
+    _current_user: CurrentUser,
+    body: ImpactBatchRequest,
+) -> Any:
+    """
+    Impact for many campaigns at once. Unknown ids are reported per item.
+    """
+    window_days, window_start = resolve_window(body.window)
+    ids = list(dict.fromkeys(body.ids))
+    campaigns = {
+        campaign.id: campaign
+        for campaign in session.exec(
+            select(Campaign).where(col(Campaign.id).in_(ids))
+        ).all()
+    }
+    aggregates = rollups.rollup_aggregates(
+        session, start=window_start, campaign_ids=list(campaigns)
+    )
+
+    items = []
+    for campaign_id in body.ids:
+        campaign = campaigns.get(campaign_id)
+        if not campaign:
+            items.append(ImpactBatchItem(id=campaign_id, error="Campaign not found"))
+            continue
+        impact = _build_impact(aggregates[campaign_id], window_days=window_days)
+        impact.campaign_id = campaign.id
+        impact.campaign_title = campaign.title
+        items.append(ImpactBatchItem(id=campaign_id, impact=impact))
+    return ImpactBatchPublic(data=items, count=len(items))
+
+
+@router.post("/representatives:batch", response_model=ImpactBatchPublic)
+def read_representative_impacts_batch(
+    session: SessionDep,
+    _current_user: CurrentUser,
+    body: ImpactBatchRequest,
+) -> Any:
+    """
+    Impact for many representative targets at once. Unknown ids are reported
+    per item.
+    """
+    window_days, window_start = resolve_window(body.window)
+    ids = list(dict.fromkeys(body.ids))
+    targets = {
+        target.id: target
+        for target in session.exec(
+            select(RepresentativeTarget).where(col(RepresentativeTarget.id).in_(ids))
+        ).all()
+    }
+    campaign_ids = {target.campaign_id for target in targets.values()}
+    campaigns = {
+        campaign.id: campaign
+        for campaign in session.exec(
+            select(Campaign).where(col(Campaign.id).in_(campaign_ids))
+        ).all()
+    }
+    aggregates = rollups.rollup_aggregates(
+        session, start=window_start, target_ids=list(targets)
+    )
+
+    items = []
+    for target_id in body.ids:
+        target = targets.get(target_id)
+        if not target:
+            items.append(
+                ImpactBatchItem(id=target_id, error="Representative target not found")
+            )
+            continue
+        impact = _build_impact(aggregates[target_id], window_days=window_days)
+        campaign = campaigns.get(target.campaign_id)
+        if campaign:
+            impact.campaign_id = campaign.id
+            impact.campaign_title = campaign.title
+        items.append(ImpactBatchItem(id=target_id, impact=impact))
+    return ImpactBatchPublic(data=items, count=len(items))
+
+
+@router.get(
+    "/platform/series",
+    response_model=ImpactSeriesPublic,
+    dependencies=[Depends(conditional_get(_platform_version))],
+)
+def read_platform_impact_series(
     session: SessionDep,
     _current_user: CurrentUser,
     window: str = Query(default="7d"),
+    bucket: SeriesBucket = Query(default=SeriesBucket.DAY),
 ) -> Any:
-    window_days, window_start = _window_start(window)
-    logs = session.exec(
-        select(UserActionLog).where(UserActionLog.created_at >= window_start)
-    ).all()
-    return _build_impact(logs, window_days=window_days)
+    window_days, window_start = _series_window(window, bucket)
+    data = rollups.impact_series(session, start=window_start, bucket=bucket)
+    return ImpactSeriesPublic(window_days=window_days, bucket=bucket, data=data)
 
 
-@router.get("/campaign/{campaign_id}", response_model=ImpactPublic)
-def read_campaign_impact(
+@router.get(
+    "/campaign/{campaign_id}/series",
+    response_model=ImpactSeriesPublic,
+    dependencies=[Depends(conditional_get(_campaign_version))],
+)
+def read_campaign_impact_series(
     session: SessionDep,
     _current_user: CurrentUser,
     campaign_id: uuid.UUID,
     window: str = Query(default="30d"),
+    bucket: SeriesBucket = Query(default=SeriesBucket.DAY),
 ) -> Any:
     campaign = session.get(Campaign, campaign_id)
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
 
-    window_days, window_start = _window_start(window)
-    logs = session.exec(
-        select(UserActionLog).where(
-            UserActionLog.created_at >= window_start,
-            UserActionLog.campaign_id == campaign_id,
-        )
-    ).all()
-    impact = _build_impact(logs, window_days=window_days)
-    impact.campaign_id = campaign.id
-    impact.campaign_title = campaign.title
-    return impact
+    window_days, window_start = _series_window(window, bucket)
+    data = rollups.impact_series(
+        session, start=window_start, bucket=bucket, campaign_id=campaign_id
+    )
+    return ImpactSeriesPublic(
+        window_days=window_days,
+        bucket=bucket,
+        data=data,
+        campaign_id=campaign.id,
+        campaign_title=campaign.title,
+    )
 
 
-@router.get("/representative/{target_id}", response_model=ImpactPublic)
-def read_representative_impact(
+@router.get(
+    "/representative/{target_id}/series",
+    response_model=ImpactSeriesPublic,
+    dependencies=[Depends(conditional_get(_representative_version))],
+)
+def read_representative_impact_series(
     session: SessionDep,
     _current_user: CurrentUser,
     target_id: uuid.UUID,
     window: str = Query(default="30d"),
+    bucket: SeriesBucket = Query(default=SeriesBucket.DAY),
 ) -> Any:
     target = session.get(RepresentativeTarget, target_id)
     if not target:
         raise HTTPException(status_code=404, detail="Representative target not found")
 
-    window_days, window_start = _window_start(window)
-    logs = session.exec(
-        select(UserActionLog).where(
-            UserActionLog.created_at >= window_start,
-            UserActionLog.target_id == target_id,
-        )
-    ).all()
-    impact = _build_impact(logs, window_days=window_days)
+    window_days, window_start = _series_window(window, bucket)
+    data = rollups.impact_series(
+        session, start=window_start, bucket=bucket, target_id=target_id
+    )
+    series = ImpactSeriesPublic(window_days=window_days, bucket=bucket, data=data)
     campaign = session.get(Campaign, target.campaign_id)
     if campaign:
-        impact.campaign_id = campaign.id
-        impact.campaign_title = campaign.title
-    return impact
+        series.campaign_id = campaign.id
+        series.campaign_title = campaign.title
+    return series
 
 
-@router.get("/me/share-card", response_model=ImpactShareCardPublic)
-def read_my_share_card(
+@router.get(
+    "/geo",
+    response_model=ImpactGeoPublic,
+    dependencies=[Depends(conditional_get(_geo_version))],
+)
+def read_geo_impact(
+    session: SessionDep,
+    _current_user: CurrentUser,
+    level: GeoLevel = Query(default=GeoLevel.STATE),
+    basis: GeoBasis = Query(default=GeoBasis.TARGET),
+    campaign_id: uuid.UUID | None = None,
+    window: str = Query(default="30d"),
+) -> Any:
+    """
+    Impact per state or congressional district, placed by the targeted
+    representative's geography or by the acting user's profile. Actor regions
+    with fewer than GEO_MIN_ACTORS distinct users are left out.
+    """
+    campaign = None
+    if campaign_id is not None:
+        campaign = session.get(Campaign, campaign_id)
+        if not campaign:
+            raise HTTPException(status_code=404, detail="Campaign not found")
+
+    window_days, window_start = resolve_window(window)
+    data = rollups.geo_aggregates(
+        session,
+        start=window_start,
+        level=level,
+        basis=basis,
+        campaign_id=campaign_id,
+        min_actors=settings.GEO_MIN_ACTORS,
+    )
+    return ImpactGeoPublic(
+        window_days=window_days,
+        level=level,
+        basis=basis,
+        data=data,
+        campaign_id=campaign.id if campaign else None,
+        campaign_title=campaign.title if campaign else None,
+    )
+
+
+@router.get(
+    "/campaign/{campaign_id}/outcomes",
+    response_model=OutcomesPublic,
+    dependencies=[Depends(conditional_get(_campaign_version))],
+)
+def read_campaign_outcomes(
+    session: SessionDep,
+    _current_user: CurrentUser,
+    campaign_id: uuid.UUID,
+    window: str = Query(default="30d"),
+) -> Any:
+    """
+    Outcome and confidence-score histograms with answer rates per action type
+    for a campaign's completed actions.
+    """
+    campaign = session.get(Campaign, campaign_id)
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+
+    window_days, window_start = resolve_window(window)
+    data = outcome_breakdown(
+        session,
+        col(UserActionLog.campaign_id) == campaign_id,
+        col(UserActionLog.created_at) >= window_start,
+    )
+    return OutcomesPublic(
+        window_days=window_days,
+        data=data,
+        campaign_id=campaign.id,
+        campaign_title=campaign.title,
+    )
+
+
+@router.get(
+    "/representative/{target_id}/outcomes",
+    response_model=OutcomesPublic,
+    dependencies=[Depends(conditional_get(_representative_version))],
+)
+def read_representative_outcomes(
+    session: SessionDep,
+    _current_user: CurrentUser,
+    target_id: uuid.UUID,
+    window: str = Query(default="30d"),
+) -> Any:
+    """
+    Outcome and confidence-score histograms with answer rates per action type
+    for the completed actions aimed at one representative.
+    """
+    target = session.get(RepresentativeTarget, target_id)
+    if not target:
+        raise HTTPException(status_code=404, detail="Representative target not found")
+
+    window_days, window_start = resolve_window(window)
+    data = outcome_breakdown(
+        session,
+        col(UserActionLog.target_id) == target_id,
+        col(UserActionLog.created_at) >= window_start,
+    )
+    outcomes = OutcomesPublic(window_days=window_days, data=data, target_id=target_id)
+    campaign = session.get(Campaign, target.campaign_id)
+    if campaign:
+        outcomes.campaign_id = campaign.id
+        outcomes.campaign_title = campaign.title
+    return outcomes
+
+
+@router.get("/leaderboard", response_model=LeaderboardPublic)
+def read_leaderboard(
     session: SessionDep,
     current_user: CurrentUser,
-    window: str = Query(default="7d"),
+    window: str = Query(default="30d"),
+    campaign_id: uuid.UUID | None = None,
+    limit: int = Query(default=10, ge=1, le=100),
 ) -> Any:
-    profile = session.get(UserProfile, current_user.id)
+    """
+    Top users by completed actions, plus the caller's own rank. Only users who
+    opted in with `show_on_leaderboard` are ranked.
+    """
+    window_days = resolve_window(window).days
+    if window_days not in leaderboards.WINDOW_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail="Leaderboard windows are "
+            + ", ".join(f"{days}d" for days in leaderboards.WINDOW_DAYS),
+        )
+    if campaign_id is not None and not session.get(Campaign, campaign_id):
+        raise HTTPException(status_code=404, detail="Campaign not found")
+
+    scope_filters = [
+        col(LeaderboardEntry.window_days) == window_days,
+        col(LeaderboardEntry.campaign_id).is_(None)
+        if campaign_id is None
+        else col(LeaderboardEntry.campaign_id) == campaign_id,
+    ]
+    top_rows = session.exec(
+        select(LeaderboardEntry, UserProfile.username)
+        .outerjoin(
+            UserProfile, col(UserProfile.user_id) == col(LeaderboardEntry.user_id)
+        )
+        .where(*scope_filters)
+        .order_by(col(LeaderboardEntry.rank), col(LeaderboardEntry.user_id))
+        .limit(limit)
+    ).all()
+    my_entry = session.exec(
+        select(LeaderboardEntry).where(
+            *scope_filters, col(LeaderboardEntry.user_id) == current_user.id
+        )
+    ).first()
+
+    data = [
+        LeaderboardEntryPublic(
+            rank=entry.rank,
+            username=username,
+            score=entry.score,
+            is_me=entry.user_id == current_user.id,
+        )
+        for entry, username in top_rows
+    ]
+    me = None
+    if my_entry:
+        profile = session.get(UserProfile, current_user.id)
+        me = LeaderboardEntryPublic(
+            rank=my_entry.rank,
+            username=profile.username if profile else None,
+            score=my_entry.score,
+            is_me=True,
+        )
+    built = top_rows[0][0] if top_rows else my_entry
+    return LeaderboardPublic(
+        window_days=window_days,
+        campaign_id=campaign_id,
+        generated_at=built.built_at if built else None,
+        data=data,
+        me=me,
+    )
+
+
+def _share_card_inputs(
+    session: SessionDep, user_id: uuid.UUID
+) -> tuple[UserProfile, bool]:
+    profile = session.get(UserProfile, user_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
+    privacy = session.get(UserPrivacySettings, user_id)
+    return profile, privacy.allow_shareable_card if privacy else False
 
-    privacy = session.get(UserPrivacySettings, current_user.id)
-    allow_shareable_card = privacy.allow_shareable_card if privacy else False
 
-    window_days, window_start = _window_start(window)
-    logs = session.exec(
-        select(UserActionLog).where(
-            UserActionLog.user_id == current_user.id,
-            UserActionLog.created_at >= window_start,
-        )
-    ).all()
-    return _build_share_card(
-        logs=logs,
+def _share_card_image_url(user_id: uuid.UUID, window: str) -> str:
+    token = generate_share_card_token(user_id)
+    query = urlencode({"window": window})
+    return f"{settings.API_V1_STR}/impact/share-cards/{token}.svg?{query}"
+
+
+def _my_share_card(
+    session: SessionDep, user_id: uuid.UUID, window: str
+) -> ImpactShareCardPublic:
+    profile, allow_shareable_card = _share_card_inputs(session, user_id)
+    window_days, window_start = resolve_window(window, timezone_name=profile.timezone)
+    aggregate = aggregate_action_logs(
+        session,
+        col(UserActionLog.user_id) == user_id,
+        col(UserActionLog.created_at) >= window_start,
+    )
+    card = _build_share_card(
+        aggregate=aggregate,
         window_days=window_days,
         visibility_mode=profile.visibility_mode,
         allow_shareable_card=allow_shareable_card,
         username=profile.username,
     )
+    if allow_shareable_card:
+        card.image_url = _share_card_image_url(user_id, window)
+    return card
+
+
+def _share_card_version(
+    session: SessionDep, user_id: uuid.UUID, window: str
+) -> tuple[Any, ...]:
+    """
+    Version token for a share card: the profile and privacy fields it shows,
+    its window, and the user's logs in that window reduced to a count and the
+    latest one, which the (user_id, created_at) index answers on its own.
+    """
+    profile, allow_shareable_card = _share_card_inputs(session, user_id)
+    window_days, window_start = resolve_window(window, timezone_name=profile.timezone)
+    logs = session.exec(
+        select(func.count(), func.max(UserActionLog.created_at)).where(
+            UserActionLog.user_id == user_id,
+            col(UserActionLog.created_at) >= window_start,
+        )
+    ).one()
+    return (
+        window_days,
+        window_start,
+        profile.visibility_mode,
+        profile.username,
+        allow_shareable_card,
+        *logs,
+    )
+
+
+def _share_card_image(
+    session: SessionDep,
+    user_id: uuid.UUID,
+    *,
+    window: str,
+    if_none_match: str | None,
+    cache_control: str,
+) -> Response:
+    headers = {
+        "ETag": share_card_etag(_share_card_version(session, user_id, window)),
+        "Cache-Control": cache_control,
+    }
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    card = _my_share_card(session, user_id, window)
+    content = share_card_cache.get_or_compute(
+        share_card_digest(card), lambda: render_share_card_svg(card).encode()
+    )
+    return Response(content=content, media_type="image/svg+xml", headers=headers)
+
+
+@router.get("/me/share-card", response_model=ImpactShareCardPublic)
+def read_my_share_card(
+    session: SessionDep,
+    current_user: CurrentUser,
+    window: str = Query(default="7d"),
+) -> Any:
+    return _my_share_card(session, current_user.id, window)
+
+
+@router.get(
+    "/me/share-card.svg",
+    response_class=Response,
+    responses={200: {"content": {"image/svg+xml": {}}}, 304: {}},
+)
+def read_my_share_card_image(
+    session: SessionDep,
+    current_user: CurrentUser,
+    window: str = Query(default="7d"),
+    if_none_match: str | None = Header(default=None),
+) -> Response:
+    """
+    The share card rendered as an SVG image. The ETag is checked before the
+    card is built, and renders are cached by a hash of the card's content.
+    """
+    return _share_card_image(
+        session,
+        current_user.id,
+        window=window,
+        if_none_match=if_none_match,
+        cache_control=f"private, max-age={settings.SHARE_CARD_MAX_AGE_SECONDS}",
+    )
+
+
+@router.get(
+    "/share-cards/{token}.svg",
+    response_class=Response,
+    responses={200: {"content": {"image/svg+xml": {}}}, 304: {}},
+)
+def read_share_card_image(
+    session: SessionDep,
+    token: str,
+    window: str = Query(default="7d"),
+    if_none_match: str | None = Header(default=None),
+) -> Response:
+    """
+    Public share card image behind the signed URL from `image_url`, so link
+    unfurlers and shared caches can fetch it without logging in. Served only
+    while the user allows shareable cards, which also revokes leaked links.
+    """
+    user_id = verify_share_card_token(token)
+    if user_id is None:
+        raise HTTPException(status_code=404, detail="Share card not found")
+    privacy = session.get(UserPrivacySettings, user_id)
+    if not privacy or not privacy.allow_shareable_card:
+        raise HTTPException(status_code=404, detail="Share card not found")
+    return _share_card_image(
+        session,
+        user_id,
+        window=window,
+        if_none_match=if_none_match,
+        cache_control=f"public, max-age={settings.SHARE_CARD_MAX_AGE_SECONDS}",
+    )
+
+
+@router.get(
+    "/cache-stats",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=CacheStatsPublic,
+)
+def read_impact_cache_stats() -> Any:
+    """
+    Hit, miss and coalesced-request counters for the impact response cache.
+    """
+    return CacheStatsPublic.model_validate(asdict(impact_cache.stats()))
@@ -3,6 +3,7 @@ from typing import Any
 from fastapi import APIRouter, HTTPException
 from sqlmodel import Session, func, select
 
+from app import leaderboards
 from app.api.deps import CurrentUser, SessionDep
 from app.models import (
     Campaign,
@@ -17,6 +18,7 @@ from app.models import (
     UserProfilePublic,
     UserProfileUpdate,
     VisibilityMode,
+    get_datetime_utc,
 )
 
 router = APIRouter(tags=["onboarding"])
@@ -50,6 +52,7 @@ def _upsert_profile(
         )
     else:
         profile.sqlmodel_update(profile_in.model_dump(exclude_unset=True))
+        profile.updated_at = get_datetime_utc()
 
     session.add(profile)
     session.commit()
@@ -69,6 +72,8 @@ def _upsert_privacy_settings(
 
     if privacy_in is not None:
         privacy.sqlmodel_update(privacy_in.model_dump(exclude_unset=True))
+        if not privacy.show_on_leaderboard:
+            leaderboards.remove_user(session, current_user_id)
 
     session.add(privacy)
     session.commit()
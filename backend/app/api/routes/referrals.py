@@ -1,12 +1,19 @@
 import secrets
-from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from fastapi import APIRouter, HTTPException, Query
-from sqlmodel import col, func, select
+from fastapi import APIRouter, HTTPException, Query, Response
+from sqlmodel import func, select
 
-from app.api.deps import CurrentUser, SessionDep
+from app import badges, idempotency
+from app.api.deps import (
+    CurrentUser,
+    IdempotencyKey,
+    SessionDep,
+    resolve_cursor,
+    resolve_window,
+)
 from app.core.config import settings
+from app.core.pagination import keyset_page
 from app.models import (
     Message,
     Referral,
@@ -17,30 +24,29 @@ from app.models import (
     ReferralsPublic,
     UserActionLog,
     UserPrivacySettings,
+    UserProfile,
 )
 
 router = APIRouter(prefix="/referrals", tags=["referrals"])
 
 
-def _window_start(window: str) -> tuple[int, datetime]:
-    value = window.strip().lower()
-    if not value.endswith("d") or not value[:-1].isdigit():
-        raise HTTPException(status_code=400, detail="Window must be like 7d or 30d")
-    days = int(value[:-1])
-    if days <= 0 or days > 365:
-        raise HTTPException(status_code=400, detail="Window days must be between 1 and 365")
-    start = datetime.now(timezone.utc) - timedelta(days=days)
-    return days, start
-
-
 def _invite_url(code: str) -> str:
     return f"{settings.FRONTEND_HOST}/signup?ref={code}"
 
 
 @router.post("/link", response_model=ReferralPublic)
 def create_referral_link(
-    *, session: SessionDep, current_user: CurrentUser, body: ReferralLinkCreate
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    body: ReferralLinkCreate,
+    response: Response,
+    idempotency_key: IdempotencyKey = None,
 ) -> Any:
+    """
+    Create a referral link. A retry with the same `Idempotency-Key` header
+    returns the link created by the first request.
+    """
     privacy = session.get(UserPrivacySettings, current_user.id)
     if privacy is not None and not privacy.allow_referral_tracking:
         raise HTTPException(
@@ -52,10 +58,19 @@ def create_referral_link(
         referrer_user_id=current_user.id,
         code=code,
         channel=body.channel,
+        idempotency_key=idempotency_key,
     )
-    session.add(referral)
-    session.commit()
-    session.refresh(referral)
+    if idempotency_key is None:
+        session.add(referral)
+        session.commit()
+        session.refresh(referral)
+    else:
+        [(referral, inserted)] = idempotency.insert(
+            session, Referral, [referral], owner="referrer_user_id"
+        )
+        session.commit()
+        if not inserted:
+            response.headers["Idempotent-Replayed"] = "true"
 
     return ReferralPublic(
         id=referral.id,
@@ -90,6 +105,7 @@ def claim_referral(
 
     referral.referred_user_id = current_user.id
     session.add(referral)
+    badges.apply_referral_claim(session, referral)
     session.commit()
 
     return Message(message="Referral claimed")
@@ -101,20 +117,23 @@ def read_my_referrals(
     current_user: CurrentUser,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool = False,
 ) -> Any:
     count_statement = (
         select(func.count())
         .select_from(Referral)
         .where(Referral.referrer_user_id == current_user.id)
     )
-    count = session.exec(count_statement).one()
-    rows = session.exec(
-        select(Referral)
-        .where(Referral.referrer_user_id == current_user.id)
-        .order_by(col(Referral.created_at).desc())
-        .offset(skip)
-        .limit(limit)
-    ).all()
+    count = session.exec(count_statement).one() if include_count else None
+    rows, next_cursor = keyset_page(
+        session,
+        select(Referral).where(Referral.referrer_user_id == current_user.id),
+        Referral,
+        limit=limit,
+        skip=skip,
+        after=resolve_cursor(cursor),
+    )
     data = [
         ReferralPublic(
             id=row.id,
@@ -127,14 +146,17 @@ def read_my_referrals(
         )
         for row in rows
     ]
-    return ReferralsPublic(data=data, count=count)
+    return ReferralsPublic(data=data, count=count, next_cursor=next_cursor)
 
 
 @router.get("/me/assists", response_model=ReferralAssistsPublic)
 def read_my_referral_assists(
     session: SessionDep, current_user: CurrentUser, window: str = Query(default="7d")
 ) -> Any:
-    window_days, window_start = _window_start(window)
+    profile = session.get(UserProfile, current_user.id)
+    window_days, window_start = resolve_window(
+        window, timezone_name=profile.timezone if profile else None
+    )
     referred_ids = session.exec(
         select(Referral.referred_user_id).where(
             Referral.referrer_user_id == current_user.id,
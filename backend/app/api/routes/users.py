@@ -9,8 +9,10 @@ from app.api.deps import (
     CurrentUser,
     SessionDep,
     get_current_active_superuser,
+    resolve_cursor,
 )
 from app.core.config import settings
+from app.core.pagination import keyset_page
 from app.core.security import get_password_hash, verify_password
 from app.models import (
     Item,
@@ -34,20 +36,30 @@ router = APIRouter(prefix="/users", tags=["users"])
     dependencies=[Depends(get_current_active_superuser)],
     response_model=UsersPublic,
 )
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+def read_users(
+    session: SessionDep,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool = True,
+) -> Any:
     """
     Retrieve users.
     """
 
     count_statement = select(func.count()).select_from(User)
-    count = session.exec(count_statement).one()
-
-    statement = (
-        select(User).order_by(col(User.created_at).desc()).offset(skip).limit(limit)
+    count = session.exec(count_statement).one() if include_count else None
+
+    users, next_cursor = keyset_page(
+        session,
+        select(User),
+        User,
+        limit=limit,
+        skip=skip,
+        after=resolve_cursor(cursor),
     )
-    users = session.exec(statement).all()
 
-    return UsersPublic(data=users, count=count)
+    return UsersPublic(data=users, count=count, next_cursor=next_cursor)
 
 
 @router.post(
@@ -0,0 +1,219 @@
+"""
+Declarative badge rules.
+
+Every rule compares one metric with a threshold. A write names the inputs it
+changed (an action type, the streak or a referral), and only rules listening
+to those inputs are considered. Their metrics are loaded once per loader, so
+adding rules on existing metrics adds no queries to the write path.
+"""
+
+import uuid
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, col, func, select
+
+from app.analytics import action_counter_columns
+from app.models import (
+    ActionLogStatus,
+    ActionType,
+    Referral,
+    UserActionLog,
+    UserBadge,
+    UserStreak,
+)
+
+STREAK_INPUT = "streak"
+REFERRAL_INPUT = "referral"
+
+
+def action_input(action_type: ActionType) -> str:
+    return f"action:{action_type.value}"
+
+
+ALL_ACTION_INPUTS = frozenset(action_input(action_type) for action_type in ActionType)
+
+
+@dataclass(frozen=True)
+class BadgeRule:
+    code: str
+    title: str
+    description: str
+    inputs: frozenset[str]
+    metric: str
+    threshold: int
+
+
+RULES: tuple[BadgeRule, ...] = (
+    BadgeRule(
+        code="first_action",
+        title="First Step",
+        description="Completed your first action.",
+        inputs=ALL_ACTION_INPUTS,
+        metric="completed_actions",
+        threshold=1,
+    ),
+    BadgeRule(
+        code="first_call",
+        title="On the Line",
+        description="Completed your first call.",
+        inputs=frozenset({action_input(ActionType.CALL)}),
+        metric="calls",
+        threshold=1,
+    ),
+    BadgeRule(
+        code="ten_emails",
+        title="Inbox Regular",
+        description="Sent ten emails.",
+        inputs=frozenset({action_input(ActionType.EMAIL)}),
+        metric="emails",
+        threshold=10,
+    ),
+    BadgeRule(
+        code="seven_day_streak",
+        title="Week Strong",
+        description="Kept a seven day streak.",
+        inputs=frozenset({STREAK_INPUT}),
+        metric="longest_streak",
+        threshold=7,
+    ),
+    BadgeRule(
+        code="first_recruit",
+        title="Recruiter",
+        description="Brought your first person to the platform.",
+        inputs=frozenset({REFERRAL_INPUT}),
+        metric="recruits",
+        threshold=1,
+    ),
+)
+
+RULES_BY_CODE = {rule.code: rule for rule in RULES}
+
+RULES_BY_INPUT: dict[str, list[BadgeRule]] = defaultdict(list)
+for _rule in RULES:
+    for _input in _rule.inputs:
+        RULES_BY_INPUT[_input].append(_rule)
+
+
+def _action_metrics(session: Session, user_id: uuid.UUID) -> dict[str, int]:
+    row = session.execute(
+        select(*action_counter_columns()).where(
+            col(UserActionLog.user_id) == user_id,
+            col(UserActionLog.status) == ActionLogStatus.COMPLETED,
+        )
+    ).one()
+    values = dict(row._mapping)
+    values["completed_actions"] = values.pop("total_actions")
+    return values
+
+
+def _streak_metrics(session: Session, user_id: uuid.UUID) -> dict[str, int]:
+    longest = session.exec(
+        select(UserStreak.longest_streak).where(
+            UserStreak.user_id == user_id, col(UserStreak.campaign_id).is_(None)
+        )
+    ).first()
+    return {"longest_streak": longest or 0}
+
+
+def _referral_metrics(session: Session, user_id: uuid.UUID) -> dict[str, int]:
+    recruits = session.exec(
+        select(func.count())
+        .select_from(Referral)
+        .where(
+            Referral.referrer_user_id == user_id,
+            col(Referral.referred_user_id).is_not(None),
+        )
+    ).one()
+    return {"recruits": recruits}
+
+
+MetricLoader = Callable[[Session, uuid.UUID], dict[str, int]]
+
+METRIC_LOADERS: dict[str, MetricLoader] = {
+    "completed_actions": _action_metrics,
+    "calls": _action_metrics,
+    "emails": _action_metrics,
+    "boycotts": _action_metrics,
+    "events": _action_metrics,
+    "longest_streak": _streak_metrics,
+    "recruits": _referral_metrics,
+}
+
+
+def evaluate(session: Session, user_id: uuid.UUID, inputs: Iterable[str]) -> list[str]:
+    """
+    Award every unearned badge whose rule listens to one of `inputs` and
+    whose threshold is now met. Returns the newly awarded codes.
+    """
+    candidates = {
+        rule.code: rule for input_ in inputs for rule in RULES_BY_INPUT.get(input_, [])
+    }
+    if not candidates:
+        return []
+    earned = session.exec(
+        select(UserBadge.code).where(
+            UserBadge.user_id == user_id, col(UserBadge.code).in_(candidates)
+        )
+    ).all()
+    pending = [rule for code, rule in candidates.items() if code not in earned]
+
+    metrics: dict[str, int] = {}
+    loaded: set[MetricLoader] = set()
+    for rule in pending:
+        loader = METRIC_LOADERS[rule.metric]
+        if loader not in loaded:
+            metrics.update(loader(session, user_id))
+            loaded.add(loader)
+
+    awarded = sorted(
+        rule.code for rule in pending if metrics[rule.metric] >= rule.threshold
+    )
+    if awarded:
+        awarded_at = datetime.now(timezone.utc)
+        session.execute(
+            pg_insert(UserBadge)
+            .values(
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "user_id": user_id,
+                        "code": code,
+                        "awarded_at": awarded_at,
+                    }
+                    for code in awarded
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "code"])
+        )
+    return awarded
+
+
+def apply_action_logs(session: Session, logs: Sequence[UserActionLog]) -> None:
+    """
+    Evaluate badges for freshly inserted action logs. Must run after the
+    streaks have been advanced for the same logs.
+    """
+    inputs: dict[uuid.UUID, set[str]] = defaultdict(set)
+    for log in logs:
+        if log.status == ActionLogStatus.COMPLETED:
+            inputs[log.user_id].update((action_input(log.action_type), STREAK_INPUT))
+    for user_id in sorted(inputs):
+        evaluate(session, user_id, inputs[user_id])
+
+
+def apply_referral_claim(session: Session, referral: Referral) -> None:
+    evaluate(session, referral.referrer_user_id, [REFERRAL_INPUT])
+
+
+def backfill(session: Session, *, user_ids: Sequence[uuid.UUID]) -> int:
+    """
+    Evaluate every rule for `user_ids`; badges are never revoked.
+    """
+    all_inputs = set(RULES_BY_INPUT)
+    awarded = sum(len(evaluate(session, user_id, all_inputs)) for user_id in user_ids)
+    session.commit()
+    return awarded
@@ -0,0 +1,179 @@
+"""
+Best-time-to-call recommendations per representative target.
+
+`rebuild` folds recent completed calls into 168 hour-of-week buckets per
+target, counting answered and voicemail outcomes, and ranks the buckets once.
+Reads then only look up the target's row and shift the ranked hours into the
+caller's timezone, minutes included for zones off the whole hour.
+"""
+
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Integer, cast, delete, extract, insert
+from sqlmodel import Session, col, func, select
+
+from app.core.timewindows import resolve_zone
+from app.models import (
+    ActionLogStatus,
+    ActionOutcome,
+    ActionType,
+    CallWindowPublic,
+    TargetCallWindow,
+    UserActionLog,
+)
+
+HOURS_PER_WEEK = 168
+MINUTES_PER_WEEK = HOURS_PER_WEEK * 60
+LOOKBACK_DAYS = 180
+# Buckets with fewer reached calls are too noisy to recommend.
+MIN_CALLS = 3
+MAX_WINDOWS = 3
+
+
+def _smoothed_rate(answered: int, reached: int) -> float:
+    return (answered + 1) / (reached + 2)
+
+
+def best_hours(
+    answered: Sequence[int], voicemail: Sequence[int], *, limit: int = MAX_WINDOWS
+) -> list[int]:
+    """
+    The `limit` hours of week with at least `MIN_CALLS` reached calls, ranked
+    by their Laplace-smoothed answer rate so that small samples are not
+    overrated.
+    """
+    candidates = [
+        hour
+        for hour in range(HOURS_PER_WEEK)
+        if answered[hour] + voicemail[hour] >= MIN_CALLS
+    ]
+    candidates.sort(
+        key=lambda hour: (
+            -_smoothed_rate(answered[hour], answered[hour] + voicemail[hour]),
+            -(answered[hour] + voicemail[hour]),
+            hour,
+        )
+    )
+    return candidates[:limit]
+
+
+def rebuild(session: Session, *, lookback_days: int = LOOKBACK_DAYS) -> int:
+    """
+    Replace every target's histogram with counts from the last
+    `lookback_days` of completed calls, in one grouped query.
+    """
+    built_at = datetime.now(timezone.utc)
+    created_at = func.timezone("UTC", col(UserActionLog.created_at))
+    hour_of_week = cast(
+        (extract("isodow", created_at) - 1) * 24 + extract("hour", created_at),
+        Integer,
+    )
+    rows = session.exec(
+        select(
+            col(UserActionLog.target_id),
+            hour_of_week,
+            func.count().filter(col(UserActionLog.outcome) == ActionOutcome.ANSWERED),
+            func.count().filter(col(UserActionLog.outcome) == ActionOutcome.VOICEMAIL),
+        )
+        .where(
+            col(UserActionLog.target_id).is_not(None),
+            col(UserActionLog.action_type) == ActionType.CALL,
+            col(UserActionLog.status) == ActionLogStatus.COMPLETED,
+            col(UserActionLog.outcome).in_(
+                [ActionOutcome.ANSWERED, ActionOutcome.VOICEMAIL]
+            ),
+            col(UserActionLog.created_at) >= built_at - timedelta(days=lookback_days),
+        )
+        .group_by(col(UserActionLog.target_id), hour_of_week)
+    ).all()
+
+    histograms: dict[uuid.UUID, tuple[list[int], list[int]]] = {}
+    for target_id, hour, answered, voicemail in rows:
+        assert target_id is not None
+        target_answered, target_voicemail = histograms.setdefault(
+            target_id, ([0] * HOURS_PER_WEEK, [0] * HOURS_PER_WEEK)
+        )
+        target_answered[hour] = answered
+        target_voicemail[hour] = voicemail
+
+    session.execute(delete(TargetCallWindow))
+    if histograms:
+        session.execute(
+            insert(TargetCallWindow),
+            [
+                {
+                    "target_id": target_id,
+                    "answered": answered,
+                    "voicemail": voicemail,
+                    "best_hours": best_hours(answered, voicemail),
+                    "built_at": built_at,
+                }
+                for target_id, (answered, voicemail) in histograms.items()
+            ],
+        )
+    session.commit()
+    return len(histograms)
+
+
+def _local_now(timezone_name: str | None, now: datetime | None) -> datetime:
+    return (now or datetime.now(timezone.utc)).astimezone(resolve_zone(timezone_name))
+
+
+def _local_window(
+    call_window: TargetCallWindow, hour: int, *, local_now: datetime
+) -> CallWindowPublic:
+    offset = int((local_now.utcoffset() or timedelta()).total_seconds() // 60)
+    start = (hour * 60 + offset) % MINUTES_PER_WEEK
+    answered = call_window.answered[hour]
+    calls = answered + call_window.voicemail[hour]
+    return CallWindowPublic(
+        weekday=start // (24 * 60),
+        hour=start // 60 % 24,
+        minute=start % 60,
+        answer_rate=answered / calls,
+        calls=calls,
+    )
+
+
+def local_windows(
+    call_window: TargetCallWindow,
+    *,
+    timezone_name: str | None,
+    now: datetime | None = None,
+) -> list[CallWindowPublic]:
+    """
+    The recommended windows of `call_window`, best first, shifted by the
+    current UTC offset of `timezone_name`.
+    """
+    local_now = _local_now(timezone_name, now)
+    return [
+        _local_window(call_window, hour, local_now=local_now)
+        for hour in call_window.best_hours
+    ]
+
+
+def best_window_today(
+    call_window: TargetCallWindow,
+    *,
+    timezone_name: str | None,
+    now: datetime | None = None,
+) -> CallWindowPublic | None:
+    """
+    The best window of `call_window` that has not ended yet on the current
+    local day of `timezone_name`. Ranked over every hour of the histogram, as
+    the week's best hours often fall on other days.
+    """
+    local_now = _local_now(timezone_name, now)
+    elapsed = local_now.hour * 60 + local_now.minute
+    for hour in best_hours(
+        call_window.answered, call_window.voicemail, limit=HOURS_PER_WEEK
+    ):
+        window = _local_window(call_window, hour, local_now=local_now)
+        if (
+            window.weekday == local_now.weekday()
+            and window.hour * 60 + window.minute + 60 > elapsed
+        ):
+            return window
+    return None
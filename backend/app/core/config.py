@@ -90,6 +90,33 @@ class Settings(BaseSettings):
     def emails_enabled(self) -> bool:
         return bool(self.SMTP_HOST and self.EMAILS_FROM_EMAIL)
 
+    # Platform and campaign impact responses are shared by every user, so they
+    # are cached in-process per aligned time bucket of this length.
+    IMPACT_CACHE_TTL_SECONDS: int = 30
+    IMPACT_CACHE_MAX_ENTRIES: int = 1024
+    # Each user's today list, keyed by local day and a plan/template version.
+    # The TTL only bounds how long rebuilt call windows take to show up.
+    TODAY_CACHE_TTL_SECONDS: int = 300
+    TODAY_CACHE_MAX_ENTRIES: int = 10000
+    # Optional write-behind mode for POST /actions/log: logs are queued in
+    # process and written in batches of up to ACTION_LOG_FLUSH_ROWS rows, at
+    # least every ACTION_LOG_FLUSH_INTERVAL_MS. A request waits at most
+    # ACTION_LOG_ENQUEUE_TIMEOUT_MS for room in a full queue before a 503.
+    ACTION_LOG_WRITE_BEHIND: bool = False
+    ACTION_LOG_QUEUE_MAX_ROWS: int = 10000
+    ACTION_LOG_FLUSH_ROWS: int = 500
+    ACTION_LOG_FLUSH_INTERVAL_MS: int = 10
+    ACTION_LOG_ENQUEUE_TIMEOUT_MS: int = 100
+    # Idempotency keys only need to outlive client retries; the
+    # expire-idempotency-keys maintenance task clears older ones.
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 48
+    # Rendered share card images, keyed by a hash of their content.
+    SHARE_CARD_CACHE_TTL_SECONDS: int = 3600
+    SHARE_CARD_MAX_AGE_SECONDS: int = 300
+    # Actor-basis geo impact leaves out regions with fewer distinct users, so
+    # exact counts never describe a handful of people.
+    GEO_MIN_ACTORS: int = 10
+
     EMAIL_TEST_USER: EmailStr = "test@example.com"
     FIRST_SUPERUSER: EmailStr
     FIRST_SUPERUSER_PASSWORD: str
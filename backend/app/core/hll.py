@@ -0,0 +1,73 @@
+"""
+HyperLogLog cardinality sketches.
+
+A sketch is a fixed array of `REGISTER_COUNT` one-byte registers, so it can be
+stored as a compact byte string and merged with other sketches by taking the
+register-wise maximum. With `PRECISION = 11` every sketch is 2 KiB and the
+standard error of an estimate is 1.04 / sqrt(2048) ~= 2.3%; about 95% of
+estimates fall within +/-4.6% of the true count. Small cardinalities use
+linear counting, which is far more accurate than the asymptotic bound.
+"""
+
+import hashlib
+import math
+import uuid
+from collections.abc import Iterable
+
+PRECISION = 11
+REGISTER_COUNT = 1 << PRECISION
+STANDARD_ERROR = 1.04 / math.sqrt(REGISTER_COUNT)
+
+_HASH_BITS = 64
+_ALPHA = 0.7213 / (1 + 1.079 / REGISTER_COUNT)
+
+
+def register_update(value: uuid.UUID) -> tuple[int, int]:
+    """
+    Return the (register index, rank) pair that `value` contributes.
+
+    Adding a value to a sketch sets `registers[index] = max(registers[index],
+    rank)`, which lets the database apply updates atomically without
+    reading the sketch first.
+    """
+    digest = hashlib.blake2b(value.bytes, digest_size=8).digest()
+    hashed = int.from_bytes(digest, "big")
+    index = hashed >> (_HASH_BITS - PRECISION)
+    remainder = hashed & ((1 << (_HASH_BITS - PRECISION)) - 1)
+    rank = (_HASH_BITS - PRECISION) - remainder.bit_length() + 1
+    return index, rank
+
+
+class HyperLogLog:
+    def __init__(self, registers: bytes | None = None) -> None:
+        if registers is not None and len(registers) != REGISTER_COUNT:
+            raise ValueError(f"Sketch must have {REGISTER_COUNT} registers")
+        self._registers = bytearray(registers or bytes(REGISTER_COUNT))
+
+    @classmethod
+    def from_values(cls, values: Iterable[uuid.UUID]) -> "HyperLogLog":
+        sketch = cls()
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    def add(self, value: uuid.UUID) -> None:
+        index, rank = register_update(value)
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def merge(self, registers: bytes) -> None:
+        if len(registers) != REGISTER_COUNT:
+            raise ValueError(f"Sketch must have {REGISTER_COUNT} registers")
+        self._registers = bytearray(map(max, self._registers, registers))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._registers)
+
+    def estimate(self) -> int:
+        harmonic_sum = math.fsum(2.0**-register for register in self._registers)
+        raw_estimate = _ALPHA * REGISTER_COUNT * REGISTER_COUNT / harmonic_sum
+        zero_registers = self._registers.count(0)
+        if raw_estimate <= 2.5 * REGISTER_COUNT and zero_registers:
+            return round(REGISTER_COUNT * math.log(REGISTER_COUNT / zero_registers))
+        return round(raw_estimate)
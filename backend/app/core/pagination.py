@@ -0,0 +1,87 @@
+"""
+Keyset pagination over `(created_at, id)`, newest first.
+
+A page ends with an opaque cursor holding the sort key of its last row. The
+next page starts right after that key, so fetching it costs the same however
+deep it is, unlike `OFFSET`, which reads and discards every skipped row.
+Where `created_at` is nullable, missing values sort as `NO_CREATED_AT`, after
+every real timestamp.
+"""
+
+import base64
+import uuid
+from datetime import datetime, timezone
+from typing import Any, NamedTuple, TypeVar
+
+from sqlalchemy import func, literal, tuple_
+from sqlmodel import Session, SQLModel
+from sqlmodel.sql.expression import SelectOfScalar
+
+T = TypeVar("T", bound=SQLModel)
+
+NO_CREATED_AT = datetime.min.replace(tzinfo=timezone.utc)
+
+
+class Cursor(NamedTuple):
+    created_at: datetime
+    id: uuid.UUID
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    raw = f"{cursor.created_at.isoformat()}|{cursor.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(value: str) -> Cursor:
+    """
+    Parse a cursor from `encode_cursor`; raises ValueError for anything else.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode()
+        created_at, id_ = raw.split("|")
+        cursor = Cursor(datetime.fromisoformat(created_at), uuid.UUID(id_))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {value!r}") from None
+    if cursor.created_at.tzinfo is None:
+        raise ValueError(f"Invalid cursor: {value!r}")
+    return cursor
+
+
+def keyset_page(
+    session: Session,
+    statement: SelectOfScalar[T],
+    model: type[T],
+    *,
+    limit: int,
+    skip: int = 0,
+    after: Cursor | None = None,
+) -> tuple[list[T], str | None]:
+    """
+    One page of `statement`'s rows ordered by `model`'s `created_at` and `id`,
+    both descending, starting after the `after` cursor or, without one, at
+    offset `skip`. Returns the rows and the cursor of the next page, which is
+    None on the last page.
+    """
+    if limit < 1:
+        return [], None
+    table: Any = model.__table__  # type: ignore[attr-defined]
+    created_at = table.c.created_at
+    if created_at.nullable:
+        created_at = func.coalesce(created_at, literal(NO_CREATED_AT, created_at.type))
+    sort_key = tuple_(created_at, table.c.id)
+    statement = statement.order_by(created_at.desc(), table.c.id.desc()).limit(
+        limit + 1
+    )
+    if after is not None:
+        statement = statement.where(
+            sort_key < tuple_(literal(after.created_at), literal(after.id))
+        )
+    elif skip:
+        statement = statement.offset(skip)
+    rows = list(session.exec(statement).all())
+    if len(rows) <= limit:
+        return rows, None
+    last: Any = rows[limit - 1]
+    return rows[:limit], encode_cursor(
+        Cursor(last.created_at or NO_CREATED_AT, last.id)
+    )
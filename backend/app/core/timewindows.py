@@ -0,0 +1,98 @@
+"""
+Time windows for `window=7d` style query parameters.
+
+A window runs until now and starts on an hour or day boundary `days` before
+the current bucket, so every request within a bucket resolves to the same
+start and can share a cache entry. Day-aligned UTC windows start at midnight
+and are therefore made of whole rollup days, with no partial day read from
+the raw logs.
+"""
+
+from datetime import datetime, time, timedelta, timezone, tzinfo
+from enum import Enum
+from typing import NamedTuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+MAX_WINDOW_DAYS = 365
+
+
+class WindowAlign(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+
+class TimeWindow(NamedTuple):
+    days: int
+    start: datetime
+
+
+def resolve_zone(timezone_name: str | None) -> tzinfo:
+    """
+    The named IANA zone, falling back to UTC for missing or unknown names.
+    """
+    try:
+        return ZoneInfo(timezone_name) if timezone_name else timezone.utc
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def parse_window_days(value: str) -> int:
+    value = value.strip().lower()
+    if not value.endswith("d") or not value[:-1].isdigit():
+        raise ValueError("Window must be like 7d or 30d")
+    days = int(value[:-1])
+    if days <= 0 or days > MAX_WINDOW_DAYS:
+        raise ValueError(f"Window days must be between 1 and {MAX_WINDOW_DAYS}")
+    return days
+
+
+def align_floor(
+    value: datetime, align: WindowAlign, timezone_name: str | None = None
+) -> datetime:
+    """
+    Start of the hour or local day containing `value`, in UTC.
+    """
+    local = value.astimezone(resolve_zone(timezone_name))
+    if align == WindowAlign.HOUR:
+        floor = local.replace(minute=0, second=0, microsecond=0)
+    else:
+        floor = datetime.combine(local.date(), time.min, tzinfo=local.tzinfo)
+    return floor.astimezone(timezone.utc)
+
+
+def window_start(
+    days: int,
+    *,
+    align: WindowAlign = WindowAlign.DAY,
+    timezone_name: str | None = None,
+    now: datetime | None = None,
+) -> datetime:
+    """
+    Start of a `days` long window ending at `now`. Day-aligned windows step
+    back in local calendar days, so they start at local midnight across
+    daylight saving changes.
+    """
+    floor = align_floor(now or datetime.now(timezone.utc), align, timezone_name)
+    if align == WindowAlign.HOUR:
+        return floor - timedelta(days=days)
+    zone = resolve_zone(timezone_name)
+    local_day = floor.astimezone(zone).date() - timedelta(days=days)
+    return datetime.combine(local_day, time.min, tzinfo=zone).astimezone(timezone.utc)
+
+
+def time_window(
+    value: str,
+    *,
+    align: WindowAlign = WindowAlign.DAY,
+    timezone_name: str | None = None,
+    now: datetime | None = None,
+) -> TimeWindow:
+    """
+    Parse `value` (like `7d`) into its days and aligned start. Raises
+    ValueError for malformed or out-of-range windows.
+    """
+    days = parse_window_days(value)
+    return TimeWindow(
+        days=days,
+        start=window_start(days, align=align, timezone_name=timezone_name, now=now),
+    )
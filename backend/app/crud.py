@@ -1,10 +1,20 @@
 import uuid
+from collections.abc import Sequence
 from typing import Any
 
 from sqlmodel import Session, select
 
+from app import badges, idempotency, rollups, sketches, streaks
 from app.core.security import get_password_hash, verify_password
-from app.models import Item, ItemCreate, User, UserCreate, UserUpdate
+from app.models import (
+    Item,
+    ItemCreate,
+    User,
+    UserActionLog,
+    UserActionLogCreate,
+    UserCreate,
+    UserUpdate,
+)
 
 
 def create_user(*, session: Session, user_create: UserCreate) -> User:
@@ -66,3 +76,53 @@ def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -
     session.commit()
     session.refresh(db_item)
     return db_item
+
+
+def record_action_logs(
+    *, session: Session, action_logs: Sequence[UserActionLog]
+) -> None:
+    """
+    Update every derived impact structure for newly added action logs.
+
+    Must run in the same transaction that inserts the logs.
+    """
+    rollups.apply_action_logs(session, action_logs)
+    sketches.apply_action_logs(session, action_logs)
+    streaks.apply_action_logs(session, action_logs)
+    badges.apply_action_logs(session, action_logs)
+
+
+def create_action_log(
+    *, session: Session, action_log_in: UserActionLogCreate, user_id: uuid.UUID
+) -> UserActionLog:
+    db_action_log = UserActionLog.model_validate(
+        action_log_in, update={"user_id": user_id}
+    )
+    if db_action_log.idempotency_key is not None:
+        [(stored, _)] = create_action_logs(session=session, action_logs=[db_action_log])
+        return stored
+    session.add(db_action_log)
+    record_action_logs(session=session, action_logs=[db_action_log])
+    session.commit()
+    session.refresh(db_action_log)
+    return db_action_log
+
+
+def create_action_logs(
+    *, session: Session, action_logs: Sequence[UserActionLog]
+) -> list[tuple[UserActionLog, bool]]:
+    """
+    Insert validated action logs with one multi-row statement and update the
+    derived structures in the same transaction.
+
+    Logs whose idempotency key was already used are not inserted again; the
+    original log is returned in their place, flagged as not inserted.
+    """
+    if not action_logs:
+        return []
+    stored = idempotency.insert_action_logs(session, action_logs)
+    record_action_logs(
+        session=session, action_logs=[log for log, inserted in stored if inserted]
+    )
+    session.commit()
+    return stored
@@ -0,0 +1,164 @@
+"""
+Streaming exports for campaign organizers.
+
+Rows are read through a server-side cursor and encoded in batches, so memory
+stays flat however many rows a campaign has. Participants are only named when
+they opted into public visibility; everyone else appears under a stable
+pseudonym that cannot be reversed without the server's secret key.
+"""
+
+import csv
+import hashlib
+import hmac
+import io
+import json
+import uuid
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime
+from enum import Enum
+from itertools import islice
+from typing import Any
+
+from sqlalchemy import select
+from sqlmodel import Session, col
+
+from app.analytics import utc_day
+from app.core.config import settings
+from app.models import (
+    ExportFormat,
+    ImpactDailyRollup,
+    UserActionLog,
+    UserProfile,
+    VisibilityMode,
+)
+
+EXPORT_BATCH_SIZE = 1000
+
+ACTION_COLUMNS = (
+    "id",
+    "created_at",
+    "participant",
+    "target_id",
+    "template_id",
+    "action_type",
+    "status",
+    "outcome",
+    "confidence_score",
+)
+
+IMPACT_COLUMNS = ("day", "target_id", "action_type", "status", "action_count")
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def pseudonym(user_id: uuid.UUID) -> str:
+    digest = hmac.new(settings.SECRET_KEY.encode(), user_id.bytes, hashlib.sha256)
+    return f"anon-{digest.hexdigest()[:16]}"
+
+
+def action_rows(
+    session: Session, *, campaign_id: uuid.UUID, start: datetime
+) -> Iterator[dict[str, Any]]:
+    statement = (
+        select(
+            col(UserActionLog.id),
+            col(UserActionLog.created_at),
+            col(UserActionLog.user_id),
+            col(UserActionLog.target_id),
+            col(UserActionLog.template_id),
+            col(UserActionLog.action_type),
+            col(UserActionLog.status),
+            col(UserActionLog.outcome),
+            col(UserActionLog.confidence_score),
+            col(UserProfile.username),
+            col(UserProfile.visibility_mode),
+        )
+        .outerjoin(UserProfile, col(UserProfile.user_id) == col(UserActionLog.user_id))
+        .where(
+            col(UserActionLog.campaign_id) == campaign_id,
+            col(UserActionLog.created_at) >= start,
+        )
+        .order_by(col(UserActionLog.created_at), col(UserActionLog.id))
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    for row in session.execute(statement):
+        values = dict(row._mapping)
+        user_id = values.pop("user_id")
+        username = values.pop("username")
+        public = values.pop("visibility_mode") == VisibilityMode.PUBLIC_OPT_IN
+        values["participant"] = username if public and username else pseudonym(user_id)
+        yield values
+
+
+def impact_rows(
+    session: Session, *, campaign_id: uuid.UUID, start: datetime
+) -> Iterator[dict[str, Any]]:
+    statement = (
+        select(
+            col(ImpactDailyRollup.day),
+            col(ImpactDailyRollup.target_id),
+            col(ImpactDailyRollup.action_type),
+            col(ImpactDailyRollup.status),
+            col(ImpactDailyRollup.action_count),
+        )
+        .where(
+            col(ImpactDailyRollup.campaign_id) == campaign_id,
+            col(ImpactDailyRollup.day) >= utc_day(start),
+        )
+        .order_by(
+            col(ImpactDailyRollup.day),
+            col(ImpactDailyRollup.target_id),
+            col(ImpactDailyRollup.action_type),
+            col(ImpactDailyRollup.status),
+        )
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    for row in session.execute(statement):
+        yield dict(row._mapping)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _batches(rows: Iterable[dict[str, Any]]) -> Iterator[list[dict[str, Any]]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, EXPORT_BATCH_SIZE)):
+        yield batch
+
+
+def encode(
+    rows: Iterable[dict[str, Any]],
+    *,
+    export_format: ExportFormat,
+    columns: tuple[str, ...],
+) -> Iterator[str]:
+    """
+    Encode `rows` as NDJSON or CSV (with a header row), one chunk per batch.
+    """
+    if export_format == ExportFormat.NDJSON:
+        for batch in _batches(rows):
+            yield "".join(
+                json.dumps({name: _plain(row[name]) for name in columns}) + "\n"
+                for row in batch
+            )
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for batch in _batches(rows):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_plain(row[name]) for name in columns] for row in batch)
+        yield buffer.getvalue()
@@ -0,0 +1,243 @@
+"""
+Idempotency keys for client retries.
+
+A create request may carry a client-chosen key, stored on the row it creates
+under a unique index per owner. Rows are inserted with ON CONFLICT DO NOTHING
+and, in the same statement, the rows that already hold any of the keys are
+read back, so a retry gets the original row in one round trip and two
+concurrent attempts cannot both insert. Keys only need to outlive client
+retries; `expire` clears them afterwards.
+
+Action logs are partitioned by `created_at`, which a unique index on them
+would have to include, so their keys are claimed in ActionLogIdempotencyKey
+before the logs are inserted.
+"""
+
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, TypeVar
+
+from sqlalchemy import delete, func, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, SQLModel, col
+
+from app.models import ActionLogIdempotencyKey, Referral, UserActionLog
+
+M = TypeVar("M", bound=SQLModel)
+
+
+def _key(row: Any, owner: str) -> tuple[Any, str]:
+    return getattr(row, owner), row.idempotency_key
+
+
+def insert(
+    session: Session, model: type[M], rows: Sequence[M], *, owner: str
+) -> list[tuple[M, bool]]:
+    """
+    Insert `rows`, skipping those whose (owner, idempotency_key) is already
+    taken. Returns, in order, the stored row for every input and whether it
+    was inserted by this call.
+    """
+    items: list[Any] = list(rows)
+    table: Any = model.__table__  # type: ignore[attr-defined]
+    owner_column = table.c[owner]
+    key_column = table.c.idempotency_key
+    keys = {_key(item, owner) for item in items if item.idempotency_key is not None}
+    inserted = (
+        pg_insert(table)
+        .values([item.model_dump() for item in items])
+        .on_conflict_do_nothing(
+            index_elements=[owner_column, key_column],
+            index_where=key_column.is_not(None),
+        )
+        .returning(*table.c, literal(True).label("inserted"))
+        .cte("inserted")
+    )
+    statement: Any = select(inserted)
+    if keys:
+        statement = statement.union_all(
+            select(*table.c, literal(False)).where(
+                tuple_(owner_column, key_column).in_(keys)
+            )
+        )
+
+    inserted_ids = set()
+    originals: dict[tuple[Any, str], Any] = {}
+    for result in session.execute(statement):
+        values = dict(result._mapping)
+        if values.pop("inserted"):
+            inserted_ids.add(values["id"])
+        else:
+            original = model(**values)
+            originals[_key(original, owner)] = original
+
+    # A key repeated within `rows` resolves to the row inserted for it; one
+    # claimed by a transaction that committed while this insert waited on it
+    # is not in the statement's snapshot and is read back separately.
+    for item in items:
+        if item.id in inserted_ids and item.idempotency_key is not None:
+            originals[_key(item, owner)] = item
+    missing = keys - set(originals)
+    if missing:
+        for found in session.scalars(
+            select(model).where(tuple_(owner_column, key_column).in_(missing))
+        ):
+            originals[_key(found, owner)] = found
+
+    return [
+        (item, True)
+        if item.id in inserted_ids
+        else (originals[_key(item, owner)], False)
+        for item in items
+    ]
+
+
+def insert_action_logs(
+    session: Session, logs: Sequence[UserActionLog]
+) -> list[tuple[UserActionLog, bool]]:
+    """
+    `insert` for action logs: claim the keys of `logs`, then insert the logs
+    that claimed theirs or carry none. A key whose log no longer exists is
+    taken over, and its retry is inserted as a new log.
+    """
+    keyed: dict[tuple[Any, str], UserActionLog] = {}
+    for log in logs:
+        if log.idempotency_key is not None:
+            keyed.setdefault(_key(log, "user_id"), log)
+    claims: dict[tuple[Any, str], tuple[Any, Any]] = {}
+    if keyed:
+        table: Any = ActionLogIdempotencyKey.__table__  # type: ignore[attr-defined]
+        key_columns = tuple_(table.c.user_id, table.c.idempotency_key)
+        columns = (
+            table.c.user_id,
+            table.c.idempotency_key,
+            table.c.log_id,
+            table.c.log_created_at,
+        )
+        claimed = (
+            pg_insert(table)
+            .values(
+                [
+                    {
+                        "user_id": log.user_id,
+                        "idempotency_key": log.idempotency_key,
+                        "log_id": log.id,
+                        "log_created_at": log.created_at,
+                        "claimed_at": func.now(),
+                    }
+                    for log in keyed.values()
+                ]
+            )
+            .on_conflict_do_nothing()
+            .returning(*columns)
+            .cte("claimed")
+        )
+        statement: Any = select(claimed).union_all(
+            select(*columns).where(key_columns.in_(list(keyed)))
+        )
+        rows = list(session.execute(statement))
+        # Keys claimed by a transaction that committed while this one waited
+        # on them are not in the statement's snapshot.
+        missing = set(keyed) - {(row[0], row[1]) for row in rows}
+        if missing:
+            rows += session.execute(select(*columns).where(key_columns.in_(missing)))
+        claims = {(row[0], row[1]): (row[2], row[3]) for row in rows}
+
+    originals = _action_logs(
+        session, {claim for key, claim in claims.items() if claim[0] != keyed[key].id}
+    )
+    for key, (log_id, _) in claims.items():
+        if log_id == keyed[key].id or log_id in originals:
+            continue
+        # The claimed log is gone (deleted with its user or campaign, or its
+        # partition detached), so the retry takes the key over and is logged
+        # afresh. Only one of several concurrent retries can swap the claim.
+        log = keyed[key]
+        taken: Any = session.execute(
+            update(ActionLogIdempotencyKey)
+            .where(
+                col(ActionLogIdempotencyKey.user_id) == key[0],
+                col(ActionLogIdempotencyKey.idempotency_key) == key[1],
+                col(ActionLogIdempotencyKey.log_id) == log_id,
+            )
+            .values(log_id=log.id, log_created_at=log.created_at, claimed_at=func.now())
+        )
+        if taken.rowcount:
+            claims[key] = (log.id, log.created_at)
+        else:
+            claims[key] = tuple(
+                session.execute(
+                    select(
+                        col(ActionLogIdempotencyKey.log_id),
+                        col(ActionLogIdempotencyKey.log_created_at),
+                    ).where(
+                        col(ActionLogIdempotencyKey.user_id) == key[0],
+                        col(ActionLogIdempotencyKey.idempotency_key) == key[1],
+                    )
+                ).one()
+            )
+
+    fresh = [
+        log
+        for log in logs
+        if log.idempotency_key is None or claims[_key(log, "user_id")][0] == log.id
+    ]
+    if fresh:
+        session.execute(
+            pg_insert(UserActionLog).values([log.model_dump() for log in fresh])
+        )
+    fresh_ids = {log.id for log in fresh}
+    unread = {
+        claims[_key(log, "user_id")]
+        for log in logs
+        if log.id not in fresh_ids and claims[_key(log, "user_id")][0] not in originals
+    }
+    originals.update(_action_logs(session, unread))
+    return [
+        (log, True)
+        if log.id in fresh_ids
+        else (originals[claims[_key(log, "user_id")][0]], False)
+        for log in logs
+    ]
+
+
+def _action_logs(
+    session: Session, claims: set[tuple[Any, Any]]
+) -> dict[Any, UserActionLog]:
+    """
+    The action logs with the given (id, created_at) claims, by id.
+    """
+    if not claims:
+        return {}
+    return {
+        log.id: log
+        for log in session.scalars(
+            select(UserActionLog).where(
+                tuple_(col(UserActionLog.id), col(UserActionLog.created_at)).in_(claims)
+            )
+        )
+    }
+
+
+def expire(session: Session, *, older_than: datetime) -> int:
+    """
+    Release the idempotency keys claimed before `older_than`. Returns the
+    number of released keys.
+    """
+    released: Any = session.execute(
+        delete(ActionLogIdempotencyKey).where(
+            col(ActionLogIdempotencyKey.claimed_at) < older_than
+        )
+    )
+    # Only live keys are in the partial unique index, so this stays bounded
+    # by the keys issued within the TTL.
+    cleared: Any = session.execute(
+        update(Referral)
+        .where(
+            col(Referral.idempotency_key).is_not(None),
+            col(Referral.created_at) < older_than,
+        )
+        .values(idempotency_key=None)
+    )
+    session.commit()
+    return int(released.rowcount + cleared.rowcount)
@@ -0,0 +1,225 @@
+"""
+Write-behind ingestion for action logs.
+
+Validated logs are put on a bounded in-process queue and a flusher thread
+writes them in multi-row batches, either every `flush_interval_seconds` or as
+soon as `flush_rows` are waiting. A full queue pushes back on the caller
+instead of growing, and `stop` writes everything still queued before it
+returns, or fails what it could not write in time. Logs that are only queued
+are lost if the process dies, so every submission returns a receipt that can
+be awaited when a caller needs the row to be durable.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from sqlmodel import Session
+
+from app import crud
+from app.models import UserActionLog
+
+logger = logging.getLogger(__name__)
+
+
+class IngestQueueFull(Exception):
+    pass
+
+
+class IngestStopped(Exception):
+    pass
+
+
+@dataclass
+class IngestReceipt:
+    log: UserActionLog
+    done: threading.Event = field(default_factory=threading.Event)
+    error: BaseException | None = None
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Block until the log has been written; False if it is still queued
+        after `timeout`. Raises the write error if the log was dropped.
+        """
+        if not self.done.wait(timeout):
+            return False
+        if self.error is not None:
+            raise self.error
+        return True
+
+
+@dataclass
+class IngestStats:
+    queued: int = 0
+    written: int = 0
+    failed: int = 0
+    batches: int = 0
+
+
+class ActionLogWriter:
+    def __init__(
+        self,
+        *,
+        session_factory: Callable[[], Session],
+        max_queue_rows: int,
+        flush_rows: int,
+        flush_interval_seconds: float,
+    ) -> None:
+        self.flush_rows = flush_rows
+        self.flush_interval_seconds = flush_interval_seconds
+        self._session_factory = session_factory
+        self._queue: queue.Queue[IngestReceipt] = queue.Queue(maxsize=max_queue_rows)
+        self._lock = threading.Lock()
+        # Signalled whenever a submission finishes putting its log.
+        self._submitted = threading.Condition(self._lock)
+        self._submitting = 0
+        self._stats = IngestStats()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and not self._stopping.is_set()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="action-log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Stop accepting logs and return once every queued log is written. If
+        the flusher is still busy after `timeout` seconds, the logs left in
+        the queue are not written: their receipts fail with `IngestStopped`.
+        """
+        thread = self._thread
+        if thread is None:
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            self._stopping.set()
+        thread.join(timeout)
+        with self._submitted:
+            # Submissions already past the running check still get queued.
+            self._submitted.wait_for(
+                lambda: self._submitting == 0,
+                None if deadline is None else max(deadline - time.monotonic(), 0),
+            )
+        if thread.is_alive():
+            self._fail_queued()
+            return
+        self._thread = None
+        # Logs submitted while the flusher was exiting.
+        while batch := self._next_batch():
+            self._flush(batch)
+
+    def submit(self, log: UserActionLog, *, timeout: float) -> IngestReceipt:
+        """
+        Queue `log`, waiting up to `timeout` seconds for room. Raises
+        `IngestQueueFull` when the flusher cannot keep up.
+        """
+        with self._lock:
+            if not self.running:
+                raise RuntimeError("Action log writer is not running")
+            self._submitting += 1
+        receipt = IngestReceipt(log=log)
+        try:
+            self._queue.put(receipt, timeout=timeout)
+        except queue.Full:
+            raise IngestQueueFull() from None
+        finally:
+            with self._submitted:
+                self._submitting -= 1
+                self._submitted.notify_all()
+        return receipt
+
+    def stats(self) -> IngestStats:
+        with self._lock:
+            return IngestStats(
+                queued=self._queue.qsize(),
+                written=self._stats.written,
+                failed=self._stats.failed,
+                batches=self._stats.batches,
+            )
+
+    def _next_batch(self) -> list[IngestReceipt]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval_seconds)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval_seconds
+        while len(batch) < self.flush_rows:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0 and not self._stopping.is_set():
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._flush(batch)
+            elif self._stopping.is_set():
+                return
+
+    def _write(self, receipts: list[IngestReceipt]) -> None:
+        with self._session_factory() as session:
+            crud.create_action_logs(
+                session=session, action_logs=[receipt.log for receipt in receipts]
+            )
+
+    def _flush(self, batch: list[IngestReceipt]) -> None:
+        try:
+            self._write(batch)
+        except Exception:
+            # One bad row (e.g. a campaign deleted since validation) must not
+            # drop the whole batch, so retry the rows one by one.
+            logger.warning(
+                "Batch of %s action logs failed, retrying singly", len(batch)
+            )
+            for receipt in batch:
+                try:
+                    self._write([receipt])
+                except Exception as error:
+                    logger.exception("Dropped action log %s", receipt.log.id)
+                    receipt.error = error
+                self._finish([receipt])
+        else:
+            self._finish(batch)
+        with self._lock:
+            self._stats.batches += 1
+
+    def _fail_queued(self) -> None:
+        dropped = []
+        while True:
+            try:
+                receipt = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            receipt.error = IngestStopped("Action log writer stopped before the write")
+            dropped.append(receipt)
+        if dropped:
+            logger.error("Dropped %s queued action logs on stop", len(dropped))
+            self._finish(dropped)
+
+    def _finish(self, receipts: list[IngestReceipt]) -> None:
+        with self._lock:
+            for receipt in receipts:
+                if receipt.error is None:
+                    self._stats.written += 1
+                else:
+                    self._stats.failed += 1
+        for receipt in receipts:
+            receipt.done.set()
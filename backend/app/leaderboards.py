@@ -0,0 +1,90 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, delete, insert, literal, select, tuple_
+from sqlmodel import Session, col, func
+
+from app.models import (
+    ActionLogStatus,
+    LeaderboardEntry,
+    UserActionLog,
+    UserPrivacySettings,
+)
+
+# Windows with a maintained leaderboard; other windows are rejected by the API.
+WINDOW_DAYS = (7, 30, 365)
+
+
+def rebuild(session: Session, *, window_days: int) -> int:
+    """
+    Replace the leaderboard for one window with fresh ranks.
+
+    Scores are completed actions since `window_days` ago, ranked per campaign
+    and for the platform in a single grouped query over opted-in users only.
+    The swap happens in one transaction, so readers keep seeing the previous
+    board until the new one commits.
+    """
+    built_at = datetime.now(timezone.utc)
+    campaign_id = col(UserActionLog.campaign_id)
+    user_id = col(UserActionLog.user_id)
+    scores = (
+        select(
+            campaign_id.label("campaign_id"),
+            user_id.label("user_id"),
+            func.count().label("score"),
+        )
+        .join(
+            UserPrivacySettings,
+            and_(
+                col(UserPrivacySettings.user_id) == user_id,
+                col(UserPrivacySettings.show_on_leaderboard),
+            ),
+        )
+        .where(
+            col(UserActionLog.created_at) >= built_at - timedelta(days=window_days),
+            col(UserActionLog.status) == ActionLogStatus.COMPLETED,
+        )
+        .group_by(func.grouping_sets(tuple_(campaign_id, user_id), tuple_(user_id)))
+        .subquery()
+    )
+    ranked = select(
+        func.gen_random_uuid(),
+        literal(window_days),
+        scores.c.campaign_id,
+        scores.c.user_id,
+        scores.c.score,
+        func.rank().over(
+            partition_by=scores.c.campaign_id, order_by=scores.c.score.desc()
+        ),
+        literal(built_at),
+    )
+
+    session.execute(
+        delete(LeaderboardEntry).where(col(LeaderboardEntry.window_days) == window_days)
+    )
+    result = session.execute(
+        insert(LeaderboardEntry).from_select(
+            [
+                "id",
+                "window_days",
+                "campaign_id",
+                "user_id",
+                "score",
+                "rank",
+                "built_at",
+            ],
+            ranked,
+        )
+    )
+    session.commit()
+    return result.rowcount  # type: ignore[attr-defined, no-any-return]
+
+
+def remove_user(session: Session, user_id: uuid.UUID) -> None:
+    """
+    Drop a user from every board as soon as they opt out; the ranks of the
+    remaining users are compacted by the next rebuild.
+    """
+    session.execute(
+        delete(LeaderboardEntry).where(col(LeaderboardEntry.user_id) == user_id)
+    )
@@ -0,0 +1,215 @@
+import argparse
+import logging
+import random
+from collections.abc import Iterator, Sequence
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from sqlmodel import Session, col, select
+
+from app import (
+    badges,
+    call_windows,
+    idempotency,
+    leaderboards,
+    partitions,
+    rollups,
+    sketches,
+    streaks,
+)
+from app.core.config import settings
+from app.core.db import engine
+from app.models import User
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _sample_window(*, days: int, lookback_days: int) -> tuple[date, date]:
+    today = datetime.now(timezone.utc).date()
+    offset = random.randint(0, max(lookback_days - days, 0))
+    end_day = today - timedelta(days=offset)
+    return end_day - timedelta(days=days - 1), end_day
+
+
+def backfill_rollups(session: Session, *, days: int) -> None:
+    end_day = datetime.now(timezone.utc).date()
+    start_day = end_day - timedelta(days=days)
+    rows = rollups.backfill(session, start_day=start_day, end_day=end_day)
+    logger.info("Rebuilt %s rollup rows from %s to %s", rows, start_day, end_day)
+
+
+def backfill_sketches(session: Session, *, days: int) -> None:
+    end_day = datetime.now(timezone.utc).date()
+    start_day = end_day - timedelta(days=days)
+    rows = sketches.backfill(session, start_day=start_day, end_day=end_day)
+    logger.info("Rebuilt %s sketches from %s to %s", rows, start_day, end_day)
+
+
+def _user_id_chunks(session: Session, *, chunk_size: int) -> Iterator[list[Any]]:
+    last_id = None
+    while True:
+        statement = select(User.id).order_by(col(User.id)).limit(chunk_size)
+        if last_id is not None:
+            statement = statement.where(col(User.id) > last_id)
+        user_ids = list(session.exec(statement).all())
+        if not user_ids:
+            return
+        yield user_ids
+        last_id = user_ids[-1]
+
+
+def backfill_streaks(session: Session, *, chunk_size: int) -> None:
+    total = 0
+    for user_ids in _user_id_chunks(session, chunk_size=chunk_size):
+        total += streaks.backfill(session, user_ids=user_ids)
+    logger.info("Rebuilt %s streaks", total)
+
+
+def backfill_badges(session: Session, *, chunk_size: int) -> None:
+    total = 0
+    for user_ids in _user_id_chunks(session, chunk_size=chunk_size):
+        total += badges.backfill(session, user_ids=user_ids)
+    logger.info("Awarded %s badges", total)
+
+
+def rebuild_leaderboards(session: Session) -> None:
+    for window_days in leaderboards.WINDOW_DAYS:
+        rows = leaderboards.rebuild(session, window_days=window_days)
+        logger.info("Ranked %s leaderboard entries for %sd", rows, window_days)
+
+
+def rebuild_call_windows(session: Session, *, lookback_days: int) -> None:
+    targets = call_windows.rebuild(session, lookback_days=lookback_days)
+    logger.info("Rebuilt call windows for %s targets", targets)
+
+
+def expire_idempotency_keys(session: Session, *, ttl_hours: int) -> None:
+    older_than = datetime.now(timezone.utc) - timedelta(hours=ttl_hours)
+    cleared = idempotency.expire(session, older_than=older_than)
+    logger.info("Cleared %s idempotency keys older than %s", cleared, older_than)
+
+
+def create_partitions(session: Session, *, months_ahead: int) -> None:
+    created = partitions.ensure(session, months_ahead=months_ahead)
+    logger.info("Created %s action log partitions: %s", len(created), created)
+
+
+def detach_partitions(session: Session, *, older_than_months: int) -> None:
+    detached = partitions.detach(session, older_than_months=older_than_months)
+    logger.info("Detached %s action log partitions: %s", len(detached), detached)
+
+
+def check_rollups(session: Session, *, days: int, lookback_days: int) -> bool:
+    start_day, end_day = _sample_window(days=days, lookback_days=lookback_days)
+    mismatches = rollups.check_consistency(
+        session, start_day=start_day, end_day=end_day
+    )
+    for mismatch in mismatches:
+        logger.error("Rollup mismatch: %s", mismatch)
+    logger.info(
+        "Checked rollups from %s to %s: %s mismatches",
+        start_day,
+        end_day,
+        len(mismatches),
+    )
+    return not mismatches
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Impact data maintenance tasks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill_parser = commands.add_parser(
+        "backfill-rollups", help="Rebuild daily rollups from raw action logs"
+    )
+    backfill_parser.add_argument("--days", type=int, default=365)
+
+    sketches_parser = commands.add_parser(
+        "backfill-sketches", help="Rebuild daily participant sketches from raw logs"
+    )
+    sketches_parser.add_argument("--days", type=int, default=365)
+
+    streaks_parser = commands.add_parser(
+        "backfill-streaks", help="Recompute every user's streaks from raw logs"
+    )
+    streaks_parser.add_argument("--chunk-size", type=int, default=500)
+
+    badges_parser = commands.add_parser(
+        "backfill-badges", help="Evaluate every badge rule for all users"
+    )
+    badges_parser.add_argument("--chunk-size", type=int, default=500)
+
+    commands.add_parser(
+        "rebuild-leaderboards",
+        help="Re-rank opted-in users for every leaderboard window; run periodically",
+    )
+
+    call_windows_parser = commands.add_parser(
+        "rebuild-call-windows",
+        help="Rebuild every target's hour-of-week answer rates; run periodically",
+    )
+    call_windows_parser.add_argument(
+        "--lookback-days", type=int, default=call_windows.LOOKBACK_DAYS
+    )
+
+    idempotency_parser = commands.add_parser(
+        "expire-idempotency-keys",
+        help="Clear idempotency keys past their TTL; run periodically",
+    )
+    idempotency_parser.add_argument(
+        "--ttl-hours", type=int, default=settings.IDEMPOTENCY_KEY_TTL_HOURS
+    )
+
+    create_partitions_parser = commands.add_parser(
+        "create-partitions",
+        help="Create monthly action log partitions ahead of time; run periodically",
+    )
+    create_partitions_parser.add_argument(
+        "--months-ahead", type=int, default=partitions.MONTHS_AHEAD
+    )
+
+    detach_partitions_parser = commands.add_parser(
+        "detach-partitions",
+        help="Detach action log partitions past retention into standalone tables",
+    )
+    detach_partitions_parser.add_argument(
+        "--older-than-months", type=int, required=True
+    )
+
+    check_parser = commands.add_parser(
+        "check-rollups", help="Compare rollups against raw logs for a sampled window"
+    )
+    check_parser.add_argument("--days", type=int, default=7)
+    check_parser.add_argument("--lookback-days", type=int, default=365)
+
+    args = parser.parse_args(argv)
+    with Session(engine) as session:
+        if args.command == "backfill-rollups":
+            backfill_rollups(session, days=args.days)
+        elif args.command == "backfill-sketches":
+            backfill_sketches(session, days=args.days)
+        elif args.command == "backfill-streaks":
+            backfill_streaks(session, chunk_size=args.chunk_size)
+        elif args.command == "backfill-badges":
+            backfill_badges(session, chunk_size=args.chunk_size)
+        elif args.command == "rebuild-leaderboards":
+            rebuild_leaderboards(session)
+        elif args.command == "rebuild-call-windows":
+            rebuild_call_windows(session, lookback_days=args.lookback_days)
+        elif args.command == "expire-idempotency-keys":
+            expire_idempotency_keys(session, ttl_hours=args.ttl_hours)
+        elif args.command == "create-partitions":
+            create_partitions(session, months_ahead=args.months_ahead)
+        elif args.command == "detach-partitions":
+            detach_partitions(session, older_than_months=args.older_than_months)
+        elif args.command == "check-rollups":
+            if not check_rollups(
+                session, days=args.days, lookback_days=args.lookback_days
+            ):
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,9 +1,9 @@
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from enum import Enum
 
 from pydantic import EmailStr
-from sqlalchemy import DateTime
+from sqlalchemy import ARRAY, DateTime, Index, Integer, LargeBinary, Uuid, text
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -65,7 +65,8 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    count: int | None = None
+    next_cursor: str | None = None
 
 
 # Shared properties
@@ -106,7 +107,8 @@ class ItemPublic(ItemBase):
 
 class ItemsPublic(SQLModel):
     data: list[ItemPublic]
-    count: int
+    count: int | None = None
+    next_cursor: str | None = None
 
 
 class CampaignStatus(str, Enum):
@@ -155,6 +157,33 @@ class ActionOutcome(str, Enum):
     UNKNOWN = "unknown"
 
 
+class SeriesBucket(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+
+
+class GeoLevel(str, Enum):
+    STATE = "state"
+    DISTRICT = "district"
+
+
+class GeoBasis(str, Enum):
+    TARGET = "target"
+    ACTOR = "actor"
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class IngestAck(str, Enum):
+    # Answer once the log is queued, or only once it has been written.
+    ACCEPTED = "accepted"
+    DURABLE = "durable"
+
+
 class CampaignBase(SQLModel):
     slug: str = Field(unique=True, index=True, min_length=1, max_length=100)
     title: str = Field(min_length=1, max_length=255)
@@ -182,7 +211,8 @@ class CampaignPublic(CampaignBase):
 
 class CampaignsPublic(SQLModel):
     data: list[CampaignPublic]
-    count: int
+    count: int | None = None
+    next_cursor: str | None = None
 
 
 class RepresentativeTargetBase(SQLModel):
@@ -200,6 +230,10 @@ class RepresentativeTargetCreate(RepresentativeTargetBase):
 
 
 class RepresentativeTarget(RepresentativeTargetBase, table=True):
+    __table_args__ = (
+        Index("ix_representativetarget_geo", "state_code", "district_code"),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     campaign_id: uuid.UUID = Field(
         foreign_key="campaign.id", nullable=False, ondelete="CASCADE", index=True
@@ -218,7 +252,8 @@ class RepresentativeTargetPublic(RepresentativeTargetBase):
 
 class RepresentativeTargetsPublic(SQLModel):
     data: list[RepresentativeTargetPublic]
-    count: int
+    count: int | None = None
+    next_cursor: str | None = None
 
 
 class ActionTemplateBase(SQLModel):
@@ -262,7 +297,8 @@ class ActionTemplatePublic(ActionTemplateBase):
 
 class ActionTemplatesPublic(SQLModel):
     data: list[ActionTemplatePublic]
-    count: int
+    count: int | None = None
+    next_cursor: str | None = None
 
 
 class UserProfileBase(SQLModel):
@@ -286,6 +322,8 @@ class UserProfileUpdate(SQLModel):
 
 
 class UserProfile(UserProfileBase, table=True):
+    __table_args__ = (Index("ix_userprofile_geo", "state_code", "district_code"),)
+
     user_id: uuid.UUID = Field(
         foreign_key="user.id", primary_key=True, nullable=False, ondelete="CASCADE"
     )
@@ -293,6 +331,13 @@ class UserProfile(UserProfileBase, table=True):
         default_factory=get_datetime_utc,
         sa_type=DateTime(timezone=True),  # type: ignore
     )
+    # Bumped on every profile write, so geography built from profiles can
+    # tell when it changed.
+    updated_at: datetime | None = Field(
+        default_factory=get_datetime_utc,
+        index=True,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
 
 
 class UserProfilePublic(UserProfileBase):
@@ -317,6 +362,15 @@ class UserPrivacySettingsUpdate(SQLModel):
 
 
 class UserPrivacySettings(UserPrivacySettingsBase, table=True):
+    # Lets leaderboard rebuilds reach opted-in users without scanning the rest.
+    __table_args__ = (
+        Index(
+            "ix_userprivacysettings_leaderboard_opt_in",
+            "user_id",
+            postgresql_where=text("show_on_leaderboard"),
+        ),
+    )
+
     user_id: uuid.UUID = Field(
         foreign_key="user.id", primary_key=True, nullable=False, ondelete="CASCADE"
     )
@@ -374,23 +428,40 @@ class UserActionLogBase(SQLModel):
 
 
 class UserActionLogCreate(UserActionLogBase):
-    pass
+    # Client-chosen key (e.g. a UUID) that makes retries return the first log.
+    idempotency_key: str | None = Field(default=None, min_length=1, max_length=255)
 
 
+# Range partitioned by month of `created_at` (see app.partitions), so the
+# primary key and any unique index have to include it.
 class UserActionLog(UserActionLogBase, table=True):
+    # Hot reads filter on one owner column and a `created_at` range. These
+    # indexes replace the single-column ones on the same leading columns; the
+    # campaign index also covers the columns impact counters aggregate.
+    __table_args__ = (
+        Index("ix_useractionlog_user_created", "user_id", "created_at", "id"),
+        Index(
+            "ix_useractionlog_campaign_created",
+            "campaign_id",
+            "created_at",
+            postgresql_include=["action_type", "status", "user_id"],
+        ),
+        Index("ix_useractionlog_target_created", "target_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(
-        foreign_key="user.id", nullable=False, ondelete="CASCADE", index=True
+        foreign_key="user.id", nullable=False, ondelete="CASCADE"
     )
     campaign_id: uuid.UUID = Field(
-        foreign_key="campaign.id", nullable=False, ondelete="CASCADE", index=True
+        foreign_key="campaign.id", nullable=False, ondelete="CASCADE"
     )
     target_id: uuid.UUID | None = Field(
         default=None,
         foreign_key="representativetarget.id",
         nullable=True,
         ondelete="SET NULL",
-        index=True,
     )
     template_id: uuid.UUID | None = Field(
         default=None,
@@ -399,7 +470,198 @@ class UserActionLog(UserActionLogBase, table=True):
         ondelete="SET NULL",
         index=True,
     )
+    # The key the client sent, if any; ActionLogIdempotencyKey holds the live
+    # keys and keeps them unique per user.
+    idempotency_key: str | None = Field(default=None, max_length=255)
     created_at: datetime | None = Field(
+        default_factory=get_datetime_utc,
+        primary_key=True,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+
+
+# Live idempotency keys of action logs. A unique index on the partitioned log
+# table could only be unique per partition, so keys are claimed here first.
+# `log_id` is not a foreign key: one to a partitioned table is cloned onto each
+# partition and would keep months holding referenced logs from being detached.
+class ActionLogIdempotencyKey(SQLModel, table=True):
+    __tablename__ = "action_log_idempotency_key"
+
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", primary_key=True, ondelete="CASCADE"
+    )
+    idempotency_key: str = Field(primary_key=True, max_length=255)
+    log_id: uuid.UUID
+    log_created_at: datetime = Field(sa_type=DateTime(timezone=True))  # type: ignore
+    # Keys expire by when they were claimed: batch logs may be backdated.
+    claimed_at: datetime = Field(
+        default_factory=get_datetime_utc,
+        index=True,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+
+
+# Daily per-campaign/target/type/status action counts, kept in step with
+# UserActionLog inserts so impact reads sum rollup rows instead of raw logs.
+class ImpactDailyRollup(SQLModel, table=True):
+    __tablename__ = "impact_daily_rollup"
+    __table_args__ = (
+        Index(
+            "ix_impact_daily_rollup_key",
+            "day",
+            "campaign_id",
+            "target_id",
+            "action_type",
+            "status",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    day: date = Field(index=True)
+    campaign_id: uuid.UUID = Field(
+        foreign_key="campaign.id", nullable=False, ondelete="CASCADE", index=True
+    )
+    # No foreign key: a deleted target must not collapse its rows into the
+    # campaign-level key and collide with the unique index.
+    target_id: uuid.UUID | None = Field(default=None, index=True)
+    action_type: ActionType
+    status: ActionLogStatus
+    action_count: int = 0
+    last_action_at: datetime | None = Field(
+        default=None,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+
+
+# Per-day HyperLogLog sketch of participating users for a campaign (target_id
+# NULL) or a target. There are no platform rows: platform counts merge the
+# campaign sketches of the day. `members` holds the exact user ids while the
+# day stays small.
+class ImpactDailySketch(SQLModel, table=True):
+    __tablename__ = "impact_daily_sketch"
+    __table_args__ = (
+        Index(
+            "ix_impact_daily_sketch_key",
+            "day",
+            "campaign_id",
+            "target_id",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    day: date = Field(index=True)
+    campaign_id: uuid.UUID | None = Field(
+        default=None, foreign_key="campaign.id", ondelete="CASCADE", index=True
+    )
+    target_id: uuid.UUID | None = Field(default=None, index=True)
+    registers: bytes = Field(sa_type=LargeBinary)
+    members: list[uuid.UUID] = Field(
+        default_factory=list,
+        sa_type=ARRAY(Uuid),  # type: ignore
+    )
+    exact: bool = True
+
+
+# Ranked completed-action counts per window for users who opted in to the
+# leaderboard; the platform board has campaign_id NULL. Rebuilt periodically
+# so reads are index lookups on (window, campaign, rank) or (..., user).
+class LeaderboardEntry(SQLModel, table=True):
+    __tablename__ = "leaderboard_entry"
+    __table_args__ = (
+        Index(
+            "ix_leaderboard_entry_user",
+            "window_days",
+            "campaign_id",
+            "user_id",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+        Index("ix_leaderboard_entry_rank", "window_days", "campaign_id", "rank"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    window_days: int
+    campaign_id: uuid.UUID | None = Field(
+        default=None, foreign_key="campaign.id", ondelete="CASCADE", index=True
+    )
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", nullable=False, ondelete="CASCADE", index=True
+    )
+    score: int
+    rank: int
+    built_at: datetime = Field(
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+
+
+# Current and longest run of active days per user, overall (campaign_id NULL)
+# and per campaign, advanced incrementally as completed actions are logged.
+class UserStreak(SQLModel, table=True):
+    __tablename__ = "user_streak"
+    __table_args__ = (
+        Index(
+            "ix_user_streak_key",
+            "user_id",
+            "campaign_id",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", nullable=False, ondelete="CASCADE", index=True
+    )
+    campaign_id: uuid.UUID | None = Field(
+        default=None, foreign_key="campaign.id", ondelete="CASCADE", index=True
+    )
+    current_streak: int = 0
+    longest_streak: int = 0
+    # The user's local calendar day of their latest completed action.
+    last_active_day: date | None = None
+    updated_at: datetime | None = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+
+
+# Badges are awarded once and never revoked; `code` names a rule in
+# app.badges.RULES.
+class UserBadge(SQLModel, table=True):
+    __tablename__ = "user_badge"
+    __table_args__ = (Index("ix_user_badge_user_code", "user_id", "code", unique=True),)
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", nullable=False, ondelete="CASCADE", index=True
+    )
+    code: str = Field(max_length=50)
+    awarded_at: datetime | None = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+
+
+# Completed calls per UTC hour of week (0 is Monday 00:00) for a target, split
+# by answered and voicemail outcomes. Rebuilt periodically; `best_hours` holds
+# the recommended hours of week, best first, so reads are one key lookup.
+class TargetCallWindow(SQLModel, table=True):
+    __tablename__ = "target_call_window"
+
+    target_id: uuid.UUID = Field(
+        foreign_key="representativetarget.id", primary_key=True, ondelete="CASCADE"
+    )
+    answered: list[int] = Field(sa_type=ARRAY(Integer))  # type: ignore
+    voicemail: list[int] = Field(sa_type=ARRAY(Integer))  # type: ignore
+    best_hours: list[int] = Field(
+        default_factory=list,
+        sa_type=ARRAY(Integer),  # type: ignore
+    )
+    built_at: datetime | None = Field(
         default_factory=get_datetime_utc,
         sa_type=DateTime(timezone=True),  # type: ignore
     )
@@ -413,7 +675,49 @@ class UserActionLogPublic(UserActionLogBase):
 
 class UserActionLogsPublic(SQLModel):
     data: list[UserActionLogPublic]
-    count: int
+    count: int | None = None
+    next_cursor: str | None = None
+
+
+class UserActionLogBatchItem(UserActionLogCreate):
+    # When the action happened on the client, for logs queued while offline.
+    created_at: datetime | None = None
+
+
+class UserActionLogBatchCreate(SQLModel):
+    data: list[UserActionLogBatchItem] = Field(min_length=1, max_length=500)
+
+
+class UserActionLogBatchResult(SQLModel):
+    # Position of the item in the request; exactly one of log and error is set.
+    index: int
+    log: UserActionLogPublic | None = None
+    error: str | None = None
+
+
+class UserActionLogBatchPublic(SQLModel):
+    data: list[UserActionLogBatchResult]
+    created: int
+    # Items whose idempotency key was already used; their first log is returned.
+    replayed: int
+    rejected: int
+
+
+class CallWindowPublic(SQLModel):
+    # Day (0 is Monday), hour and minute the window starts at in the caller's
+    # timezone; the minute is non-zero in zones off the whole hour.
+    weekday: int
+    hour: int
+    minute: int = 0
+    answer_rate: float
+    calls: int
+
+
+class CallWindowsPublic(SQLModel):
+    target_id: uuid.UUID
+    timezone: str
+    data: list[CallWindowPublic]
+    generated_at: datetime | None = None
 
 
 class TodayActionPublic(SQLModel):
@@ -424,6 +728,7 @@ class TodayActionPublic(SQLModel):
     action_type: ActionType
     title: str
     estimated_minutes: int
+    best_call_window: CallWindowPublic | None = None
 
 
 class TodayActionsPublic(SQLModel):
@@ -443,6 +748,47 @@ class ActionStatsPublic(SQLModel):
     last_action_at: datetime | None = None
 
 
+class StreakPublic(SQLModel):
+    campaign_id: uuid.UUID | None = None
+    current_streak: int
+    longest_streak: int
+    last_active_day: date | None = None
+
+
+class StreaksPublic(SQLModel):
+    overall: StreakPublic
+    campaigns: list[StreakPublic]
+
+
+class BadgePublic(SQLModel):
+    code: str
+    title: str
+    description: str
+    awarded_at: datetime | None = None
+
+
+class BadgesPublic(SQLModel):
+    data: list[BadgePublic]
+    count: int
+
+
+class ImpactCounters(SQLModel):
+    total_actions: int = 0
+    completed_actions: int = 0
+    skipped_actions: int = 0
+    calls: int = 0
+    emails: int = 0
+    boycotts: int = 0
+    events: int = 0
+
+
+class ImpactWindowPublic(ImpactCounters):
+    window_days: int
+    last_action_at: datetime | None = None
+    # Change against the period of the same length just before the window.
+    delta: ImpactCounters
+
+
 class ImpactPublic(SQLModel):
     window_days: int
     total_actions: int
@@ -457,6 +803,91 @@ class ImpactPublic(SQLModel):
     last_action_at: datetime | None = None
     campaign_id: uuid.UUID | None = None
     campaign_title: str | None = None
+    windows: list[ImpactWindowPublic] | None = None
+
+
+class ImpactBatchRequest(SQLModel):
+    ids: list[uuid.UUID] = Field(min_length=1, max_length=500)
+    window: str = "30d"
+
+
+class ImpactBatchItem(SQLModel):
+    id: uuid.UUID
+    impact: ImpactPublic | None = None
+    error: str | None = None
+
+
+class ImpactBatchPublic(SQLModel):
+    data: list[ImpactBatchItem]
+    count: int
+
+
+class ImpactSeriesPoint(ImpactCounters):
+    bucket_start: datetime
+
+
+class ImpactSeriesPublic(SQLModel):
+    window_days: int
+    bucket: SeriesBucket
+    data: list[ImpactSeriesPoint]
+    campaign_id: uuid.UUID | None = None
+    campaign_title: str | None = None
+
+
+class ImpactGeoRegion(ImpactCounters):
+    state_code: str
+    district_code: str | None = None
+
+
+class ImpactGeoPublic(SQLModel):
+    window_days: int
+    level: GeoLevel
+    basis: GeoBasis
+    data: list[ImpactGeoRegion]
+    campaign_id: uuid.UUID | None = None
+    campaign_title: str | None = None
+
+
+class OutcomeBreakdownPublic(SQLModel):
+    action_type: ActionType
+    total_actions: int
+    outcomes: dict[ActionOutcome, int]
+    confidence_scores: dict[int, int]
+    unscored: int
+    # Answered share of calls that reached an answer or a voicemail.
+    answer_rate: float | None = None
+    average_confidence: float | None = None
+
+
+class OutcomesPublic(SQLModel):
+    window_days: int
+    data: list[OutcomeBreakdownPublic]
+    campaign_id: uuid.UUID | None = None
+    campaign_title: str | None = None
+    target_id: uuid.UUID | None = None
+
+
+class LeaderboardEntryPublic(SQLModel):
+    rank: int
+    username: str | None = None
+    score: int
+    is_me: bool = False
+
+
+class LeaderboardPublic(SQLModel):
+    window_days: int
+    campaign_id: uuid.UUID | None = None
+    generated_at: datetime | None = None
+    data: list[LeaderboardEntryPublic]
+    me: LeaderboardEntryPublic | None = None
+
+
+class CacheStatsPublic(SQLModel):
+    hits: int
+    misses: int
+    coalesced: int
+    evictions: int
+    size: int
 
 
 class ImpactShareCardPublic(SQLModel):
@@ -470,6 +901,8 @@ class ImpactShareCardPublic(SQLModel):
     calls: int
     emails: int
     message: str
+    # Public image URL, set only while the user allows shareable cards.
+    image_url: str | None = None
 
 
 class ReferralLinkCreate(SQLModel):
@@ -481,6 +914,16 @@ class ReferralClaimCreate(SQLModel):
 
 
 class Referral(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "uq_referral_idempotency_key",
+            "referrer_user_id",
+            "idempotency_key",
+            unique=True,
+            postgresql_where=text("idempotency_key IS NOT NULL"),
+        ),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     referrer_user_id: uuid.UUID = Field(
         foreign_key="user.id", nullable=False, ondelete="CASCADE", index=True
@@ -495,6 +938,7 @@ class Referral(SQLModel, table=True):
     )
     code: str = Field(min_length=6, max_length=64, unique=True, index=True)
     channel: ReferralChannel = ReferralChannel.LINK
+    idempotency_key: str | None = Field(default=None, max_length=255)
     created_at: datetime | None = Field(
         default_factory=get_datetime_utc,
         sa_type=DateTime(timezone=True),  # type: ignore
@@ -513,7 +957,8 @@ class ReferralPublic(SQLModel):
 
 class ReferralsPublic(SQLModel):
     data: list[ReferralPublic]
-    count: int
+    count: int | None = None
+    next_cursor: str | None = None
 
 
 class ReferralAssistsPublic(SQLModel):
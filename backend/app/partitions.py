@@ -0,0 +1,144 @@
+"""
+Monthly range partitions of the action log.
+
+`useractionlog` is partitioned on `created_at`, one partition per UTC month, so
+reads bounded by a `created_at` window only scan the months it overlaps and a
+month past retention is detached whole instead of deleted row by row. `ensure`
+creates partitions ahead of the writes that need them; a default partition
+catches anything that still falls outside, but its rows must be moved out
+before the month they belong to can get its own partition. Detached months
+stay in the database as standalone tables until they are archived and dropped.
+"""
+
+import re
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+TABLE = "useractionlog"
+MONTHS_AHEAD = 3
+
+_BOUNDS = text(
+    r"""
+    SELECT
+        name,
+        nullif(substring(bound FROM 'FROM \(''?([^'')]*)'), 'MINVALUE')::timestamptz,
+        nullif(substring(bound FROM 'TO \(''?([^'')]*)'), 'MAXVALUE')::timestamptz
+    FROM (
+        SELECT child.relname AS name, pg_get_expr(child.relpartbound, child.oid) AS bound
+        FROM pg_inherits
+        JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass(:table)
+    ) AS partitions
+    WHERE bound <> 'DEFAULT'
+    ORDER BY 2 NULLS FIRST
+    """
+)
+
+
+class Partition(NamedTuple):
+    name: str
+    # None for an unbounded side (MINVALUE or MAXVALUE).
+    start: datetime | None
+    end: datetime | None
+
+
+def month_start(moment: datetime) -> datetime:
+    moment = moment.astimezone(timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month: datetime, *, table: str = TABLE) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def is_partition(name: str, *, table: str = TABLE) -> bool:
+    """
+    Whether `name` is a partition of `table`, attached or detached; partitions
+    are managed here rather than declared as models. Only the partition names
+    match: the legacy and default partitions and the `partition_name` months,
+    so other tables sharing the prefix are still declared and checked.
+    """
+    pattern = rf"{re.escape(table)}_(legacy|default|y\d{{4}}m\d{{2}})"
+    return re.fullmatch(pattern, name) is not None
+
+
+def partitions(session: Session, *, table: str = TABLE) -> list[Partition]:
+    """
+    The range partitions attached to `table`, oldest first.
+    """
+    return [
+        Partition(name, start, end)
+        for name, start, end in session.execute(_BOUNDS, {"table": table})
+    ]
+
+
+def ensure(
+    session: Session,
+    *,
+    months_ahead: int = MONTHS_AHEAD,
+    now: datetime | None = None,
+    table: str = TABLE,
+) -> list[str]:
+    """
+    Create the partitions of the current month and the next `months_ahead`
+    months that no partition covers yet. Returns the names of the created
+    partitions.
+    """
+    first = month_start(now or datetime.now(timezone.utc))
+    existing = partitions(session, table=table)
+    quote = session.get_bind().dialect.identifier_preparer.quote
+    created = []
+    for offset in range(months_ahead + 1):
+        start, end = add_months(first, offset), add_months(first, offset + 1)
+        if any(
+            (p.start is None or p.start < end) and (p.end is None or p.end > start)
+            for p in existing
+        ):
+            continue
+        name = partition_name(start, table=table)
+        session.execute(
+            text(
+                f"CREATE TABLE {quote(name)} PARTITION OF {quote(table)} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        )
+        created.append(name)
+    session.commit()
+    return created
+
+
+def detach(
+    session: Session,
+    *,
+    older_than_months: int,
+    now: datetime | None = None,
+    table: str = TABLE,
+) -> list[str]:
+    """
+    Detach the partitions that end before the start of the month
+    `older_than_months` before the current one. Returns their names.
+    """
+    cutoff = add_months(
+        month_start(now or datetime.now(timezone.utc)), -older_than_months
+    )
+    quote = session.get_bind().dialect.identifier_preparer.quote
+    detached = []
+    for partition in partitions(session, table=table):
+        if partition.end is None or partition.end > cutoff:
+            continue
+        # DETACH ... CONCURRENTLY is not allowed next to a default partition,
+        # so this briefly locks the parent table.
+        session.execute(
+            text(f"ALTER TABLE {quote(table)} DETACH PARTITION {quote(partition.name)}")
+        )
+        detached.append(partition.name)
+    session.commit()
+    return detached
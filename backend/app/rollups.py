@@ -0,0 +1,711 @@
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Select,
+    and_,
+    cast,
+    delete,
+    insert,
+    or_,
+    select,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, col, func
+
+from app import sketches
+from app.analytics import (
+    ActionAggregate,
+    action_aggregate_statement,
+    action_counter_columns,
+    aggregate_action_logs,
+    bucket_floor,
+    counter_conditions,
+    day_start,
+    first_whole_day,
+    merge_aggregates,
+    utc_day,
+)
+from app.models import (
+    ActionLogStatus,
+    ActionType,
+    GeoBasis,
+    GeoLevel,
+    ImpactDailyRollup,
+    ImpactGeoRegion,
+    ImpactSeriesPoint,
+    RepresentativeTarget,
+    SeriesBucket,
+    UserActionLog,
+    UserProfile,
+)
+
+RollupKey = tuple[date, uuid.UUID, uuid.UUID | None, ActionType, ActionLogStatus]
+
+
+def apply_action_logs(session: Session, logs: Sequence[UserActionLog]) -> None:
+    """
+    Add freshly inserted action logs to their daily rollup rows.
+
+    Runs as a single atomic upsert in the caller's transaction, so the rollup
+    commits or rolls back together with the logs themselves.
+    """
+    increments: dict[RollupKey, tuple[int, datetime]] = {}
+    for log in logs:
+        assert log.created_at is not None
+        key = (
+            utc_day(log.created_at),
+            log.campaign_id,
+            log.target_id,
+            log.action_type,
+            log.status,
+        )
+        count, last_action_at = increments.get(key, (0, log.created_at))
+        increments[key] = (count + 1, max(last_action_at, log.created_at))
+    if not increments:
+        return
+
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "day": day,
+            "campaign_id": campaign_id,
+            "target_id": target_id,
+            "action_type": action_type,
+            "status": status,
+            "action_count": count,
+            "last_action_at": last_action_at,
+        }
+        for (day, campaign_id, target_id, action_type, status), (
+            count,
+            last_action_at,
+        ) in sorted(increments.items(), key=lambda item: str(item[0]))
+    ]
+    statement = pg_insert(ImpactDailyRollup).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=["day", "campaign_id", "target_id", "action_type", "status"],
+        set_={
+            "action_count": ImpactDailyRollup.action_count
+            + statement.excluded.action_count,
+            "last_action_at": func.greatest(
+                ImpactDailyRollup.last_action_at, statement.excluded.last_action_at
+            ),
+        },
+    )
+    session.execute(statement)
+
+
+def _scope_filters(
+    model: type[ImpactDailyRollup] | type[UserActionLog],
+    *,
+    campaign_id: uuid.UUID | None,
+    target_id: uuid.UUID | None,
+) -> list[ColumnElement[bool]]:
+    filters: list[ColumnElement[bool]] = []
+    if campaign_id is not None:
+        filters.append(col(model.campaign_id) == campaign_id)
+    if target_id is not None:
+        filters.append(col(model.target_id) == target_id)
+    return filters
+
+
+def _rollup_counters() -> dict[str, ColumnElement[bool] | None]:
+    return {
+        "total_actions": None,
+        "completed_actions": col(ImpactDailyRollup.status) == ActionLogStatus.COMPLETED,
+        "skipped_actions": col(ImpactDailyRollup.status) == ActionLogStatus.SKIPPED,
+        "calls": col(ImpactDailyRollup.action_type) == ActionType.CALL,
+        "emails": col(ImpactDailyRollup.action_type) == ActionType.EMAIL,
+        "boycotts": col(ImpactDailyRollup.action_type) == ActionType.BOYCOTT,
+        "events": col(ImpactDailyRollup.action_type) == ActionType.EVENT,
+    }
+
+
+def rollup_counter_columns(
+    within: ColumnElement[bool] | None = None, suffix: str = ""
+) -> list[Any]:
+    """
+    Rollup counterpart of `action_counter_columns`.
+    """
+    columns = []
+    for name, condition in _rollup_counters().items():
+        total: Any = func.sum(ImpactDailyRollup.action_count)
+        combined = counter_conditions(within, condition)
+        if combined is not None:
+            total = total.filter(combined)
+        columns.append(func.coalesce(total, 0).label(name + suffix))
+    return columns
+
+
+def rollup_totals_statement(*filters: ColumnElement[bool]) -> Select[Any]:
+    return select(
+        *rollup_counter_columns(),
+        func.max(ImpactDailyRollup.last_action_at).label("last_action_at"),
+    ).where(*filters)
+
+
+def rollup_aggregate(
+    session: Session,
+    *,
+    start: datetime,
+    campaign_id: uuid.UUID | None = None,
+    target_id: uuid.UUID | None = None,
+) -> ActionAggregate:
+    """
+    Aggregate impact from `start` until now.
+
+    Whole UTC days come from the rollup table; when `start` falls inside a
+    day, that partial first day is read from the raw logs so the result
+    matches a raw scan exactly.
+    """
+    first_day = first_whole_day(start)
+
+    row = session.execute(
+        rollup_totals_statement(
+            col(ImpactDailyRollup.day) >= first_day,
+            *_scope_filters(
+                ImpactDailyRollup, campaign_id=campaign_id, target_id=target_id
+            ),
+        )
+    ).one()
+    aggregate = ActionAggregate.model_validate(dict(row._mapping))
+
+    raw_filters = _scope_filters(
+        UserActionLog, campaign_id=campaign_id, target_id=target_id
+    )
+    if start < day_start(first_day):
+        head = aggregate_action_logs(
+            session,
+            col(UserActionLog.created_at) >= start,
+            col(UserActionLog.created_at) < day_start(first_day),
+            *raw_filters,
+        )
+        aggregate = merge_aggregates(aggregate, head)
+
+    aggregate.unique_participants = sketches.unique_participants(
+        session, start=start, campaign_id=campaign_id, target_id=target_id
+    )
+    return aggregate
+
+
+def rollup_aggregates(
+    session: Session,
+    *,
+    start: datetime,
+    campaign_ids: Sequence[uuid.UUID] | None = None,
+    target_ids: Sequence[uuid.UUID] | None = None,
+) -> dict[uuid.UUID, ActionAggregate]:
+    """
+    Batch form of `rollup_aggregate` for many campaigns or many targets.
+
+    Pass exactly one of `campaign_ids` or `target_ids`. Rollups, the partial
+    head day and participant counts are each read with one grouped query for
+    the whole batch; ids without actions map to an empty aggregate.
+    """
+    if campaign_ids is not None and target_ids is None:
+        ids = list(campaign_ids)
+        rollup_column: Any = col(ImpactDailyRollup.campaign_id)
+        raw_column: Any = col(UserActionLog.campaign_id)
+    elif target_ids is not None and campaign_ids is None:
+        ids = list(target_ids)
+        rollup_column = col(ImpactDailyRollup.target_id)
+        raw_column = col(UserActionLog.target_id)
+    else:
+        raise ValueError("Pass exactly one of campaign_ids or target_ids")
+
+    first_day = first_whole_day(start)
+    aggregates = {scope_id: ActionAggregate() for scope_id in ids}
+    rows = session.execute(
+        rollup_totals_statement(
+            col(ImpactDailyRollup.day) >= first_day, rollup_column.in_(ids)
+        )
+        .add_columns(rollup_column.label("scope_id"))
+        .group_by(rollup_column)
+    ).all()
+    for row in rows:
+        values = dict(row._mapping)
+        aggregates[values.pop("scope_id")] = ActionAggregate.model_validate(values)
+
+    if start < day_start(first_day):
+        head_rows = session.execute(
+            action_aggregate_statement(
+                col(UserActionLog.created_at) >= start,
+                col(UserActionLog.created_at) < day_start(first_day),
+                raw_column.in_(ids),
+            )
+            .add_columns(raw_column.label("scope_id"))
+            .group_by(raw_column)
+        ).all()
+        for row in head_rows:
+            values = dict(row._mapping)
+            scope_id = values.pop("scope_id")
+            aggregates[scope_id] = merge_aggregates(
+                aggregates[scope_id], ActionAggregate.model_validate(values)
+            )
+
+    participants = sketches.unique_participants_by_scope(
+        session, start=start, campaign_ids=campaign_ids, target_ids=target_ids
+    )
+    for scope_id, aggregate in aggregates.items():
+        aggregate.unique_participants = participants[scope_id]
+    return aggregates
+
+
+def _period_filters(
+    start: datetime, end: datetime | None
+) -> tuple[ColumnElement[bool], list[ColumnElement[bool]]]:
+    """
+    Split the period `start`..`end` (open-ended when `end` is None) into a
+    rollup condition on its whole UTC days and raw-log conditions on the
+    partial days at either edge.
+    """
+    first_day = first_whole_day(start)
+    rollup_filters = [col(ImpactDailyRollup.day) >= first_day]
+    raw_filters = []
+    head_end = day_start(first_day)
+    if end is not None:
+        end_day = utc_day(end)
+        rollup_filters.append(col(ImpactDailyRollup.day) < end_day)
+        head_end = min(head_end, end)
+        if end > day_start(end_day) >= head_end:
+            raw_filters.append(
+                and_(
+                    col(UserActionLog.created_at) >= day_start(end_day),
+                    col(UserActionLog.created_at) < end,
+                )
+            )
+    if start < head_end:
+        raw_filters.append(
+            and_(
+                col(UserActionLog.created_at) >= start,
+                col(UserActionLog.created_at) < head_end,
+            )
+        )
+    return and_(*rollup_filters), raw_filters
+
+
+def _suffixed_aggregate(values: dict[str, Any], suffix: str) -> ActionAggregate:
+    return ActionAggregate.model_validate(
+        {
+            name: values[name + suffix]
+            for name in ActionAggregate.model_fields
+            if name + suffix in values
+        }
+    )
+
+
+def rollup_windows(
+    session: Session,
+    *,
+    origin: datetime,
+    window_days: Sequence[int],
+    campaign_id: uuid.UUID | None = None,
+    target_id: uuid.UUID | None = None,
+) -> dict[int, tuple[ActionAggregate, ActionAggregate]]:
+    """
+    Impact for several windows starting `window_days` before `origin` and
+    running until now, each paired with the period of the same length just
+    before it for trend deltas.
+
+    Every window and previous period is one set of FILTERed sums in a single
+    scan of the rollup table over the widest range; the partial days at the
+    period edges are counted the same way in one query over the raw logs.
+    Unique participants are not included.
+    """
+    periods: dict[str, tuple[datetime, datetime | None]] = {}
+    for days in window_days:
+        start = origin - timedelta(days=days)
+        periods[f"_{days}d"] = (start, None)
+        periods[f"_{days}d_previous"] = (start - timedelta(days=days), start)
+    earliest = min(start for start, _ in periods.values())
+
+    rollup_columns: list[Any] = []
+    raw_columns: list[Any] = []
+    raw_ranges: list[ColumnElement[bool]] = []
+    for suffix, (start, end) in periods.items():
+        rollup_filter, raw_filters = _period_filters(start, end)
+        rollup_columns += [
+            *rollup_counter_columns(rollup_filter, suffix),
+            func.max(ImpactDailyRollup.last_action_at)
+            .filter(rollup_filter)
+            .label(f"last_action_at{suffix}"),
+        ]
+        if raw_filters:
+            raw_filter = or_(*raw_filters)
+            raw_columns += [
+                *action_counter_columns(raw_filter, suffix),
+                func.max(UserActionLog.created_at)
+                .filter(raw_filter)
+                .label(f"last_action_at{suffix}"),
+            ]
+            raw_ranges += raw_filters
+
+    values = dict(
+        session.execute(
+            select(*rollup_columns).where(
+                col(ImpactDailyRollup.day) >= utc_day(earliest),
+                *_scope_filters(
+                    ImpactDailyRollup, campaign_id=campaign_id, target_id=target_id
+                ),
+            )
+        )
+        .one()
+        ._mapping
+    )
+    raw_values: dict[str, Any] = {}
+    if raw_columns:
+        raw_values = dict(
+            session.execute(
+                select(*raw_columns).where(
+                    or_(*raw_ranges),
+                    *_scope_filters(
+                        UserActionLog, campaign_id=campaign_id, target_id=target_id
+                    ),
+                )
+            )
+            .one()
+            ._mapping
+        )
+
+    aggregates = {
+        suffix: merge_aggregates(
+            _suffixed_aggregate(values, suffix),
+            _suffixed_aggregate(raw_values, suffix),
+        )
+        for suffix in periods
+    }
+    return {
+        days: (aggregates[f"_{days}d"], aggregates[f"_{days}d_previous"])
+        for days in window_days
+    }
+
+
+def geo_aggregates(
+    session: Session,
+    *,
+    start: datetime,
+    level: GeoLevel,
+    basis: GeoBasis,
+    campaign_id: uuid.UUID | None = None,
+    min_actors: int = 1,
+) -> list[ImpactGeoRegion]:
+    """
+    Impact counters per state or congressional district since `start`.
+
+    With the target basis actions are placed by the representative they were
+    aimed at: whole days are summed from the rollup table joined to the
+    targets, and a partial first day is read from the raw logs. The actor
+    basis places actions by the acting user's profile, which no rollup keeps,
+    so it is one grouped join over the raw logs. Actions without a target,
+    profile or code at the requested level are left out, and so are actor
+    regions with fewer than `min_actors` distinct users, whose exact counts
+    would describe those few people.
+    """
+    geo_model: type[RepresentativeTarget] | type[UserProfile] = (
+        RepresentativeTarget if basis == GeoBasis.TARGET else UserProfile
+    )
+    region_columns: list[Any] = [col(geo_model.state_code)]
+    if level == GeoLevel.DISTRICT:
+        region_columns.append(col(geo_model.district_code))
+    region_filters = [column.is_not(None) for column in region_columns]
+
+    def region_key(values: dict[str, Any]) -> tuple[str, str | None]:
+        return values.pop("state_code"), values.pop("district_code", None)
+
+    regions: dict[tuple[str, str | None], ActionAggregate] = {}
+    actor_counts: dict[tuple[str, str | None], int] = {}
+    actor_columns: list[Any] = []
+    raw_filters = [
+        col(UserActionLog.created_at) >= start,
+        *_scope_filters(UserActionLog, campaign_id=campaign_id, target_id=None),
+    ]
+    if basis == GeoBasis.TARGET:
+        first_day = first_whole_day(start)
+        rows = session.execute(
+            rollup_totals_statement(
+                col(ImpactDailyRollup.day) >= first_day,
+                *_scope_filters(
+                    ImpactDailyRollup, campaign_id=campaign_id, target_id=None
+                ),
+                *region_filters,
+            )
+            .add_columns(*region_columns)
+            .join(
+                RepresentativeTarget,
+                col(RepresentativeTarget.id) == col(ImpactDailyRollup.target_id),
+            )
+            .group_by(*region_columns)
+        ).all()
+        for row in rows:
+            values = dict(row._mapping)
+            regions[region_key(values)] = ActionAggregate.model_validate(values)
+        read_raw = start < day_start(first_day)
+        raw_filters.append(col(UserActionLog.created_at) < day_start(first_day))
+        raw_join = col(RepresentativeTarget.id) == col(UserActionLog.target_id)
+    else:
+        read_raw = True
+        raw_join = col(UserProfile.user_id) == col(UserActionLog.user_id)
+        actor_columns.append(
+            func.count(col(UserActionLog.user_id).distinct()).label("actors")
+        )
+
+    if read_raw:
+        raw_rows = session.execute(
+            action_aggregate_statement(*raw_filters, *region_filters)
+            .add_columns(*region_columns, *actor_columns)
+            .join(geo_model, raw_join)
+            .group_by(*region_columns)
+        ).all()
+        for row in raw_rows:
+            values = dict(row._mapping)
+            key = region_key(values)
+            if "actors" in values:
+                actor_counts[key] = values.pop("actors")
+            regions[key] = merge_aggregates(
+                regions.get(key, ActionAggregate()),
+                ActionAggregate.model_validate(values),
+            )
+
+    return [
+        ImpactGeoRegion.model_validate(
+            {
+                **aggregate.model_dump(),
+                "state_code": state_code,
+                "district_code": district_code,
+            }
+        )
+        for (state_code, district_code), aggregate in sorted(
+            regions.items(), key=lambda item: (item[0][0], item[0][1] or "")
+        )
+        if basis == GeoBasis.TARGET
+        or actor_counts[(state_code, district_code)] >= min_actors
+    ]
+
+
+_SERIES_STEPS = {
+    SeriesBucket.HOUR: timedelta(hours=1),
+    SeriesBucket.DAY: timedelta(days=1),
+    SeriesBucket.WEEK: timedelta(weeks=1),
+}
+
+
+def impact_series(
+    session: Session,
+    *,
+    start: datetime,
+    bucket: SeriesBucket,
+    campaign_id: uuid.UUID | None = None,
+    target_id: uuid.UUID | None = None,
+) -> list[ImpactSeriesPoint]:
+    """
+    Impact counters per bucket, from the bucket containing `start` until now.
+
+    Buckets are whole UTC hours, days or ISO weeks. Hourly buckets are counted
+    from the raw logs and daily or weekly buckets are summed from the rollup
+    table; either way a single query groups with `date_trunc` and left-joins
+    onto `generate_series`, so buckets without actions come back as zeros.
+    """
+    first = bucket_floor(start, bucket)
+    last = bucket_floor(datetime.now(timezone.utc), bucket)
+
+    if bucket == SeriesBucket.HOUR:
+        bucket_expr = func.date_trunc(
+            bucket.value, func.timezone("UTC", col(UserActionLog.created_at))
+        )
+        counts = (
+            select(bucket_expr.label("bucket_start"), *action_counter_columns())
+            .where(
+                col(UserActionLog.created_at) >= first,
+                *_scope_filters(
+                    UserActionLog, campaign_id=campaign_id, target_id=target_id
+                ),
+            )
+            .group_by(bucket_expr)
+        )
+    else:
+        bucket_expr = func.date_trunc(
+            bucket.value, cast(col(ImpactDailyRollup.day), DateTime)
+        )
+        counts = (
+            select(bucket_expr.label("bucket_start"), *rollup_counter_columns())
+            .where(
+                col(ImpactDailyRollup.day) >= first.date(),
+                *_scope_filters(
+                    ImpactDailyRollup, campaign_id=campaign_id, target_id=target_id
+                ),
+            )
+            .group_by(bucket_expr)
+        )
+    counts_subquery = counts.subquery("counts")
+    buckets = select(
+        func.generate_series(
+            first.replace(tzinfo=None),
+            last.replace(tzinfo=None),
+            _SERIES_STEPS[bucket],
+        ).label("bucket_start")
+    ).subquery("buckets")
+
+    counter_names = [
+        name for name in ImpactSeriesPoint.model_fields if name != "bucket_start"
+    ]
+    rows = session.execute(
+        select(
+            buckets.c.bucket_start,
+            *[
+                func.coalesce(counts_subquery.c[name], 0).label(name)
+                for name in counter_names
+            ],
+        )
+        .select_from(
+            buckets.outerjoin(
+                counts_subquery,
+                counts_subquery.c.bucket_start == buckets.c.bucket_start,
+            )
+        )
+        .order_by(buckets.c.bucket_start)
+    ).all()
+    return [
+        ImpactSeriesPoint.model_validate(
+            {
+                **row._mapping,
+                "bucket_start": row.bucket_start.replace(tzinfo=timezone.utc),
+            }
+        )
+        for row in rows
+    ]
+
+
+def backfill(session: Session, *, start_day: date, end_day: date) -> int:
+    """
+    Rebuild rollup rows for `start_day`..`end_day` (inclusive) from raw logs.
+
+    Existing rows for those days are replaced, so the backfill is safe to
+    re-run and doubles as a repair tool after the consistency check fails.
+    """
+    day_expr = func.date(func.timezone("UTC", col(UserActionLog.created_at)))
+    source = (
+        select(
+            func.gen_random_uuid(),
+            day_expr,
+            col(UserActionLog.campaign_id),
+            col(UserActionLog.target_id),
+            col(UserActionLog.action_type),
+            col(UserActionLog.status),
+            func.count(),
+            func.max(col(UserActionLog.created_at)),
+        )
+        .where(
+            col(UserActionLog.created_at) >= day_start(start_day),
+            col(UserActionLog.created_at) < day_start(end_day + timedelta(days=1)),
+        )
+        .group_by(
+            day_expr,
+            col(UserActionLog.campaign_id),
+            col(UserActionLog.target_id),
+            col(UserActionLog.action_type),
+            col(UserActionLog.status),
+        )
+    )
+    session.execute(
+        delete(ImpactDailyRollup).where(
+            col(ImpactDailyRollup.day) >= start_day,
+            col(ImpactDailyRollup.day) <= end_day,
+        )
+    )
+    result = session.execute(
+        insert(ImpactDailyRollup).from_select(
+            [
+                "id",
+                "day",
+                "campaign_id",
+                "target_id",
+                "action_type",
+                "status",
+                "action_count",
+                "last_action_at",
+            ],
+            source,
+        )
+    )
+    session.commit()
+    return result.rowcount  # type: ignore[attr-defined, no-any-return]
+
+
+@dataclass
+class RollupMismatch:
+    day: date
+    campaign_id: uuid.UUID
+    target_id: uuid.UUID | None
+    action_type: ActionType
+    status: ActionLogStatus
+    rollup_count: int
+    raw_count: int
+
+
+def check_consistency(
+    session: Session, *, start_day: date, end_day: date
+) -> list[RollupMismatch]:
+    """
+    Compare rollup counts against the raw logs for `start_day`..`end_day`.
+    """
+    day_expr = func.date(func.timezone("UTC", col(UserActionLog.created_at)))
+    raw_rows = session.execute(
+        select(
+            day_expr,
+            col(UserActionLog.campaign_id),
+            col(UserActionLog.target_id),
+            col(UserActionLog.action_type),
+            col(UserActionLog.status),
+            func.count(),
+        )
+        .where(
+            col(UserActionLog.created_at) >= day_start(start_day),
+            col(UserActionLog.created_at) < day_start(end_day + timedelta(days=1)),
+        )
+        .group_by(
+            day_expr,
+            col(UserActionLog.campaign_id),
+            col(UserActionLog.target_id),
+            col(UserActionLog.action_type),
+            col(UserActionLog.status),
+        )
+    ).all()
+    rollup_rows = session.execute(
+        select(
+            col(ImpactDailyRollup.day),
+            col(ImpactDailyRollup.campaign_id),
+            col(ImpactDailyRollup.target_id),
+            col(ImpactDailyRollup.action_type),
+            col(ImpactDailyRollup.status),
+            col(ImpactDailyRollup.action_count),
+        ).where(
+            col(ImpactDailyRollup.day) >= start_day,
+            col(ImpactDailyRollup.day) <= end_day,
+        )
+    ).all()
+
+    raw_counts: dict[Any, int] = {tuple(row[:5]): row[5] for row in raw_rows}
+    rollup_counts: dict[Any, int] = {tuple(row[:5]): row[5] for row in rollup_rows}
+    mismatches = []
+    for key in sorted(raw_counts.keys() | rollup_counts.keys(), key=str):
+        raw_count = raw_counts.get(key, 0)
+        rollup_count = rollup_counts.get(key, 0)
+        if raw_count != rollup_count:
+            day, campaign_id, target_id, action_type, status = key
+            mismatches.append(
+                RollupMismatch(
+                    day=day,
+                    campaign_id=campaign_id,
+                    target_id=target_id,
+                    action_type=action_type,
+                    status=status,
+                    rollup_count=rollup_count,
+                    raw_count=raw_count,
+                )
+            )
+    return mismatches
@@ -0,0 +1,293 @@
+import uuid
+from collections import defaultdict
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import (
+    ARRAY,
+    ColumnElement,
+    Uuid,
+    and_,
+    any_,
+    case,
+    delete,
+    literal,
+    literal_column,
+    not_,
+    or_,
+    select,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, col, func
+
+from app.analytics import day_start, first_whole_day, utc_day
+from app.core.hll import REGISTER_COUNT, HyperLogLog, register_update
+from app.models import ImpactDailySketch, UserActionLog
+
+# Days with at most this many distinct users keep their exact member list, so
+# windows made only of such days report exact counts. The limit sits above
+# the largest `_participant_range` boundary in the impact routes.
+EXACT_MEMBER_LIMIT = 128
+
+SketchScope = tuple[uuid.UUID, uuid.UUID | None]
+
+
+# There is no platform-wide scope: every write would upsert the same row for
+# the day and serialize concurrent inserts on its lock. Platform counts merge
+# the campaign sketches instead.
+def _scopes(campaign_id: uuid.UUID, target_id: uuid.UUID | None) -> list[SketchScope]:
+    scopes: list[SketchScope] = [(campaign_id, None)]
+    if target_id is not None:
+        scopes.append((campaign_id, target_id))
+    return scopes
+
+
+def apply_action_logs(session: Session, logs: Sequence[UserActionLog]) -> None:
+    """
+    Add the users behind freshly inserted action logs to the daily sketches.
+
+    Each (day, user) pair is applied with one upsert that sets a single
+    register in SQL, so concurrent writers never overwrite each other.
+    """
+    scopes_by_user: dict[tuple[date, uuid.UUID], set[SketchScope]] = defaultdict(set)
+    for log in logs:
+        assert log.created_at is not None
+        scopes_by_user[(utc_day(log.created_at), log.user_id)].update(
+            _scopes(log.campaign_id, log.target_id)
+        )
+
+    for (day, user_id), scopes in sorted(
+        scopes_by_user.items(), key=lambda item: str(item[0])
+    ):
+        index, rank = register_update(user_id)
+        registers = bytearray(REGISTER_COUNT)
+        registers[index] = rank
+        statement = pg_insert(ImpactDailySketch).values(
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "day": day,
+                    "campaign_id": campaign_id,
+                    "target_id": target_id,
+                    "registers": bytes(registers),
+                    "members": [user_id],
+                    "exact": True,
+                }
+                for campaign_id, target_id in sorted(scopes, key=str)
+            ]
+        )
+        members = col(ImpactDailySketch.members)
+        known_member = literal(user_id, Uuid) == any_(members)
+        stays_exact = and_(
+            col(ImpactDailySketch.exact),
+            or_(known_member, func.cardinality(members) < EXACT_MEMBER_LIMIT),
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=["day", "campaign_id", "target_id"],
+            set_={
+                "registers": func.set_byte(
+                    ImpactDailySketch.registers,
+                    index,
+                    func.greatest(
+                        func.get_byte(ImpactDailySketch.registers, index), rank
+                    ),
+                ),
+                "members": case(
+                    (not_(stays_exact), literal_column("'{}'", ARRAY(Uuid))),
+                    (known_member, members),
+                    else_=func.array_append(members, literal(user_id, Uuid)),
+                ),
+                "exact": stays_exact,
+            },
+        )
+        session.execute(statement)
+
+
+def _scope_filters(
+    *, campaign_id: uuid.UUID | None, target_id: uuid.UUID | None
+) -> list[ColumnElement[bool]]:
+    if target_id is not None:
+        return [col(ImpactDailySketch.target_id) == target_id]
+    return [
+        col(ImpactDailySketch.campaign_id).is_not(None)
+        if campaign_id is None
+        else col(ImpactDailySketch.campaign_id) == campaign_id,
+        col(ImpactDailySketch.target_id).is_(None),
+    ]
+
+
+def unique_participants(
+    session: Session,
+    *,
+    start: datetime,
+    campaign_id: uuid.UUID | None = None,
+    target_id: uuid.UUID | None = None,
+) -> int:
+    """
+    Count distinct users with an action since `start`.
+
+    Whole UTC days are answered by merging their daily sketches, across all
+    campaigns when no scope is given; a partial first day is read from the
+    raw logs. The count is exact whenever every
+    merged day stayed under `EXACT_MEMBER_LIMIT` users and otherwise carries
+    the HyperLogLog error bound documented in `app.core.hll`.
+    """
+    first_day = first_whole_day(start)
+    rows = session.execute(
+        select(
+            col(ImpactDailySketch.registers),
+            col(ImpactDailySketch.members),
+            col(ImpactDailySketch.exact),
+        ).where(
+            col(ImpactDailySketch.day) >= first_day,
+            *_scope_filters(campaign_id=campaign_id, target_id=target_id),
+        )
+    ).all()
+
+    head_users: Sequence[uuid.UUID] = []
+    if start < day_start(first_day):
+        raw_filters = [
+            col(UserActionLog.created_at) >= start,
+            col(UserActionLog.created_at) < day_start(first_day),
+        ]
+        if campaign_id is not None:
+            raw_filters.append(col(UserActionLog.campaign_id) == campaign_id)
+        if target_id is not None:
+            raw_filters.append(col(UserActionLog.target_id) == target_id)
+        head_users = (
+            session.execute(
+                select(col(UserActionLog.user_id)).where(*raw_filters).distinct()
+            )
+            .scalars()
+            .all()
+        )
+
+    return _count_participants(rows, head_users)
+
+
+def unique_participants_by_scope(
+    session: Session,
+    *,
+    start: datetime,
+    campaign_ids: Sequence[uuid.UUID] | None = None,
+    target_ids: Sequence[uuid.UUID] | None = None,
+) -> dict[uuid.UUID, int]:
+    """
+    Batch form of `unique_participants` for many campaigns or many targets.
+
+    Pass exactly one of `campaign_ids` or `target_ids`; sketches and the raw
+    head day are each read with one query for the whole batch.
+    """
+    if campaign_ids is not None and target_ids is None:
+        ids = list(campaign_ids)
+        sketch_column: Any = col(ImpactDailySketch.campaign_id)
+        scope_filters = [
+            sketch_column.in_(ids),
+            col(ImpactDailySketch.target_id).is_(None),
+        ]
+        raw_column: Any = col(UserActionLog.campaign_id)
+    elif target_ids is not None and campaign_ids is None:
+        ids = list(target_ids)
+        sketch_column = col(ImpactDailySketch.target_id)
+        scope_filters = [sketch_column.in_(ids)]
+        raw_column = col(UserActionLog.target_id)
+    else:
+        raise ValueError("Pass exactly one of campaign_ids or target_ids")
+
+    first_day = first_whole_day(start)
+    rows_by_scope: dict[uuid.UUID, list[Any]] = defaultdict(list)
+    for row in session.execute(
+        select(
+            sketch_column.label("scope_id"),
+            col(ImpactDailySketch.registers),
+            col(ImpactDailySketch.members),
+            col(ImpactDailySketch.exact),
+        ).where(col(ImpactDailySketch.day) >= first_day, *scope_filters)
+    ):
+        rows_by_scope[row.scope_id].append(row)
+
+    head_users: dict[uuid.UUID, list[uuid.UUID]] = defaultdict(list)
+    if start < day_start(first_day):
+        for scope_id, user_id in session.execute(
+            select(raw_column, col(UserActionLog.user_id))
+            .where(
+                col(UserActionLog.created_at) >= start,
+                col(UserActionLog.created_at) < day_start(first_day),
+                raw_column.in_(ids),
+            )
+            .distinct()
+        ):
+            head_users[scope_id].append(user_id)
+
+    return {
+        scope_id: _count_participants(
+            rows_by_scope.get(scope_id, []), head_users.get(scope_id, [])
+        )
+        for scope_id in ids
+    }
+
+
+def _count_participants(rows: Sequence[Any], head_users: Sequence[uuid.UUID]) -> int:
+    if all(row.exact for row in rows):
+        members = set(head_users)
+        for row in rows:
+            members.update(row.members)
+        return len(members)
+
+    sketch = HyperLogLog()
+    for row in rows:
+        sketch.merge(row.registers)
+    for user_id in head_users:
+        sketch.add(user_id)
+    return sketch.estimate()
+
+
+def backfill(session: Session, *, start_day: date, end_day: date) -> int:
+    """
+    Rebuild sketches for `start_day`..`end_day` (inclusive) from raw logs,
+    one day at a time so memory stays bounded by a single day's users.
+    """
+    rebuilt = 0
+    day = start_day
+    while day <= end_day:
+        session.execute(
+            delete(ImpactDailySketch).where(col(ImpactDailySketch.day) == day)
+        )
+        users_by_scope: dict[SketchScope, set[uuid.UUID]] = defaultdict(set)
+        rows = session.execute(
+            select(
+                col(UserActionLog.campaign_id),
+                col(UserActionLog.target_id),
+                col(UserActionLog.user_id),
+            )
+            .where(
+                col(UserActionLog.created_at) >= day_start(day),
+                col(UserActionLog.created_at) < day_start(day + timedelta(days=1)),
+            )
+            .distinct()
+        ).all()
+        for campaign_id, target_id, user_id in rows:
+            for scope in _scopes(campaign_id, target_id):
+                users_by_scope[scope].add(user_id)
+
+        values: list[dict[str, Any]] = []
+        for (campaign_id, target_id), users in users_by_scope.items():
+            exact = len(users) <= EXACT_MEMBER_LIMIT
+            values.append(
+                {
+                    "id": uuid.uuid4(),
+                    "day": day,
+                    "campaign_id": campaign_id,
+                    "target_id": target_id,
+                    "registers": HyperLogLog.from_values(users).to_bytes(),
+                    "members": sorted(users) if exact else [],
+                    "exact": exact,
+                }
+            )
+        if values:
+            session.execute(pg_insert(ImpactDailySketch).values(values))
+        session.commit()
+        rebuilt += len(values)
+        day += timedelta(days=1)
+    return rebuilt
@@ -0,0 +1,221 @@
+import uuid
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, col, delete, select
+
+from app.core.timewindows import resolve_zone
+from app.models import (
+    ActionLogStatus,
+    DailyActionPlan,
+    StreakPublic,
+    UserActionLog,
+    UserProfile,
+    UserStreak,
+)
+
+# Users without an active plan are expected to act every day.
+EVERY_DAY_MASK = "1111111"
+
+StreakKey = tuple[uuid.UUID, uuid.UUID | None]
+
+
+def local_day(value: datetime, timezone_name: str | None) -> date:
+    return value.astimezone(resolve_zone(timezone_name)).date()
+
+
+def _union_masks(masks: Iterable[str]) -> str:
+    days = [
+        any(len(mask) == 7 and mask[weekday] == "1" for mask in masks)
+        for weekday in range(7)
+    ]
+    return "".join("1" if active else "0" for active in days) if any(days) else ""
+
+
+def missed_active_day(mask: str, last_day: date, day: date) -> bool:
+    """
+    Whether an active weekday lies strictly between `last_day` and `day`.
+
+    Only the first week of the gap needs checking, since it already covers
+    every weekday in the mask.
+    """
+    gap = (day - last_day).days - 1
+    return any(
+        mask[(last_day + timedelta(days=offset)).weekday()] == "1"
+        for offset in range(1, min(gap, 7) + 1)
+    )
+
+
+def _advance(streak: UserStreak, day: date, mask: str) -> None:
+    last_day = streak.last_active_day
+    if last_day is not None and day <= last_day:
+        return
+    if last_day is None or missed_active_day(mask, last_day, day):
+        streak.current_streak = 1
+    else:
+        streak.current_streak += 1
+    streak.longest_streak = max(streak.longest_streak, streak.current_streak)
+    streak.last_active_day = day
+
+
+def _user_context(
+    session: Session, user_ids: Iterable[uuid.UUID]
+) -> tuple[dict[uuid.UUID, str], dict[StreakKey, str]]:
+    """
+    Timezones and active-weekday masks for `user_ids`. The overall mask
+    (campaign None) is the union of the user's active plans.
+    """
+    user_ids = list(user_ids)
+    timezones = dict(
+        session.exec(
+            select(UserProfile.user_id, UserProfile.timezone).where(
+                col(UserProfile.user_id).in_(user_ids)
+            )
+        ).all()
+    )
+    plan_masks: dict[StreakKey, str] = {}
+    masks_by_user: dict[uuid.UUID, list[str]] = defaultdict(list)
+    for user_id, campaign_id, mask in session.exec(
+        select(
+            DailyActionPlan.user_id,
+            DailyActionPlan.campaign_id,
+            DailyActionPlan.active_weekdays_mask,
+        ).where(
+            col(DailyActionPlan.user_id).in_(user_ids),
+            col(DailyActionPlan.is_active).is_(True),
+        )
+    ):
+        plan_masks[(user_id, campaign_id)] = _union_masks([mask]) or EVERY_DAY_MASK
+        masks_by_user[user_id].append(mask)
+    for user_id, masks in masks_by_user.items():
+        plan_masks[(user_id, None)] = _union_masks(masks) or EVERY_DAY_MASK
+    return timezones, plan_masks
+
+
+def _active_days(
+    logs: Iterable[tuple[uuid.UUID, uuid.UUID, datetime]],
+    timezones: dict[uuid.UUID, str],
+) -> dict[StreakKey, set[date]]:
+    days: dict[StreakKey, set[date]] = defaultdict(set)
+    for user_id, campaign_id, created_at in logs:
+        day = local_day(created_at, timezones.get(user_id))
+        days[(user_id, campaign_id)].add(day)
+        days[(user_id, None)].add(day)
+    return days
+
+
+def apply_action_logs(session: Session, logs: Sequence[UserActionLog]) -> None:
+    """
+    Advance the overall and per-campaign streaks of the users behind freshly
+    inserted action logs. Only completed actions count, on the user's local
+    day; off-days in their plan's `active_weekdays_mask` never break a streak.
+
+    A log dated before a streak's last active day cannot be placed without
+    the full history and is left to `backfill`.
+    """
+    completed = [log for log in logs if log.status == ActionLogStatus.COMPLETED]
+    if not completed:
+        return
+    user_ids = {log.user_id for log in completed}
+    timezones, masks = _user_context(session, user_ids)
+    days = _active_days(
+        (
+            (log.user_id, log.campaign_id, log.created_at)
+            for log in completed
+            if log.created_at is not None
+        ),
+        timezones,
+    )
+
+    keys = sorted(days, key=str)
+    session.execute(
+        pg_insert(UserStreak)
+        .values(
+            [
+                {"id": uuid.uuid4(), "user_id": user_id, "campaign_id": campaign_id}
+                for user_id, campaign_id in keys
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "campaign_id"])
+    )
+    streaks = session.exec(
+        select(UserStreak)
+        .where(col(UserStreak.user_id).in_(user_ids))
+        .order_by(col(UserStreak.id))
+        .with_for_update()
+    ).all()
+    for streak in streaks:
+        key = (streak.user_id, streak.campaign_id)
+        if key not in days:
+            continue
+        for day in sorted(days[key]):
+            _advance(streak, day, masks.get(key, EVERY_DAY_MASK))
+        streak.updated_at = datetime.now(timezone.utc)
+        session.add(streak)
+
+
+def read_streaks(session: Session, user_id: uuid.UUID) -> list[StreakPublic]:
+    """
+    The user's stored streaks, reporting a current streak of zero once an
+    active day has passed since the last completed action.
+    """
+    timezones, masks = _user_context(session, [user_id])
+    today = local_day(datetime.now(timezone.utc), timezones.get(user_id))
+    streaks = session.exec(
+        select(UserStreak)
+        .where(UserStreak.user_id == user_id)
+        .order_by(col(UserStreak.campaign_id).nulls_first())
+    ).all()
+    results = []
+    for streak in streaks:
+        mask = masks.get((user_id, streak.campaign_id), EVERY_DAY_MASK)
+        broken = streak.last_active_day is not None and missed_active_day(
+            mask, streak.last_active_day, today
+        )
+        results.append(
+            StreakPublic(
+                campaign_id=streak.campaign_id,
+                current_streak=0 if broken else streak.current_streak,
+                longest_streak=streak.longest_streak,
+                last_active_day=streak.last_active_day,
+            )
+        )
+    return results
+
+
+def backfill(session: Session, *, user_ids: Sequence[uuid.UUID]) -> int:
+    """
+    Recompute streaks for `user_ids` from their full history of completed
+    actions, using each user's current timezone and plans.
+    """
+    timezones, masks = _user_context(session, user_ids)
+    logs = session.exec(
+        select(
+            UserActionLog.user_id, UserActionLog.campaign_id, UserActionLog.created_at
+        )
+        .where(
+            col(UserActionLog.user_id).in_(user_ids),
+            UserActionLog.status == ActionLogStatus.COMPLETED,
+        )
+        .execution_options(yield_per=1000)
+    )
+    days = _active_days(
+        (
+            (user_id, campaign_id, created_at)
+            for user_id, campaign_id, created_at in logs
+            if created_at is not None
+        ),
+        timezones,
+    )
+
+    session.execute(delete(UserStreak).where(col(UserStreak.user_id).in_(user_ids)))
+    for (user_id, campaign_id), active_days in days.items():
+        streak = UserStreak(user_id=user_id, campaign_id=campaign_id)
+        for day in sorted(active_days):
+            _advance(streak, day, masks.get((user_id, campaign_id), EVERY_DAY_MASK))
+        streak.updated_at = datetime.now(timezone.utc)
+        session.add(streak)
+    session.commit()
+    return len(days)
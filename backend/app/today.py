@@ -0,0 +1,130 @@
+"""
+The daily action list behind `/actions/today`.
+
+The list only changes when the user's plans or the templates of a planned
+campaign change, or when the user's local day rolls over. `version` stamps
+the former with one small aggregate so callers can cache the list per local
+day without being told about writes made outside the API.
+"""
+
+import uuid
+from typing import Any
+
+from sqlalchemy import select
+from sqlmodel import Session, col, func
+
+from app import call_windows
+from app.models import (
+    ActionTemplate,
+    ActionType,
+    Campaign,
+    DailyActionPlan,
+    TargetCallWindow,
+    TodayActionPublic,
+)
+
+
+def version(session: Session, user_id: uuid.UUID) -> tuple[Any, ...]:
+    """
+    Changes whenever the user's active plans or their campaigns' templates
+    do. Plans are replaced rather than edited on onboarding, and templates
+    are only inserted or deleted, so counts plus the newest `created_at`
+    identify both.
+    """
+    row = session.execute(
+        select(
+            func.count(col(DailyActionPlan.id).distinct()),
+            func.max(col(DailyActionPlan.created_at)),
+            func.count(col(ActionTemplate.id)),
+            func.max(col(ActionTemplate.created_at)),
+        )
+        .outerjoin(
+            ActionTemplate,
+            col(ActionTemplate.campaign_id) == col(DailyActionPlan.campaign_id),
+        )
+        .where(
+            col(DailyActionPlan.user_id) == user_id,
+            col(DailyActionPlan.is_active).is_(True),
+        )
+    ).one()
+    return tuple(row)
+
+
+def planned_actions(
+    session: Session, user_id: uuid.UUID, *, weekday: int
+) -> list[TodayActionPublic]:
+    """
+    The newest templates of every campaign the user plans to act on on
+    `weekday`, up to each plan's `target_actions_per_day`.
+
+    Plans, campaigns and templates are joined and ranked with ROW_NUMBER in a
+    single query, so the cost does not grow with the number of plans.
+    """
+    mask = col(DailyActionPlan.active_weekdays_mask)
+    ranked = (
+        select(
+            col(DailyActionPlan.created_at).label("plan_created_at"),
+            col(DailyActionPlan.target_actions_per_day),
+            col(Campaign.id).label("campaign_id"),
+            col(Campaign.title).label("campaign_title"),
+            col(ActionTemplate.id).label("template_id"),
+            col(ActionTemplate.target_id),
+            col(ActionTemplate.action_type),
+            col(ActionTemplate.title),
+            col(ActionTemplate.estimated_minutes),
+            func.row_number()
+            .over(
+                partition_by=col(DailyActionPlan.id),
+                order_by=col(ActionTemplate.created_at).desc(),
+            )
+            .label("position"),
+        )
+        .join(Campaign, col(Campaign.id) == col(DailyActionPlan.campaign_id))
+        .join(
+            ActionTemplate,
+            col(ActionTemplate.campaign_id) == col(DailyActionPlan.campaign_id),
+        )
+        .where(
+            col(DailyActionPlan.user_id) == user_id,
+            col(DailyActionPlan.is_active).is_(True),
+            func.length(mask) == 7,
+            func.substr(mask, weekday + 1, 1) == "1",
+        )
+        .subquery()
+    )
+    rows = session.execute(
+        select(ranked)
+        .where(ranked.c.position <= ranked.c.target_actions_per_day)
+        .order_by(ranked.c.plan_created_at, ranked.c.campaign_id, ranked.c.position)
+    ).all()
+    return [TodayActionPublic.model_validate(row._mapping) for row in rows]
+
+
+def attach_call_windows(
+    session: Session, actions: list[TodayActionPublic], *, timezone_name: str | None
+) -> None:
+    """
+    Set `best_call_window` on call actions to the best window still ahead
+    today, from the precomputed histograms of their targets, with one lookup
+    for all of them.
+    """
+    target_ids = {
+        action.target_id
+        for action in actions
+        if action.target_id is not None and action.action_type == ActionType.CALL
+    }
+    if not target_ids:
+        return
+    best_windows = {
+        call_window.target_id: call_windows.best_window_today(
+            call_window, timezone_name=timezone_name
+        )
+        for call_window in session.scalars(
+            select(TargetCallWindow).where(
+                col(TargetCallWindow.target_id).in_(target_ids)
+            )
+        )
+    }
+    for action in actions:
+        if action.action_type == ActionType.CALL and action.target_id:
+            action.best_call_window = best_windows.get(action.target_id)
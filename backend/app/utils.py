@@ -1,16 +1,21 @@
+import hashlib
+import hmac
 import logging
+import uuid
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 import emails  # type: ignore
 import jwt
-from jinja2 import Template
+from jinja2 import Environment, Template
 from jwt.exceptions import InvalidTokenError
 
 from app.core import security
 from app.core.config import settings
+from app.models import ImpactShareCardPublic
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,6 +35,76 @@ def render_email_template(*, template_name: str, context: dict[str, Any]) -> str
     return html_content
 
 
+@lru_cache(maxsize=1)
+def _share_card_template() -> str:
+    return (
+        Path(__file__).parent / "share-card-templates" / "share_card.svg"
+    ).read_text()
+
+
+def share_card_digest(card: ImpactShareCardPublic) -> str:
+    """
+    Content hash of a share card image: identical card fields and template
+    always render identical bytes, so the digest doubles as an ETag.
+    """
+    digest = hashlib.sha256(_share_card_template().encode())
+    digest.update(card.model_dump_json().encode())
+    return digest.hexdigest()
+
+
+def share_card_etag(version: tuple[Any, ...]) -> str:
+    """
+    ETag of a share card image computed from a cheap version of its inputs,
+    so an unchanged card is answered before it is built.
+    """
+    digest = hashlib.sha256(_share_card_template().encode())
+    digest.update(repr(version).encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def _share_card_signature(user_id: uuid.UUID) -> str:
+    digest = hmac.new(
+        settings.SECRET_KEY.encode(), b"share-card:" + user_id.bytes, hashlib.sha256
+    )
+    return digest.hexdigest()[:32]
+
+
+def generate_share_card_token(user_id: uuid.UUID) -> str:
+    """
+    Per-user token for the public share card image URL. It cannot be derived
+    without the secret key, so the URL can be unfurled without a login but
+    not guessed.
+    """
+    return f"{user_id.hex}{_share_card_signature(user_id)}"
+
+
+def verify_share_card_token(token: str) -> uuid.UUID | None:
+    try:
+        user_id = uuid.UUID(hex=token[:32])
+    except ValueError:
+        return None
+    if not hmac.compare_digest(token[32:], _share_card_signature(user_id)):
+        return None
+    return user_id
+
+
+def render_share_card_svg(card: ImpactShareCardPublic) -> str:
+    name = card.display_name if card.shareable and card.display_name else None
+    stats = [
+        {"value": card.total_actions, "label": "actions"},
+        {"value": card.completed_actions, "label": "completed"},
+        {"value": card.calls, "label": "calls"},
+        {"value": card.emails, "label": "emails"},
+    ]
+    template = Environment(autoescape=True).from_string(_share_card_template())
+    return template.render(
+        headline=f"{name}'s impact" if name else "My advocacy impact",
+        period=f"Last {card.window_days} days",
+        stats=stats,
+        project_name=settings.PROJECT_NAME,
+    )
+
+
 def send_email(
     *,
     email_to: str,
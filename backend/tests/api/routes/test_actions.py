@@ -1,9 +1,16 @@
 import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from zoneinfo import ZoneInfo
 
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlalchemy import event
+from sqlmodel import Session, col, delete, func, select
 
+from app import call_windows
+from app.api.routes.actions import action_log_writer, today_cache
 from app.core.config import settings
+from app.core.db import engine
 from app.models import (
     ActionLogStatus,
     ActionOutcome,
@@ -13,8 +20,14 @@ from app.models import (
     CampaignCreate,
     CampaignStatus,
     DailyActionPlan,
+    OfficeType,
+    RepresentativeTarget,
+    TargetCallWindow,
     UserActionLog,
+    UserProfile,
 )
+from tests.utils.user import authentication_token_from_email
+from tests.utils.utils import random_email
 
 
 def test_read_actions_today_returns_planned_templates(
@@ -73,6 +86,220 @@ def test_read_actions_today_returns_planned_templates(
     )
 
 
+def _planned_campaign(
+    db: Session, user_id: uuid.UUID, *, active_weekdays_mask: str = "1111111"
+) -> list[ActionTemplate]:
+    campaign = Campaign.model_validate(
+        CampaignCreate(
+            slug=f"today-n-{uuid.uuid4().hex[:8]}",
+            title="Today Query Count Campaign",
+            description="Campaign used to count today queries",
+            policy_topic="test",
+            status=CampaignStatus.ACTIVE,
+        )
+    )
+    db.add(campaign)
+    db.commit()
+    templates = []
+    for index in range(3):
+        template = ActionTemplate(
+            campaign_id=campaign.id,
+            action_type=ActionType.EMAIL,
+            title=f"Email {index}",
+            script_text="Please support this issue.",
+            estimated_minutes=2,
+        )
+        db.add(template)
+        db.commit()
+        templates.append(template)
+    db.add(
+        DailyActionPlan(
+            user_id=user_id,
+            campaign_id=campaign.id,
+            target_actions_per_day=2,
+            active_weekdays_mask=active_weekdays_mask,
+            is_active=True,
+        )
+    )
+    db.commit()
+    return templates
+
+
+def _count_today_queries(client: TestClient, headers: dict[str, str]) -> int:
+    statements: list[str] = []
+
+    def record(*args: Any) -> None:
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(f"{settings.API_V1_STR}/actions/today", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    return len(statements)
+
+
+def test_read_actions_today_query_count_is_constant(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    me_response = client.get(
+        f"{settings.API_V1_STR}/users/me",
+        headers=normal_user_token_headers,
+    )
+    user_id = uuid.UUID(me_response.json()["id"])
+
+    first_templates = _planned_campaign(db, user_id)
+    one_plan = _count_today_queries(client, normal_user_token_headers)
+    for _ in range(9):
+        _planned_campaign(db, user_id)
+    ten_plans = _count_today_queries(client, normal_user_token_headers)
+    assert ten_plans == one_plan
+
+    response = client.get(
+        f"{settings.API_V1_STR}/actions/today",
+        headers=normal_user_token_headers,
+    )
+    rows = [
+        row
+        for row in response.json()["data"]
+        if row["campaign_id"] == str(first_templates[0].campaign_id)
+    ]
+    assert [row["template_id"] for row in rows] == [
+        str(first_templates[2].id),
+        str(first_templates[1].id),
+    ]
+
+
+def test_read_actions_today_uses_local_day_and_cache(
+    client: TestClient, db: Session
+) -> None:
+    email = random_email()
+    headers = authentication_token_from_email(client=client, email=email, db=db)
+    me_response = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    user_id = uuid.UUID(me_response.json()["id"])
+    db.add(
+        UserProfile(
+            user_id=user_id,
+            username=f"today_{uuid.uuid4().hex[:10]}",
+            timezone="America/Los_Angeles",
+        )
+    )
+    db.commit()
+    local_weekday = datetime.now(ZoneInfo("America/Los_Angeles")).weekday()
+    mask = "".join("1" if day == local_weekday else "0" for day in range(7))
+    templates = _planned_campaign(db, user_id, active_weekdays_mask=mask)
+
+    url = f"{settings.API_V1_STR}/actions/today"
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200
+    assert [row["template_id"] for row in first.json()["data"]] == [
+        str(templates[2].id),
+        str(templates[1].id),
+    ]
+
+    hits = today_cache.stats().hits
+    assert client.get(url, headers=headers).json() == first.json()
+    assert today_cache.stats().hits == hits + 1
+
+    newest = ActionTemplate(
+        campaign_id=templates[0].campaign_id,
+        action_type=ActionType.EMAIL,
+        title="Newest email",
+        script_text="Please support this issue.",
+        estimated_minutes=2,
+    )
+    db.add(newest)
+    db.commit()
+    refreshed = client.get(url, headers=headers).json()
+    assert [row["template_id"] for row in refreshed["data"]] == [
+        str(newest.id),
+        str(templates[2].id),
+    ]
+
+
+def test_read_actions_today_includes_best_call_window(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    campaign = Campaign.model_validate(
+        CampaignCreate(
+            slug=f"today-calls-{uuid.uuid4().hex[:8]}",
+            title="Today Calls Campaign",
+            description="Campaign used for call window advice",
+            policy_topic="test",
+            status=CampaignStatus.ACTIVE,
+        )
+    )
+    db.add(campaign)
+    db.commit()
+    target = RepresentativeTarget(
+        campaign_id=campaign.id,
+        office_type=OfficeType.SENATE,
+        office_name="Today Calls Target",
+    )
+    db.add(target)
+    db.commit()
+    template = ActionTemplate(
+        campaign_id=campaign.id,
+        target_id=target.id,
+        action_type=ActionType.CALL,
+        title="Call your senator",
+        script_text="Please support this issue.",
+        estimated_minutes=2,
+    )
+    profile = client.get(
+        f"{settings.API_V1_STR}/profile/me", headers=normal_user_token_headers
+    )
+    zone = ZoneInfo(profile.json()["timezone"] if profile.status_code == 200 else "UTC")
+    # The last hour of the local day, and a better one at the same time
+    # tomorrow that is out of reach today.
+    tonight = datetime.now(zone).replace(hour=23, minute=0, second=0, microsecond=0)
+    answered, voicemail = [0] * 168, [0] * 168
+    for local_start, calls in [
+        (tonight, (3, 1)),
+        (tonight + timedelta(days=1), (5, 0)),
+    ]:
+        start = local_start.astimezone(timezone.utc)
+        hour = start.weekday() * 24 + start.hour
+        answered[hour], voicemail[hour] = calls
+    db.add(template)
+    db.add(
+        TargetCallWindow(
+            target_id=target.id,
+            answered=answered,
+            voicemail=voicemail,
+            best_hours=call_windows.best_hours(answered, voicemail),
+        )
+    )
+    me_response = client.get(
+        f"{settings.API_V1_STR}/users/me",
+        headers=normal_user_token_headers,
+    )
+    db.add(
+        DailyActionPlan(
+            user_id=uuid.UUID(me_response.json()["id"]),
+            campaign_id=campaign.id,
+            target_actions_per_day=1,
+            active_weekdays_mask="1111111",
+            is_active=True,
+        )
+    )
+    db.commit()
+
+    response = client.get(
+        f"{settings.API_V1_STR}/actions/today",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 200
+    [row] = [
+        row for row in response.json()["data"] if row["campaign_id"] == str(campaign.id)
+    ]
+    window = row["best_call_window"]
+    assert (window["weekday"], window["hour"]) == (tonight.weekday(), 23)
+    assert window["calls"] == 4
+    assert window["answer_rate"] == 0.75
+
+
 def test_create_action_log_and_read_stats(
     client: TestClient, normal_user_token_headers: dict[str, str]
 ) -> None:
@@ -111,6 +338,29 @@ def test_create_action_log_and_read_stats(
     assert stats["completed_actions"] >= 1
     assert stats["calls"] >= 1
 
+    streaks_response = client.get(
+        f"{settings.API_V1_STR}/actions/me/streaks",
+        headers=normal_user_token_headers,
+    )
+    assert streaks_response.status_code == 200
+    user_streaks = streaks_response.json()
+    assert user_streaks["overall"]["current_streak"] >= 1
+    campaign_streak = next(
+        streak
+        for streak in user_streaks["campaigns"]
+        if streak["campaign_id"] == campaign_id
+    )
+    assert campaign_streak["current_streak"] >= 1
+    assert campaign_streak["longest_streak"] >= campaign_streak["current_streak"]
+
+    badges_response = client.get(
+        f"{settings.API_V1_STR}/actions/me/badges",
+        headers=normal_user_token_headers,
+    )
+    assert badges_response.status_code == 200
+    codes = {badge["code"] for badge in badges_response.json()["data"]}
+    assert {"first_action", "first_call"} <= codes
+
 
 def test_create_action_log_rejects_invalid_campaign(
     client: TestClient, normal_user_token_headers: dict[str, str]
@@ -130,6 +380,275 @@ def test_create_action_log_rejects_invalid_campaign(
     assert response.json()["detail"] == "Campaign not found"
 
 
+def test_create_action_logs_batch_reports_each_item(
+    client: TestClient, db: Session
+) -> None:
+    headers = authentication_token_from_email(
+        client=client, email=random_email(), db=db
+    )
+    user_id = uuid.UUID(
+        client.get(f"{settings.API_V1_STR}/users/me", headers=headers).json()["id"]
+    )
+    templates = _planned_campaign(db, user_id)
+    other_templates = _planned_campaign(db, user_id)
+    campaign_id = str(templates[0].campaign_id)
+    now = datetime.now(timezone.utc)
+
+    def item(**fields: Any) -> dict[str, Any]:
+        return {
+            "campaign_id": campaign_id,
+            "action_type": "email",
+            "status": "completed",
+            "outcome": "sent",
+            **fields,
+        }
+
+    response = client.post(
+        f"{settings.API_V1_STR}/actions/log:batch",
+        headers=headers,
+        json={
+            "data": [
+                item(
+                    template_id=str(templates[0].id),
+                    created_at=(now - timedelta(hours=2)).isoformat(),
+                ),
+                item(campaign_id=str(uuid.uuid4())),
+                item(template_id=str(other_templates[0].id)),
+                item(created_at=(now - timedelta(days=30)).isoformat()),
+                item(created_at=(now + timedelta(minutes=1)).isoformat()),
+            ]
+        },
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["created"] == 2
+    assert content["rejected"] == 3
+    assert [row["error"] for row in content["data"]] == [
+        None,
+        "Campaign not found",
+        "Action template does not belong to campaign",
+        "created_at is too far in the past",
+        None,
+    ]
+    backdated = datetime.fromisoformat(content["data"][0]["log"]["created_at"])
+    assert backdated == now - timedelta(hours=2)
+    clamped = datetime.fromisoformat(content["data"][4]["log"]["created_at"])
+    assert clamped <= datetime.now(timezone.utc)
+
+    mine = client.get(
+        f"{settings.API_V1_STR}/actions/me?include_count=true", headers=headers
+    ).json()
+    assert mine["count"] == 2
+    assert {row["id"] for row in mine["data"]} == {
+        content["data"][0]["log"]["id"],
+        content["data"][4]["log"]["id"],
+    }
+
+
+def test_create_action_logs_batch_rejects_oversized_batches(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/actions/log:batch",
+        headers=normal_user_token_headers,
+        json={
+            "data": [
+                {
+                    "campaign_id": str(uuid.uuid4()),
+                    "action_type": "email",
+                    "status": "completed",
+                }
+            ]
+            * 501
+        },
+    )
+    assert response.status_code == 422
+
+
+def test_create_action_log_write_behind_acknowledgements(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    campaigns_response = client.get(
+        f"{settings.API_V1_STR}/campaigns/",
+        headers=normal_user_token_headers,
+    )
+    body = {
+        "campaign_id": campaigns_response.json()["data"][0]["id"],
+        "action_type": "email",
+        "status": "completed",
+        "outcome": "sent",
+    }
+    action_log_writer.start()
+    try:
+        accepted = client.post(
+            f"{settings.API_V1_STR}/actions/log",
+            headers=normal_user_token_headers,
+            json=body,
+        )
+        durable = client.post(
+            f"{settings.API_V1_STR}/actions/log?ack=durable",
+            headers=normal_user_token_headers,
+            json=body,
+        )
+    finally:
+        action_log_writer.stop()
+
+    assert accepted.status_code == 202
+    assert durable.status_code == 200
+    for response in (accepted, durable):
+        log_id = uuid.UUID(response.json()["id"])
+        assert db.exec(select(UserActionLog).where(UserActionLog.id == log_id)).first()
+
+
+def test_create_action_log_replays_idempotency_key(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    campaigns_response = client.get(
+        f"{settings.API_V1_STR}/campaigns/",
+        headers=normal_user_token_headers,
+    )
+    body = {
+        "campaign_id": campaigns_response.json()["data"][0]["id"],
+        "action_type": "email",
+        "status": "completed",
+        "outcome": "sent",
+    }
+    headers = {**normal_user_token_headers, "Idempotency-Key": str(uuid.uuid4())}
+    first = client.post(
+        f"{settings.API_V1_STR}/actions/log", headers=headers, json=body
+    )
+    retry = client.post(
+        f"{settings.API_V1_STR}/actions/log", headers=headers, json=body
+    )
+    assert first.status_code == 200
+    assert retry.status_code == 200
+    assert retry.json()["id"] == first.json()["id"]
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+
+    key = str(uuid.uuid4())
+    items = [{**body, "idempotency_key": key}, {**body, "idempotency_key": key}]
+    batch = client.post(
+        f"{settings.API_V1_STR}/actions/log:batch",
+        headers=normal_user_token_headers,
+        json={
+            "data": [*items, {**body, "idempotency_key": headers["Idempotency-Key"]}]
+        },
+    ).json()
+    assert (batch["created"], batch["replayed"], batch["rejected"]) == (1, 2, 0)
+    ids = [row["log"]["id"] for row in batch["data"]]
+    assert ids[0] == ids[1]
+    assert ids[2] == first.json()["id"]
+    stored = db.exec(
+        select(func.count())
+        .select_from(UserActionLog)
+        .where(
+            col(UserActionLog.idempotency_key).in_([key, headers["Idempotency-Key"]])
+        )
+    ).one()
+    assert stored == 2
+
+
+def test_idempotency_key_of_a_deleted_log_is_taken_over(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    campaign = Campaign.model_validate(
+        CampaignCreate(
+            slug=f"stale-key-{uuid.uuid4().hex[:8]}",
+            title="Stale Key Campaign",
+            description="Campaign for stale idempotency key tests",
+            policy_topic="test",
+            status=CampaignStatus.ACTIVE,
+        )
+    )
+    db.add(campaign)
+    db.commit()
+    body = {
+        "campaign_id": str(campaign.id),
+        "action_type": "email",
+        "status": "completed",
+        "outcome": "sent",
+    }
+    headers = {**normal_user_token_headers, "Idempotency-Key": str(uuid.uuid4())}
+    first = client.post(
+        f"{settings.API_V1_STR}/actions/log", headers=headers, json=body
+    )
+    assert first.status_code == 200
+    # The claim outlives its log, as after a user delete or a detached
+    # partition.
+    db.execute(
+        delete(UserActionLog).where(
+            col(UserActionLog.id) == uuid.UUID(first.json()["id"])
+        )
+    )
+    db.commit()
+
+    retry = client.post(
+        f"{settings.API_V1_STR}/actions/log", headers=headers, json=body
+    )
+    assert retry.status_code == 200
+    assert retry.json()["id"] != first.json()["id"]
+    assert "Idempotent-Replayed" not in retry.headers
+
+    replay = client.post(
+        f"{settings.API_V1_STR}/actions/log", headers=headers, json=body
+    )
+    assert replay.json()["id"] == retry.json()["id"]
+    assert replay.headers["Idempotent-Replayed"] == "true"
+
+    # Takes the campaign's rollups along with the remaining log.
+    db.delete(campaign)
+    db.commit()
+
+
+def test_read_my_actions_pages_with_cursor(client: TestClient, db: Session) -> None:
+    headers = authentication_token_from_email(
+        client=client, email=random_email(), db=db
+    )
+    campaigns_response = client.get(
+        f"{settings.API_V1_STR}/campaigns/", headers=headers
+    )
+    campaign_id = campaigns_response.json()["data"][0]["id"]
+    # Equal timestamps must still page by id without skipping or repeating.
+    created_at = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    client.post(
+        f"{settings.API_V1_STR}/actions/log:batch",
+        headers=headers,
+        json={
+            "data": [
+                {
+                    "campaign_id": campaign_id,
+                    "action_type": "email",
+                    "status": "completed",
+                    "created_at": created_at,
+                }
+            ]
+            * 5
+        },
+    )
+
+    url = f"{settings.API_V1_STR}/actions/me"
+    seen: list[str] = []
+    params: dict[str, Any] = {"limit": 2}
+    while True:
+        page = client.get(url, headers=headers, params=params).json()
+        assert page["count"] is None
+        seen.extend(row["id"] for row in page["data"])
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+    assert len(seen) == len(set(seen)) == 5
+
+    offset_page = client.get(
+        url, headers=headers, params={"skip": 4, "include_count": True}
+    ).json()
+    assert [row["id"] for row in offset_page["data"]] == seen[4:]
+    assert offset_page["count"] == 5
+
+    bad_cursor = client.get(url, headers=headers, params={"cursor": "not-a-cursor"})
+    assert bad_cursor.status_code == 400
+
+
 def test_create_action_log_persists_db_row(
     client: TestClient, normal_user_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -157,6 +676,8 @@ def test_create_action_log_persists_db_row(
     )
     assert create_response.status_code == 200
     action_log_id = create_response.json()["id"]
-    action_log = db.get(UserActionLog, action_log_id)
+    action_log = db.exec(
+        select(UserActionLog).where(UserActionLog.id == uuid.UUID(action_log_id))
+    ).first()
     assert action_log is not None
     assert action_log.user_id == user_id
@@ -1,10 +1,14 @@
 import uuid
+from datetime import datetime, timedelta, timezone
 
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
+from app import call_windows, crud
 from app.core.config import settings
 from app.models import (
+    ActionLogStatus,
+    ActionOutcome,
     ActionTemplate,
     ActionType,
     Campaign,
@@ -12,7 +16,11 @@ from app.models import (
     CampaignStatus,
     OfficeType,
     RepresentativeTarget,
+    UserActionLog,
+    UserProfile,
 )
+from tests.utils.user import authentication_token_from_email, create_random_user
+from tests.utils.utils import random_email
 
 
 def test_read_campaigns_returns_seeded_data(
@@ -59,7 +67,9 @@ def test_read_campaigns_supports_status_filter(
         campaign_row["status"] == CampaignStatus.ACTIVE.value
         for campaign_row in payload["data"]
     )
-    assert all(campaign_row["id"] != str(campaign.id) for campaign_row in payload["data"])
+    assert all(
+        campaign_row["id"] != str(campaign.id) for campaign_row in payload["data"]
+    )
 
 
 def test_read_campaign_by_id(
@@ -160,3 +170,166 @@ def test_read_campaign_templates(
     assert payload["count"] >= 1
     assert len(payload["data"]) >= 1
     assert payload["data"][0]["campaign_id"] == str(campaign.id)
+
+    etag = response.headers["etag"]
+    not_modified = client.get(
+        f"{settings.API_V1_STR}/campaigns/{campaign.id}/templates",
+        headers={**superuser_token_headers, "If-None-Match": etag},
+    )
+    assert not_modified.status_code == 304
+
+    db.add(
+        ActionTemplate(
+            campaign_id=campaign.id,
+            action_type=ActionType.EMAIL,
+            title="Email Template",
+            script_text="Please support this campaign",
+        )
+    )
+    db.commit()
+    changed = client.get(
+        f"{settings.API_V1_STR}/campaigns/{campaign.id}/templates",
+        headers={**superuser_token_headers, "If-None-Match": etag},
+    )
+    assert changed.status_code == 200
+    assert changed.json()["count"] == 2
+    assert changed.headers["etag"] != etag
+
+
+def test_read_campaigns_answers_conditional_get(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    url = f"{settings.API_V1_STR}/campaigns/?status=active"
+    response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    not_modified = client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": etag}
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    other_filter = client.get(
+        f"{settings.API_V1_STR}/campaigns/?status=draft",
+        headers={**superuser_token_headers, "If-None-Match": etag},
+    )
+    assert other_filter.status_code == 200
+
+    db.add(
+        Campaign.model_validate(
+            CampaignCreate(
+                slug=f"etag-{uuid.uuid4().hex[:8]}",
+                title="ETag Campaign",
+                description="Campaign for conditional GET tests",
+                policy_topic="test",
+                status=CampaignStatus.ACTIVE,
+            )
+        )
+    )
+    db.commit()
+    changed = client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+    anonymous = client.get(url, headers={"If-None-Match": changed.headers["etag"]})
+    assert anonymous.status_code == 401
+
+
+def test_read_target_call_windows_ranks_rebuilt_histogram(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    campaign = Campaign.model_validate(
+        CampaignCreate(
+            slug=f"call-windows-{uuid.uuid4().hex[:8]}",
+            title="Call Windows Campaign",
+            description="Campaign for call window tests",
+            policy_topic="test",
+            status=CampaignStatus.ACTIVE,
+        )
+    )
+    db.add(campaign)
+    db.commit()
+    target = RepresentativeTarget(
+        campaign_id=campaign.id,
+        office_type=OfficeType.HOUSE,
+        office_name="Call Windows Target",
+    )
+    db.add(target)
+    db.commit()
+    user = create_random_user(db)
+
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0)
+    last_monday = today - timedelta(days=today.weekday() + 7)
+    logs = [
+        UserActionLog(
+            user_id=user.id,
+            campaign_id=campaign.id,
+            target_id=target.id,
+            action_type=ActionType.CALL,
+            status=ActionLogStatus.COMPLETED,
+            outcome=outcome,
+            created_at=last_monday + timedelta(hours=hours),
+        )
+        for hours, outcome in [
+            # Monday 15:00 UTC: always answered.
+            *[(15, ActionOutcome.ANSWERED)] * 4,
+            # Tuesday 10:00 UTC: mostly voicemail.
+            (34, ActionOutcome.ANSWERED),
+            *[(34, ActionOutcome.VOICEMAIL)] * 3,
+            # Wednesday 09:00 UTC: too few calls to recommend.
+            *[(57, ActionOutcome.ANSWERED)] * 2,
+        ]
+    ]
+    db.add_all(logs)
+    crud.record_action_logs(session=db, action_logs=logs)
+    db.commit()
+
+    assert call_windows.rebuild(db) >= 1
+
+    response = client.get(
+        f"{settings.API_V1_STR}/campaigns/{campaign.id}/targets/{target.id}/call-windows",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["timezone"] == "UTC"
+    assert payload["generated_at"] is not None
+    assert [
+        (window["weekday"], window["hour"], window["calls"])
+        for window in payload["data"]
+    ] == [(0, 15, 4), (1, 10, 4)]
+    assert payload["data"][0]["answer_rate"] == 1.0
+    assert payload["data"][1]["answer_rate"] == 0.25
+
+    # India is UTC+05:30, so the windows start on the half hour.
+    email = random_email()
+    kolkata_headers = authentication_token_from_email(client=client, email=email, db=db)
+    kolkata_user = crud.get_user_by_email(session=db, email=email)
+    assert kolkata_user
+    db.add(
+        UserProfile(
+            user_id=kolkata_user.id,
+            username=f"kolkata_{uuid.uuid4().hex[:10]}",
+            timezone="Asia/Kolkata",
+        )
+    )
+    db.commit()
+    kolkata = client.get(
+        f"{settings.API_V1_STR}/campaigns/{campaign.id}/targets/{target.id}/call-windows",
+        headers=kolkata_headers,
+    )
+    assert [
+        (window["weekday"], window["hour"], window["minute"])
+        for window in kolkata.json()["data"]
+    ] == [(0, 20, 30), (1, 15, 30)]
+
+    other_campaign = client.get(
+        f"{settings.API_V1_STR}/campaigns/{uuid.uuid4()}/targets/{target.id}/call-windows",
+        headers=superuser_token_headers,
+    )
+    assert other_campaign.status_code == 404
@@ -0,0 +1,150 @@
+import csv
+import io
+import json
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.exports import pseudonym
+from app.models import (
+    ActionLogStatus,
+    ActionOutcome,
+    ActionType,
+    Campaign,
+    CampaignCreate,
+    CampaignStatus,
+    UserActionLogCreate,
+    UserProfile,
+    VisibilityMode,
+)
+from tests.utils.user import create_random_user
+
+
+def _campaign_with_participants(db: Session) -> tuple[Campaign, str, uuid.UUID]:
+    campaign = Campaign.model_validate(
+        CampaignCreate(
+            slug=f"export-{uuid.uuid4().hex[:8]}",
+            title="Export Campaign",
+            description="Campaign for export tests",
+            policy_topic="test",
+            status=CampaignStatus.ACTIVE,
+        )
+    )
+    db.add(campaign)
+    public_user = create_random_user(db)
+    private_user = create_random_user(db)
+    public_name = f"export_{uuid.uuid4().hex[:10]}"
+    db.add(
+        UserProfile(
+            user_id=public_user.id,
+            username=public_name,
+            visibility_mode=VisibilityMode.PUBLIC_OPT_IN,
+        )
+    )
+    db.add(
+        UserProfile(
+            user_id=private_user.id,
+            username=f"hidden_{uuid.uuid4().hex[:10]}",
+            visibility_mode=VisibilityMode.PRIVATE,
+        )
+    )
+    db.commit()
+    for user, action_type in [
+        (public_user, ActionType.CALL),
+        (private_user, ActionType.EMAIL),
+        (private_user, ActionType.CALL),
+    ]:
+        crud.create_action_log(
+            session=db,
+            action_log_in=UserActionLogCreate(
+                campaign_id=campaign.id,
+                action_type=action_type,
+                status=ActionLogStatus.COMPLETED,
+                outcome=ActionOutcome.ANSWERED,
+                confidence_score=4,
+            ),
+            user_id=user.id,
+        )
+    return campaign, public_name, private_user.id
+
+
+def test_export_campaign_actions_ndjson_pseudonymizes_private_users(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    campaign, public_name, private_user_id = _campaign_with_participants(db)
+
+    response = client.get(
+        f"{settings.API_V1_STR}/exports/campaign/{campaign.id}/actions.ndjson",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    disposition = response.headers["content-disposition"]
+    assert f"{campaign.slug}-actions-30d.ndjson" in disposition
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 3
+    assert [row["participant"] for row in rows] == [
+        public_name,
+        pseudonym(private_user_id),
+        pseudonym(private_user_id),
+    ]
+    assert rows[0]["action_type"] == "call"
+    assert rows[0]["outcome"] == "answered"
+    assert "user_id" not in rows[0]
+
+
+def test_export_campaign_actions_and_impact_csv(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    campaign, _, _ = _campaign_with_participants(db)
+
+    actions = client.get(
+        f"{settings.API_V1_STR}/exports/campaign/{campaign.id}/actions.csv?window=7d",
+        headers=superuser_token_headers,
+    )
+    assert actions.status_code == 200
+    assert actions.headers["content-type"].startswith("text/csv")
+    action_rows = list(csv.DictReader(io.StringIO(actions.text)))
+    assert len(action_rows) == 3
+    assert action_rows[0]["confidence_score"] == "4"
+
+    impact = client.get(
+        f"{settings.API_V1_STR}/exports/campaign/{campaign.id}/impact.csv",
+        headers=superuser_token_headers,
+    )
+    assert impact.status_code == 200
+    impact_rows = list(csv.DictReader(io.StringIO(impact.text)))
+    assert {row["action_type"]: row["action_count"] for row in impact_rows} == {
+        "call": "2",
+        "email": "1",
+    }
+
+
+def test_export_requires_superuser(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    campaign, _, _ = _campaign_with_participants(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/exports/campaign/{campaign.id}/actions.csv",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 403
+
+
+def test_export_rejects_unknown_format_and_campaign(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    unknown_campaign = client.get(
+        f"{settings.API_V1_STR}/exports/campaign/{uuid.uuid4()}/actions.csv",
+        headers=superuser_token_headers,
+    )
+    assert unknown_campaign.status_code == 404
+
+    unknown_format = client.get(
+        f"{settings.API_V1_STR}/exports/campaign/{uuid.uuid4()}/actions.xlsx",
+        headers=superuser_token_headers,
+    )
+    assert unknown_format.status_code == 422
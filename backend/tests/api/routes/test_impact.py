@@ -1,8 +1,13 @@
 import uuid
+from datetime import datetime, timedelta, timezone
 
+import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
+from app import crud, leaderboards
+from app.api.routes import impact as impact_routes
+from app.api.routes.impact import impact_cache, share_card_cache, version_cache
 from app.core.config import settings
 from app.models import (
     ActionLogStatus,
@@ -16,6 +21,9 @@ from app.models import (
     OfficeType,
     RepresentativeTarget,
     UserActionLog,
+    UserActionLogCreate,
+    UserPrivacySettings,
+    UserProfile,
     VisibilityMode,
 )
 from tests.utils.user import create_random_user
@@ -72,27 +80,30 @@ def test_read_platform_impact_returns_aggregate_metrics(
     current_user_id = uuid.UUID(me_response.json()["id"])
     second_user = create_random_user(db)
 
-    db.add(
-        UserActionLog(
-            user_id=current_user_id,
+    crud.create_action_log(
+        session=db,
+        action_log_in=UserActionLogCreate(
             campaign_id=campaign_id,
             action_type=ActionType.CALL,
             status=ActionLogStatus.COMPLETED,
             outcome=ActionOutcome.ANSWERED,
             confidence_score=4,
-        )
+        ),
+        user_id=current_user_id,
     )
-    db.add(
-        UserActionLog(
-            user_id=second_user.id,
+    crud.create_action_log(
+        session=db,
+        action_log_in=UserActionLogCreate(
             campaign_id=campaign_id,
             action_type=ActionType.EMAIL,
             status=ActionLogStatus.SKIPPED,
             outcome=ActionOutcome.SENT,
             confidence_score=3,
-        )
+        ),
+        user_id=second_user.id,
     )
-    db.commit()
+    # Platform impact is cached per time bucket; drop the baseline response.
+    impact_cache.clear()
 
     response = client.get(
         f"{settings.API_V1_STR}/impact/platform?window=7d",
@@ -132,37 +143,39 @@ def test_read_campaign_impact_returns_only_campaign_logs(
     )
     current_user_id = uuid.UUID(me_response.json()["id"])
 
-    db.add(
-        UserActionLog(
-            user_id=current_user_id,
+    crud.create_action_log(
+        session=db,
+        action_log_in=UserActionLogCreate(
             campaign_id=campaign.id,
             action_type=ActionType.CALL,
             status=ActionLogStatus.COMPLETED,
             outcome=ActionOutcome.ANSWERED,
             confidence_score=4,
-        )
+        ),
+        user_id=current_user_id,
     )
-    db.add(
-        UserActionLog(
-            user_id=current_user_id,
+    crud.create_action_log(
+        session=db,
+        action_log_in=UserActionLogCreate(
             campaign_id=campaign.id,
             action_type=ActionType.EMAIL,
             status=ActionLogStatus.COMPLETED,
             outcome=ActionOutcome.SENT,
             confidence_score=5,
-        )
+        ),
+        user_id=current_user_id,
     )
-    db.add(
-        UserActionLog(
-            user_id=current_user_id,
+    crud.create_action_log(
+        session=db,
+        action_log_in=UserActionLogCreate(
             campaign_id=campaign.id,
             action_type=ActionType.CALL,
             status=ActionLogStatus.SKIPPED,
             outcome=ActionOutcome.UNKNOWN,
             confidence_score=2,
-        )
+        ),
+        user_id=current_user_id,
     )
-    db.commit()
 
     response = client.get(
         f"{settings.API_V1_STR}/impact/campaign/{campaign.id}?window=7d",
@@ -181,6 +194,446 @@ def test_read_campaign_impact_returns_only_campaign_logs(
     assert payload["participant_range"] == "1-9"
 
 
+def _create_campaign_with_logs(db: Session, user_id: uuid.UUID) -> Campaign:
+    campaign = Campaign.model_validate(
+        CampaignCreate(
+            slug=f"series-{uuid.uuid4().hex[:8]}",
+            title="Series Campaign",
+            description="Campaign for impact series tests",
+            policy_topic="test",
+            status=CampaignStatus.ACTIVE,
+        )
+    )
+    db.add(campaign)
+    db.commit()
+    db.refresh(campaign)
+    for action_type, status in [
+        (ActionType.CALL, ActionLogStatus.COMPLETED),
+        (ActionType.EMAIL, ActionLogStatus.COMPLETED),
+        (ActionType.CALL, ActionLogStatus.SKIPPED),
+    ]:
+        crud.create_action_log(
+            session=db,
+            action_log_in=UserActionLogCreate(
+                campaign_id=campaign.id,
+                action_type=action_type,
+                status=status,
+                outcome=ActionOutcome.UNKNOWN,
+                confidence_score=3,
+            ),
+            user_id=user_id,
+        )
+    return campaign
+
+
+def test_read_campaign_impact_series_fills_empty_days(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    user = create_random_user(db)
+    campaign = _create_campaign_with_logs(db, user.id)
+
+    response = client.get(
+        f"{settings.API_V1_STR}/impact/campaign/{campaign.id}/series?window=7d&bucket=day",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["campaign_id"] == str(campaign.id)
+    assert payload["bucket"] == "day"
+    assert len(payload["data"]) == 8
+    starts = [point["bucket_start"] for point in payload["data"]]
+    assert starts == sorted(starts)
+    assert [point["total_actions"] for point in payload["data"][:-1]] == [0] * 7
+    today = payload["data"][-1]
+    assert today["total_actions"] == 3
+    assert today["completed_actions"] == 2
+    assert today["skipped_actions"] == 1
+    assert today["calls"] == 2
+    assert today["emails"] == 1
+
+
+def test_read_campaign_impact_series_hourly_and_weekly(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    user = create_random_user(db)
+    campaign = _create_campaign_with_logs(db, user.id)
+
+    hourly = client.get(
+        f"{settings.API_V1_STR}/impact/campaign/{campaign.id}/series?window=1d&bucket=hour",
+        headers=normal_user_token_headers,
+    )
+    assert hourly.status_code == 200
+    hourly_data = hourly.json()["data"]
+    assert len(hourly_data) == 25
+    assert hourly_data[-1]["total_actions"] == 3
+    assert sum(point["total_actions"] for point in hourly_data) == 3
+
+    weekly = client.get(
+        f"{settings.API_V1_STR}/impact/campaign/{campaign.id}/series?window=30d&bucket=week",
+        headers=normal_user_token_headers,
+    )
+    assert weekly.status_code == 200
+    weekly_data = weekly.json()["data"]
+    assert 5 <= len(weekly_data) <= 6
+    assert sum(point["total_actions"] for point in weekly_data) == 3
+    assert weekly_data[-1]["calls"] == 2
+
+
+def test_read_campaign_impact_multiple_windows_with_deltas(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    user = create_random_user(db)
+    campaign = _create_campaign_with_logs(db, user.id)
+    log = UserActionLog(
+        user_id=user.id,
+        campaign_id=campaign.id,
+        action_type=ActionType.EMAIL,
+        status=ActionLogStatus.COMPLETED,
+        created_at=datetime.now(timezone.utc) - timedelta(days=10),
+    )
+    db.add(log)
+    crud.record_action_logs(session=db, action_logs=[log])
+    db.commit()
+
+    response = client.get(
+        f"{settings.API_V1_STR}/impact/campaign/{campaign.id}?window=7d&windows=30d,7d",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["window_days"] == 7
+    assert payload["total_actions"] == 3
+    assert payload["unique_participants"] == 1
+    week, month = payload["windows"]
+    assert (week["window_days"], week["total_actions"], week["emails"]) == (7, 3, 1)
+    assert week["delta"]["total_actions"] == 2
+    assert week["delta"]["emails"] == 0
+    assert (month["window_days"], month["total_actions"]) == (30, 4)
+    assert month["delta"]["total_actions"] == 4
+
+    single = client.get(
+        f"{settings.API_V1_STR}/impact/campaign/{campaign.id}?window=30d",
+        headers=normal_user_token_headers,
+    )
+    assert single.json()["windows"] is None
+    for name in ("total_actions", "completed_actions", "calls", "emails"):
+        assert single.json()[name] == month[name]
+
+
+def test_read_impact_rejects_too_many_windows(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/impact/platform?windows=1d,2d,3d,4d,5d,6d",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 400
+
+
+def test_read_impact_series_rejects_long_hourly_window(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/impact/platform/series?window=90d&bucket=hour",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 400
+
+
+def test_read_geo_impact_by_target_and_actor(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    db: Session,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    campaign = Campaign.model_validate(
+        CampaignCreate(
+            slug=f"geo-{uuid.uuid4().hex[:8]}",
+            title="Geo Campaign",
+            description="Campaign for geographic impact tests",
+            policy_topic="test",
+            status=CampaignStatus.ACTIVE,
+        )
+    )
+    db.add(campaign)
+    db.commit()
+    targets = [
+        RepresentativeTarget(
+            campaign_id=campaign.id,
+            office_type=OfficeType.HOUSE,
+            office_name=f"Geo Target {state_code}-{district_code}",
+            state_code=state_code,
+            district_code=district_code,
+        )
+        for state_code, district_code in [("TX", "07"), ("TX", "09"), ("CA", "12")]
+    ]
+    db.add_all(targets)
+    actor = create_random_user(db)
+    db.add(
+        UserProfile(
+            user_id=actor.id,
+            username=f"geo_{uuid.uuid4().hex[:10]}",
+            state_code="NY",
+            district_code="03",
+        )
+    )
+    db.commit()
+    for target, action_type in [
+        (targets[0], ActionType.CALL),
+        (targets[1], ActionType.EMAIL),
+        (targets[2], ActionType.CALL),
+        (None, ActionType.BOYCOTT),
+    ]:
+        crud.create_action_log(
+            session=db,
+            action_log_in=UserActionLogCreate(
+                campaign_id=campaign.id,
+                target_id=target.id if target else None,
+                action_type=action_type,
+                status=ActionLogStatus.COMPLETED,
+                outcome=ActionOutcome.UNKNOWN,
+                confidence_score=3,
+            ),
+            user_id=actor.id,
+        )
+
+    states = client.get(
+        f"{settings.API_V1_STR}/impact/geo?level=state&campaign_id={campaign.id}",
+        headers=normal_user_token_headers,
+    )
+    assert states.status_code == 200
+    payload = states.json()
+    assert payload["basis"] == "target"
+    assert payload["campaign_title"] == campaign.title
+    assert [
+        (region["state_code"], region["total_actions"], region["calls"])
+        for region in payload["data"]
+    ] == [("CA", 1, 1), ("TX", 2, 1)]
+
+    districts = client.get(
+        f"{settings.API_V1_STR}/impact/geo?level=district&campaign_id={campaign.id}",
+        headers=normal_user_token_headers,
+    )
+    assert districts.status_code == 200
+    assert [
+        (region["state_code"], region["district_code"], region["total_actions"])
+        for region in districts.json()["data"]
+    ] == [("CA", "12", 1), ("TX", "07", 1), ("TX", "09", 1)]
+
+    actors_url = f"{settings.API_V1_STR}/impact/geo?level=district&basis=actor&campaign_id={campaign.id}"
+    monkeypatch.setattr(settings, "GEO_MIN_ACTORS", 2)
+    suppressed = client.get(actors_url, headers=normal_user_token_headers)
+    assert suppressed.status_code == 200
+    assert suppressed.json()["data"] == []
+
+    monkeypatch.setattr(settings, "GEO_MIN_ACTORS", 1)
+    actors = client.get(actors_url, headers=normal_user_token_headers)
+    assert actors.status_code == 200
+    [region] = actors.json()["data"]
+    assert (region["state_code"], region["district_code"]) == ("NY", "03")
+    assert region["total_actions"] == 4
+    assert region["boycotts"] == 1
+
+
+def test_read_geo_impact_campaign_not_found(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/impact/geo?campaign_id={uuid.uuid4()}",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 404
+
+
+def test_campaign_impact_answers_conditional_get(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    user = create_random_user(db)
+    campaign = _create_campaign_with_logs(db, user.id)
+    url = f"{settings.API_V1_STR}/impact/campaign/{campaign.id}?window=7d"
+
+    response = client.get(url, headers=normal_user_token_headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    misses_before = impact_cache.stats().misses
+    not_modified = client.get(
+        url, headers={**normal_user_token_headers, "If-None-Match": etag}
+    )
+    assert not_modified.status_code == 304
+    # The ETag is derived from the cached response, not from a new query.
+    assert impact_cache.stats().misses == misses_before
+
+    _log_completed(db, campaign, user.id, 1)
+    # The new log shows once the cached response expires.
+    impact_cache.clear()
+    changed = client.get(
+        url, headers={**normal_user_token_headers, "If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["total_actions"] == response.json()["total_actions"] + 1
+
+
+def test_actor_geo_version_follows_profile_edits(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Keep every request inside one cache bucket.
+    monkeypatch.setattr(impact_routes, "_cache_bucket", lambda: 0)
+    _complete_onboarding(client, normal_user_token_headers)
+    actor_url = f"{settings.API_V1_STR}/impact/geo?level=district&basis=actor"
+    target_url = f"{settings.API_V1_STR}/impact/geo?level=district"
+    actor_etag = client.get(actor_url, headers=normal_user_token_headers).headers[
+        "etag"
+    ]
+    target_etag = client.get(target_url, headers=normal_user_token_headers).headers[
+        "etag"
+    ]
+
+    response = client.patch(
+        f"{settings.API_V1_STR}/profile/me",
+        headers=normal_user_token_headers,
+        json={"district_code": "35"},
+    )
+    assert response.status_code == 200
+    # Version tokens are cached like responses; drop them as if they expired.
+    version_cache.clear()
+
+    actor = client.get(
+        actor_url, headers={**normal_user_token_headers, "If-None-Match": actor_etag}
+    )
+    assert actor.status_code == 200
+    target = client.get(
+        target_url,
+        headers={**normal_user_token_headers, "If-None-Match": target_etag},
+    )
+    assert target.status_code == 304
+
+
+def test_read_campaign_impacts_batch_reports_missing_ids(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    user = create_random_user(db)
+    first = _create_campaign_with_logs(db, user.id)
+    second = _create_campaign_with_logs(db, user.id)
+    missing_id = uuid.uuid4()
+
+    response = client.post(
+        f"{settings.API_V1_STR}/impact/campaigns:batch",
+        headers=normal_user_token_headers,
+        json={
+            "ids": [str(first.id), str(missing_id), str(second.id)],
+            "window": "7d",
+        },
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["count"] == 3
+    first_item, missing_item, second_item = payload["data"]
+    assert missing_item == {
+        "id": str(missing_id),
+        "impact": None,
+        "error": "Campaign not found",
+    }
+    for item, campaign in [(first_item, first), (second_item, second)]:
+        assert item["id"] == str(campaign.id)
+        assert item["error"] is None
+        assert item["impact"]["campaign_title"] == campaign.title
+        assert item["impact"]["total_actions"] == 3
+        assert item["impact"]["calls"] == 2
+        assert item["impact"]["unique_participants"] == 1
+
+
+def test_read_representative_impacts_batch(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    user = create_random_user(db)
+    campaign = _create_campaign_with_logs(db, user.id)
+    target = RepresentativeTarget(
+        campaign_id=campaign.id,
+        office_type=OfficeType.SENATE,
+        office_name="Batch Impact Target",
+        state_code="TX",
+    )
+    db.add(target)
+    db.commit()
+    crud.create_action_log(
+        session=db,
+        action_log_in=UserActionLogCreate(
+            campaign_id=campaign.id,
+            target_id=target.id,
+            action_type=ActionType.CALL,
+            status=ActionLogStatus.COMPLETED,
+            outcome=ActionOutcome.VOICEMAIL,
+            confidence_score=3,
+        ),
+        user_id=user.id,
+    )
+
+    response = client.post(
+        f"{settings.API_V1_STR}/impact/representatives:batch",
+        headers=normal_user_token_headers,
+        json={"ids": [str(target.id), str(uuid.uuid4())]},
+    )
+    assert response.status_code == 200
+    found, missing = response.json()["data"]
+    assert found["impact"]["total_actions"] == 1
+    assert found["impact"]["campaign_id"] == str(campaign.id)
+    assert missing["error"] == "Representative target not found"
+
+
+def test_read_campaign_impacts_batch_rejects_oversized_request(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/impact/campaigns:batch",
+        headers=normal_user_token_headers,
+        json={"ids": [str(uuid.uuid4()) for _ in range(501)]},
+    )
+    assert response.status_code == 422
+
+
+def test_platform_impact_is_served_from_cache(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    superuser_token_headers: dict[str, str],
+) -> None:
+    impact_cache.clear()
+    before = client.get(
+        f"{settings.API_V1_STR}/impact/cache-stats",
+        headers=superuser_token_headers,
+    ).json()
+
+    for _ in range(3):
+        response = client.get(
+            f"{settings.API_V1_STR}/impact/platform?window=30d",
+            headers=normal_user_token_headers,
+        )
+        assert response.status_code == 200
+
+    after = client.get(
+        f"{settings.API_V1_STR}/impact/cache-stats",
+        headers=superuser_token_headers,
+    ).json()
+    misses = after["misses"] - before["misses"]
+    hits = after["hits"] - before["hits"]
+    assert misses + hits == 3
+    # A second miss is only possible if the requests straddle a time bucket.
+    assert hits >= 1
+    assert after["size"] >= 1
+
+
+def test_impact_cache_stats_requires_superuser(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/impact/cache-stats",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 403
+
+
 def test_read_campaign_impact_not_found(
     client: TestClient, normal_user_token_headers: dict[str, str]
 ) -> None:
@@ -257,6 +710,82 @@ def test_read_representative_impact_returns_target_scoped_metrics(
     assert payload["campaign_id"] == str(campaign.id)
 
 
+def test_read_representative_outcomes_histograms(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    user = create_random_user(db)
+    campaign = _create_campaign_with_logs(db, user.id)
+    target = RepresentativeTarget(
+        campaign_id=campaign.id,
+        office_type=OfficeType.HOUSE,
+        office_name="Outcome Target",
+        state_code="TX",
+        district_code="02",
+    )
+    db.add(target)
+    db.commit()
+    for action_type, status, outcome, confidence_score in [
+        (ActionType.CALL, ActionLogStatus.COMPLETED, ActionOutcome.ANSWERED, 5),
+        (ActionType.CALL, ActionLogStatus.COMPLETED, ActionOutcome.ANSWERED, 4),
+        (ActionType.CALL, ActionLogStatus.COMPLETED, ActionOutcome.VOICEMAIL, 3),
+        (ActionType.CALL, ActionLogStatus.SKIPPED, ActionOutcome.UNKNOWN, None),
+        (ActionType.EMAIL, ActionLogStatus.COMPLETED, ActionOutcome.SENT, None),
+    ]:
+        crud.create_action_log(
+            session=db,
+            action_log_in=UserActionLogCreate(
+                campaign_id=campaign.id,
+                target_id=target.id,
+                action_type=action_type,
+                status=status,
+                outcome=outcome,
+                confidence_score=confidence_score,
+            ),
+            user_id=user.id,
+        )
+
+    response = client.get(
+        f"{settings.API_V1_STR}/impact/representative/{target.id}/outcomes",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["target_id"] == str(target.id)
+    assert payload["campaign_id"] == str(campaign.id)
+    calls, emails = payload["data"]
+    assert calls["action_type"] == "call"
+    assert calls["total_actions"] == 3
+    assert calls["outcomes"]["answered"] == 2
+    assert calls["outcomes"]["voicemail"] == 1
+    assert calls["confidence_scores"] == {"1": 0, "2": 0, "3": 1, "4": 1, "5": 1}
+    assert calls["answer_rate"] == pytest.approx(2 / 3)
+    assert calls["average_confidence"] == pytest.approx(4.0)
+    assert emails["outcomes"]["sent"] == 1
+    assert emails["unscored"] == 1
+    assert emails["answer_rate"] is None
+    assert emails["average_confidence"] is None
+
+    campaign_response = client.get(
+        f"{settings.API_V1_STR}/impact/campaign/{campaign.id}/outcomes",
+        headers=normal_user_token_headers,
+    )
+    assert campaign_response.status_code == 200
+    campaign_calls = campaign_response.json()["data"][0]
+    # Includes the untargeted completed call from _create_campaign_with_logs.
+    assert campaign_calls["total_actions"] == 4
+    assert campaign_calls["outcomes"]["unknown"] == 1
+
+
+def test_read_representative_impact_series_not_found(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/impact/representative/{uuid.uuid4()}/series",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 404
+
+
 def test_read_representative_impact_not_found(
     client: TestClient, normal_user_token_headers: dict[str, str]
 ) -> None:
@@ -268,6 +797,92 @@ def test_read_representative_impact_not_found(
     assert response.json()["detail"] == "Representative target not found"
 
 
+def _log_completed(
+    db: Session, campaign: Campaign, user_id: uuid.UUID, count: int
+) -> None:
+    for _ in range(count):
+        crud.create_action_log(
+            session=db,
+            action_log_in=UserActionLogCreate(
+                campaign_id=campaign.id,
+                action_type=ActionType.EMAIL,
+                status=ActionLogStatus.COMPLETED,
+            ),
+            user_id=user_id,
+        )
+
+
+def test_leaderboard_ranks_only_opted_in_users(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    username = _complete_onboarding(client, normal_user_token_headers)
+    opt_in = client.patch(
+        f"{settings.API_V1_STR}/privacy/me",
+        headers=normal_user_token_headers,
+        json={"show_on_leaderboard": True},
+    )
+    assert opt_in.status_code == 200
+    me_id = uuid.UUID(opt_in.json()["user_id"])
+
+    campaign = _create_campaign_with_logs(db, create_random_user(db).id)
+    leader = create_random_user(db)
+    trailing = create_random_user(db)
+    hidden = create_random_user(db)
+    for user in (leader, trailing):
+        db.add(UserPrivacySettings(user_id=user.id, show_on_leaderboard=True))
+    db.add(UserPrivacySettings(user_id=hidden.id))
+    db.commit()
+    _log_completed(db, campaign, leader.id, 3)
+    _log_completed(db, campaign, me_id, 2)
+    _log_completed(db, campaign, trailing.id, 1)
+    _log_completed(db, campaign, hidden.id, 5)
+    leaderboards.rebuild(db, window_days=30)
+
+    response = client.get(
+        f"{settings.API_V1_STR}/impact/leaderboard?window=30d&campaign_id={campaign.id}",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["generated_at"] is not None
+    assert [(entry["rank"], entry["score"]) for entry in payload["data"]] == [
+        (1, 3),
+        (2, 2),
+        (3, 1),
+    ]
+    assert payload["data"][1]["is_me"]
+    assert payload["me"] == {
+        "rank": 2,
+        "username": username,
+        "score": 2,
+        "is_me": True,
+    }
+
+    opt_out = client.patch(
+        f"{settings.API_V1_STR}/privacy/me",
+        headers=normal_user_token_headers,
+        json={"show_on_leaderboard": False},
+    )
+    assert opt_out.status_code == 200
+    response = client.get(
+        f"{settings.API_V1_STR}/impact/leaderboard?window=30d&campaign_id={campaign.id}",
+        headers=normal_user_token_headers,
+    )
+    payload = response.json()
+    assert payload["me"] is None
+    assert [entry["score"] for entry in payload["data"]] == [3, 1]
+
+
+def test_leaderboard_rejects_unmaintained_window(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/impact/leaderboard?window=14d",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 400
+
+
 def test_share_card_is_private_by_default(
     client: TestClient, normal_user_token_headers: dict[str, str]
 ) -> None:
@@ -374,3 +989,91 @@ def test_share_card_includes_username_only_for_public_opt_in(
     assert payload["shareable"] is True
     assert payload["visibility_mode"] == VisibilityMode.PUBLIC_OPT_IN.value
     assert payload["display_name"] == username
+
+    image = client.get(
+        f"{settings.API_V1_STR}/impact/me/share-card.svg?window=7d",
+        headers=normal_user_token_headers,
+    )
+    assert image.status_code == 200
+    assert f"{username}&#39;s impact" in image.text
+
+
+def test_share_card_image_is_cached_by_content_hash(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    _complete_onboarding(client, normal_user_token_headers)
+    url = f"{settings.API_V1_STR}/impact/me/share-card.svg?window=30d"
+
+    response = client.get(url, headers=normal_user_token_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/svg+xml"
+    assert response.text.startswith("<svg")
+    assert "My advocacy impact" in response.text
+    assert response.headers["cache-control"].startswith("private, max-age=")
+    etag = response.headers["etag"]
+
+    hits_before = share_card_cache.stats().hits
+    repeat = client.get(url, headers=normal_user_token_headers)
+    assert repeat.headers["etag"] == etag
+    assert repeat.content == response.content
+    assert share_card_cache.stats().hits == hits_before + 1
+
+    not_modified = client.get(
+        url, headers={**normal_user_token_headers, "If-None-Match": etag}
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    stale = client.get(
+        url, headers={**normal_user_token_headers, "If-None-Match": '"outdated"'}
+    )
+    assert stale.status_code == 200
+
+
+def test_share_card_image_has_a_public_signed_url(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    _complete_onboarding(client, normal_user_token_headers)
+    privacy_url = f"{settings.API_V1_STR}/privacy/me"
+    card_url = f"{settings.API_V1_STR}/impact/me/share-card?window=30d"
+
+    client.patch(
+        privacy_url,
+        headers=normal_user_token_headers,
+        json={"allow_shareable_card": False},
+    )
+    card = client.get(card_url, headers=normal_user_token_headers).json()
+    assert card["image_url"] is None
+
+    client.patch(
+        privacy_url,
+        headers=normal_user_token_headers,
+        json={"allow_shareable_card": True},
+    )
+    image_url = client.get(card_url, headers=normal_user_token_headers).json()[
+        "image_url"
+    ]
+    assert image_url.endswith(".svg?window=30d")
+
+    response = client.get(image_url)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/svg+xml"
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    etag = response.headers["etag"]
+
+    not_modified = client.get(image_url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+
+    token = image_url.split("/")[-1].split(".svg")[0]
+    forged = image_url.replace(token, token[:32] + "0" * 32)
+    assert client.get(forged).status_code == 404
+    assert client.get(image_url.replace(token, "not-a-token")).status_code == 404
+
+    client.patch(
+        privacy_url,
+        headers=normal_user_token_headers,
+        json={"allow_shareable_card": False},
+    )
+    assert client.get(image_url).status_code == 404
@@ -38,6 +38,17 @@ def test_create_referral_link(client: TestClient, normal_user_token_headers: dic
     assert payload["invite_url"].startswith(f"{settings.FRONTEND_HOST}/signup?ref=")
 
 
+def test_create_referral_link_is_idempotent(client: TestClient, normal_user_token_headers: dict[str, str]) -> None:
+    headers = {**normal_user_token_headers, "Idempotency-Key": random_email()}
+    first = client.post(f"{settings.API_V1_STR}/referrals/link", headers=headers, json={"channel": "link"})
+    retry = client.post(f"{settings.API_V1_STR}/referrals/link", headers=headers, json={"channel": "link"})
+    assert first.status_code == 200
+    assert retry.status_code == 200
+    assert retry.json()["code"] == first.json()["code"]
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+
+
 def test_referral_claim_and_referrer_metrics(
     client: TestClient, normal_user_token_headers: dict[str, str]
 ) -> None:
@@ -63,7 +74,7 @@ def test_referral_claim_and_referrer_metrics(
     assert claim_response.json()["message"] == "Referral claimed"
 
     referrer_list = client.get(
-        f"{settings.API_V1_STR}/referrals/me",
+        f"{settings.API_V1_STR}/referrals/me?include_count=true",
         headers=normal_user_token_headers,
     )
     assert referrer_list.status_code == 200
@@ -71,6 +82,13 @@ def test_referral_claim_and_referrer_metrics(
     assert payload["count"] >= 1
     assert any(item["code"] == code and item["referred_user_id"] is not None for item in payload["data"])
 
+    badges_response = client.get(
+        f"{settings.API_V1_STR}/actions/me/badges",
+        headers=normal_user_token_headers,
+    )
+    assert badges_response.status_code == 200
+    assert "first_recruit" in {badge["code"] for badge in badges_response.json()["data"]}
+
     assists_response = client.get(
         f"{settings.API_V1_STR}/referrals/me/assists?window=7d",
         headers=normal_user_token_headers,
@@ -0,0 +1,147 @@
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlmodel import Session, col, func, select
+
+from app import partitions
+from app.core.config import settings
+from app.core.db import engine
+from app.models import (
+    ActionTemplate,
+    ActionType,
+    Campaign,
+    CampaignCreate,
+    CampaignStatus,
+    OfficeType,
+    RepresentativeTarget,
+    UserActionLog,
+)
+from tests.utils.user import authentication_token_from_email
+from tests.utils.utils import random_email
+
+
+@contextmanager
+def _captured_log_statements() -> Iterator[list[tuple[str, Any]]]:
+    statements: list[tuple[str, Any]] = []
+
+    def record(
+        _conn: Any, _cursor: Any, statement: str, parameters: Any, *_: Any
+    ) -> None:
+        if "useractionlog" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _plan(statement: str, parameters: Any) -> str:
+    # The seeded tables are tiny, so a sequential scan is always cheapest;
+    # with it priced out, one only remains when no index can serve the query.
+    with engine.connect() as connection:
+        connection.execute(text("SET LOCAL enable_seqscan = off"))
+        rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        return "\n".join(row[0] for row in rows)
+
+
+def test_hot_action_log_reads_use_indexes(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    campaign = Campaign.model_validate(
+        CampaignCreate(
+            slug=f"plans-{uuid.uuid4().hex[:8]}",
+            title="Query Plan Campaign",
+            description="Campaign used to check query plans",
+            policy_topic="test",
+            status=CampaignStatus.ACTIVE,
+        )
+    )
+    db.add(campaign)
+    db.commit()
+    target = RepresentativeTarget(
+        campaign_id=campaign.id,
+        office_type=OfficeType.HOUSE,
+        office_name="Query Plan Target",
+    )
+    db.add(target)
+    db.commit()
+    template = ActionTemplate(
+        campaign_id=campaign.id,
+        target_id=target.id,
+        action_type=ActionType.CALL,
+        title="Call",
+        script_text="Please support this issue.",
+        estimated_minutes=2,
+    )
+    db.add(template)
+    db.commit()
+    headers = authentication_token_from_email(
+        client=client, email=random_email(), db=db
+    )
+    item = {
+        "campaign_id": str(campaign.id),
+        "target_id": str(target.id),
+        "template_id": str(template.id),
+        "action_type": "call",
+        "status": "completed",
+        "outcome": "answered",
+    }
+    client.post(
+        f"{settings.API_V1_STR}/actions/log:batch",
+        headers=headers,
+        json={"data": [item] * 20},
+    )
+    db.execute(text("ANALYZE useractionlog"))
+    db.commit()
+
+    api = settings.API_V1_STR
+    with _captured_log_statements() as statements:
+        page = client.get(f"{api}/actions/me?limit=5", headers=headers).json()
+        user_urls = [
+            f"{api}/actions/me?cursor={page['next_cursor']}",
+            f"{api}/actions/me/stats?window=7d",
+            f"{api}/impact/campaign/{campaign.id}?window=7d",
+            f"{api}/impact/campaign/{campaign.id}/series",
+            f"{api}/impact/campaign/{campaign.id}/outcomes",
+            f"{api}/impact/representative/{target.id}?window=7d",
+            f"{api}/impact/representative/{target.id}/series",
+            f"{api}/impact/representative/{target.id}/outcomes",
+        ]
+        for url in user_urls:
+            assert client.get(url, headers=headers).status_code == 200
+        export = client.get(
+            f"{api}/exports/campaign/{campaign.id}/actions.ndjson",
+            headers=superuser_token_headers,
+        )
+        assert export.status_code == 200
+
+    assert statements
+    for statement, parameters in statements:
+        plan = _plan(statement, parameters)
+        assert "Seq Scan on useractionlog" not in plan, f"{statement}\n{plan}"
+
+
+def test_windowed_action_log_reads_skip_older_partitions(db: Session) -> None:
+    # Creating a partition locks the parent table, so end the open reads.
+    db.commit()
+    partitions.ensure(db, months_ahead=3)
+    month = partitions.add_months(partitions.month_start(datetime.now(timezone.utc)), 2)
+    statement = (
+        select(func.count())
+        .select_from(UserActionLog)
+        .where(col(UserActionLog.created_at) >= month)
+        .compile(engine)
+    )
+
+    plan = _plan(str(statement), statement.params)
+
+    assert partitions.partition_name(month) in plan
+    assert partitions.partition_name(partitions.add_months(month, -1)) not in plan
+    assert "useractionlog_legacy" not in plan
@@ -8,16 +8,23 @@ from app.core.config import settings
 from app.core.db import engine, init_db
 from app.main import app
 from app.models import (
+    ActionLogIdempotencyKey,
     ActionTemplate,
     Campaign,
     DailyActionPlan,
+    ImpactDailyRollup,
+    ImpactDailySketch,
     Item,
+    LeaderboardEntry,
     Referral,
     RepresentativeTarget,
+    TargetCallWindow,
     User,
     UserActionLog,
+    UserBadge,
     UserPrivacySettings,
     UserProfile,
+    UserStreak,
 )
 from tests.utils.user import authentication_token_from_email
 from tests.utils.utils import get_superuser_token_headers
@@ -30,8 +37,22 @@ def db() -> Generator[Session, None, None]:
         yield session
         statement = delete(Item)
         session.execute(statement)
+        statement = delete(ActionLogIdempotencyKey)
+        session.execute(statement)
         statement = delete(UserActionLog)
         session.execute(statement)
+        statement = delete(ImpactDailyRollup)
+        session.execute(statement)
+        statement = delete(ImpactDailySketch)
+        session.execute(statement)
+        statement = delete(LeaderboardEntry)
+        session.execute(statement)
+        statement = delete(UserStreak)
+        session.execute(statement)
+        statement = delete(UserBadge)
+        session.execute(statement)
+        statement = delete(TargetCallWindow)
+        session.execute(statement)
         statement = delete(DailyActionPlan)
         session.execute(statement)
         statement = delete(UserPrivacySettings)
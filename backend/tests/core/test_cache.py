@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from app.core.cache import SingleFlightCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl() -> None:
+    clock = FakeClock()
+    cache: SingleFlightCache[int] = SingleFlightCache(
+        ttl_seconds=10, max_entries=8, clock=clock
+    )
+    calls = []
+
+    def compute() -> int:
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute("key", compute) == 1
+    clock.now = 9.9
+    assert cache.get_or_compute("key", compute) == 1
+    clock.now = 10.0
+    assert cache.get_or_compute("key", compute) == 2
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 2, 1)
+
+
+def test_least_recently_used_entries_are_evicted() -> None:
+    cache: SingleFlightCache[str] = SingleFlightCache(ttl_seconds=60, max_entries=2)
+    cache.get_or_compute("a", lambda: "a")
+    cache.get_or_compute("b", lambda: "b")
+    cache.get_or_compute("a", lambda: "stale")
+    cache.get_or_compute("c", lambda: "c")
+
+    assert cache.get_or_compute("a", lambda: "recomputed") == "a"
+    assert cache.get_or_compute("b", lambda: "recomputed") == "recomputed"
+    assert cache.stats().evictions == 2
+
+
+def test_concurrent_misses_share_one_computation() -> None:
+    cache: SingleFlightCache[int] = SingleFlightCache(ttl_seconds=60, max_entries=8)
+    started = threading.Event()
+    calls = []
+
+    def compute() -> int:
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return 42
+
+    results: list[int] = []
+    leader = threading.Thread(
+        target=lambda: results.append(cache.get_or_compute("key", compute))
+    )
+    leader.start()
+    started.wait()
+    followers = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_compute("key", compute))
+        )
+        for _ in range(8)
+    ]
+    for thread in followers:
+        thread.start()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert results == [42] * 9
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats.misses == 1
+    assert stats.hits + stats.coalesced == 8
+
+
+def test_errors_are_not_cached() -> None:
+    cache: SingleFlightCache[int] = SingleFlightCache(ttl_seconds=60, max_entries=8)
+
+    def fail() -> int:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("key", fail)
+    assert cache.get_or_compute("key", lambda: 7) == 7
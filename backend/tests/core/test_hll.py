@@ -0,0 +1,37 @@
+import uuid
+
+import pytest
+
+from app.core.hll import REGISTER_COUNT, STANDARD_ERROR, HyperLogLog
+
+
+def test_estimate_is_within_error_bound() -> None:
+    values = [uuid.uuid4() for _ in range(20_000)]
+    sketch = HyperLogLog.from_values(values)
+    assert abs(sketch.estimate() - len(values)) <= 4 * STANDARD_ERROR * len(values)
+
+
+def test_small_counts_use_linear_counting() -> None:
+    values = [uuid.uuid4() for _ in range(50)]
+    sketch = HyperLogLog.from_values(values + values)
+    assert abs(sketch.estimate() - 50) <= 2
+
+
+def test_merge_matches_union_and_round_trips_bytes() -> None:
+    shared = [uuid.uuid4() for _ in range(300)]
+    first = HyperLogLog.from_values(shared + [uuid.uuid4() for _ in range(700)])
+    second = HyperLogLog.from_values(shared + [uuid.uuid4() for _ in range(700)])
+    union = HyperLogLog.from_values(shared)
+
+    merged = HyperLogLog(first.to_bytes())
+    merged.merge(second.to_bytes())
+    assert len(merged.to_bytes()) == REGISTER_COUNT
+    assert abs(merged.estimate() - 1700) <= 4 * STANDARD_ERROR * 1700
+
+    union.merge(merged.to_bytes())
+    assert union.to_bytes() == merged.to_bytes()
+
+
+def test_rejects_wrong_register_count() -> None:
+    with pytest.raises(ValueError):
+        HyperLogLog(b"\x00" * 10)
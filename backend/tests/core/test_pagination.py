@@ -0,0 +1,67 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlmodel import Session, col, select, update
+
+from app.core.pagination import (
+    NO_CREATED_AT,
+    Cursor,
+    decode_cursor,
+    encode_cursor,
+    keyset_page,
+)
+from app.models import Item
+from tests.utils.user import create_random_user
+
+
+def test_cursor_round_trips() -> None:
+    cursor = Cursor(
+        datetime(2026, 3, 1, 12, 30, 15, 123456, timezone.utc), uuid.uuid4()
+    )
+    encoded = encode_cursor(cursor)
+    assert "=" not in encoded
+    assert decode_cursor(encoded) == cursor
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "not-a-cursor",
+        encode_cursor(Cursor(datetime(2026, 3, 1), uuid.uuid4())),
+        "MjAyNi0wMy0wMVQwMDowMDowMCswMDowMHxub3QtYS11dWlk",
+    ],
+)
+def test_invalid_cursors_are_rejected(value: str) -> None:
+    with pytest.raises(ValueError):
+        decode_cursor(value)
+
+
+def test_rows_without_created_at_page_last_and_once(db: Session) -> None:
+    owner = create_random_user(db)
+    dated = Item(title="dated", owner_id=owner.id)
+    undated = [Item(title=f"undated {index}", owner_id=owner.id) for index in range(3)]
+    db.add_all([dated, *undated])
+    db.commit()
+    # Rows from before `created_at` was added have none.
+    db.execute(
+        update(Item)
+        .where(col(Item.id).in_([item.id for item in undated]))
+        .values(created_at=None)
+    )
+    db.commit()
+
+    statement = select(Item).where(Item.owner_id == owner.id)
+    seen: list[Item] = []
+    after = None
+    while True:
+        rows, next_cursor = keyset_page(db, statement, Item, limit=2, after=after)
+        seen += rows
+        if next_cursor is None:
+            break
+        after = decode_cursor(next_cursor)
+        if seen[-1].created_at is None:
+            assert after.created_at == NO_CREATED_AT
+
+    assert seen[0].id == dated.id
+    assert sorted(item.id for item in seen[1:]) == sorted(item.id for item in undated)
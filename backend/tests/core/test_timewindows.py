@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.timewindows import WindowAlign, align_floor, time_window, window_start
+
+
+def test_windows_within_a_bucket_share_a_start() -> None:
+    first = time_window("7d", now=datetime(2026, 3, 10, 0, 5, tzinfo=timezone.utc))
+    second = time_window("7d", now=datetime(2026, 3, 10, 23, 55, tzinfo=timezone.utc))
+    assert first == second
+    assert first.days == 7
+    assert first.start == datetime(2026, 3, 3, tzinfo=timezone.utc)
+
+
+def test_hour_aligned_window() -> None:
+    now = datetime(2026, 3, 10, 14, 42, 7, tzinfo=timezone.utc)
+    assert window_start(1, align=WindowAlign.HOUR, now=now) == datetime(
+        2026, 3, 9, 14, tzinfo=timezone.utc
+    )
+
+
+def test_day_aligned_window_uses_local_midnight_across_dst() -> None:
+    # 2026-03-08 is the US spring-forward date.
+    now = datetime(2026, 3, 10, 3, 0, tzinfo=timezone.utc)
+    start = window_start(7, timezone_name="America/Chicago", now=now)
+    assert start == datetime(2026, 3, 2, 6, 0, tzinfo=timezone.utc)
+    assert align_floor(now, WindowAlign.DAY, "America/Chicago") == datetime(
+        2026, 3, 9, 5, 0, tzinfo=timezone.utc
+    )
+
+
+def test_unknown_timezone_falls_back_to_utc() -> None:
+    now = datetime(2026, 3, 10, 3, 0, tzinfo=timezone.utc)
+    assert window_start(1, timezone_name="Not/AZone", now=now) == datetime(
+        2026, 3, 9, tzinfo=timezone.utc
+    )
+
+
+@pytest.mark.parametrize("value", ["7", "0d", "366d", "xd", "-1d"])
+def test_rejects_invalid_windows(value: str) -> None:
+    with pytest.raises(ValueError):
+        time_window(value)
@@ -0,0 +1,370 @@
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, col, func, select
+
+from app import badges, crud, streaks
+from app.core.db import engine
+from app.ingest import (
+    ActionLogWriter,
+    IngestQueueFull,
+    IngestReceipt,
+    IngestStopped,
+)
+from app.models import (
+    ActionLogStatus,
+    ActionType,
+    Campaign,
+    CampaignCreate,
+    CampaignStatus,
+    DailyActionPlan,
+    UserActionLog,
+    UserBadge,
+    UserProfile,
+    UserStreak,
+)
+from tests.utils.user import create_random_user
+
+
+def _create_campaign(db: Session) -> Campaign:
+    campaign = Campaign.model_validate(
+        CampaignCreate(
+            slug=f"streak-{uuid.uuid4().hex[:8]}",
+            title="Streak Campaign",
+            description="Campaign for streak tests",
+            policy_topic="test",
+            status=CampaignStatus.ACTIVE,
+        )
+    )
+    db.add(campaign)
+    db.commit()
+    db.refresh(campaign)
+    return campaign
+
+
+def _log_at(
+    db: Session,
+    *,
+    user_id: uuid.UUID,
+    campaign: Campaign,
+    created_at: datetime,
+    status: ActionLogStatus = ActionLogStatus.COMPLETED,
+    action_type: ActionType = ActionType.CALL,
+) -> None:
+    log = UserActionLog(
+        user_id=user_id,
+        campaign_id=campaign.id,
+        action_type=action_type,
+        status=status,
+        created_at=created_at,
+    )
+    db.add(log)
+    crud.record_action_logs(session=db, action_logs=[log])
+    db.commit()
+
+
+def _streaks(db: Session, user_id: uuid.UUID) -> dict[uuid.UUID | None, UserStreak]:
+    db.expire_all()
+    rows = db.exec(select(UserStreak).where(col(UserStreak.user_id) == user_id)).all()
+    return {row.campaign_id: row for row in rows}
+
+
+def test_streaks_use_local_days_and_skip_plan_off_days(db: Session) -> None:
+    user = create_random_user(db)
+    campaign = _create_campaign(db)
+    db.add(
+        UserProfile(
+            user_id=user.id,
+            username=f"streak_{uuid.uuid4().hex[:10]}",
+            timezone="America/Chicago",
+        )
+    )
+    db.add(
+        DailyActionPlan(
+            user_id=user.id, campaign_id=campaign.id, active_weekdays_mask="1111100"
+        )
+    )
+    db.commit()
+
+    # Thursday 21:00 and Friday 09:00 in Chicago share a UTC day but not a
+    # local one, and the weekend is off in the plan.
+    for created_at in [
+        datetime(2026, 3, 6, 3, tzinfo=timezone.utc),
+        datetime(2026, 3, 6, 15, tzinfo=timezone.utc),
+        datetime(2026, 3, 9, 15, tzinfo=timezone.utc),
+    ]:
+        _log_at(db, user_id=user.id, campaign=campaign, created_at=created_at)
+    _log_at(
+        db,
+        user_id=user.id,
+        campaign=campaign,
+        created_at=datetime(2026, 3, 10, 15, tzinfo=timezone.utc),
+        status=ActionLogStatus.SKIPPED,
+    )
+
+    rows = _streaks(db, user.id)
+    assert set(rows) == {None, campaign.id}
+    for row in rows.values():
+        assert (row.current_streak, row.longest_streak) == (3, 3)
+        assert str(row.last_active_day) == "2026-03-09"
+
+    # Tuesday was an active day without a completed action.
+    _log_at(
+        db,
+        user_id=user.id,
+        campaign=campaign,
+        created_at=datetime(2026, 3, 11, 15, tzinfo=timezone.utc),
+    )
+    rows = _streaks(db, user.id)
+    assert (rows[campaign.id].current_streak, rows[campaign.id].longest_streak) == (
+        1,
+        3,
+    )
+
+    incremental = {
+        key: (row.current_streak, row.longest_streak, row.last_active_day)
+        for key, row in rows.items()
+    }
+    streaks.backfill(db, user_ids=[user.id])
+    rebuilt = _streaks(db, user.id)
+    assert {
+        key: (row.current_streak, row.longest_streak, row.last_active_day)
+        for key, row in rebuilt.items()
+    } == incremental
+
+
+def test_read_streaks_reports_broken_streak_as_zero(db: Session) -> None:
+    user = create_random_user(db)
+    campaign = _create_campaign(db)
+    _log_at(
+        db,
+        user_id=user.id,
+        campaign=campaign,
+        created_at=datetime(2026, 1, 5, 12, tzinfo=timezone.utc),
+    )
+
+    user_streaks = streaks.read_streaks(db, user.id)
+    assert [streak.campaign_id for streak in user_streaks] == [None, campaign.id]
+    assert all(streak.current_streak == 0 for streak in user_streaks)
+    assert all(streak.longest_streak == 1 for streak in user_streaks)
+
+
+def _badge_codes(db: Session, user_id: uuid.UUID) -> set[str]:
+    return set(db.exec(select(UserBadge.code).where(UserBadge.user_id == user_id)))
+
+
+def test_badges_are_awarded_by_the_rules_listening_to_each_write(db: Session) -> None:
+    user = create_random_user(db)
+    campaign = _create_campaign(db)
+    now = datetime.now(timezone.utc)
+
+    _log_at(
+        db,
+        user_id=user.id,
+        campaign=campaign,
+        created_at=now,
+        status=ActionLogStatus.SKIPPED,
+    )
+    assert _badge_codes(db, user.id) == set()
+
+    for _ in range(9):
+        _log_at(
+            db,
+            user_id=user.id,
+            campaign=campaign,
+            created_at=now,
+            action_type=ActionType.EMAIL,
+        )
+    assert _badge_codes(db, user.id) == {"first_action"}
+
+    _log_at(
+        db,
+        user_id=user.id,
+        campaign=campaign,
+        created_at=now,
+        action_type=ActionType.EMAIL,
+    )
+    _log_at(db, user_id=user.id, campaign=campaign, created_at=now)
+    assert _badge_codes(db, user.id) == {"first_action", "ten_emails", "first_call"}
+
+
+def test_seven_day_streak_badge_and_backfill(db: Session) -> None:
+    user = create_random_user(db)
+    campaign = _create_campaign(db)
+    start = datetime(2026, 2, 2, 12, tzinfo=timezone.utc)
+    for offset in range(7):
+        _log_at(
+            db,
+            user_id=user.id,
+            campaign=campaign,
+            created_at=start + timedelta(days=offset),
+            action_type=ActionType.BOYCOTT,
+        )
+    assert _badge_codes(db, user.id) == {"first_action", "seven_day_streak"}
+
+    for badge in db.exec(select(UserBadge).where(UserBadge.user_id == user.id)):
+        db.delete(badge)
+    db.commit()
+    assert badges.backfill(db, user_ids=[user.id]) == 2
+    assert _badge_codes(db, user.id) == {"first_action", "seven_day_streak"}
+
+
+def _writer(**kwargs: object) -> ActionLogWriter:
+    options: dict[str, object] = {
+        "session_factory": lambda: Session(engine),
+        "max_queue_rows": 100,
+        "flush_rows": 10,
+        "flush_interval_seconds": 0.005,
+    }
+    options.update(kwargs)
+    return ActionLogWriter(**options)  # type: ignore[arg-type]
+
+
+def _queued_log(user_id: uuid.UUID, campaign: Campaign) -> UserActionLog:
+    return UserActionLog(
+        user_id=user_id,
+        campaign_id=campaign.id,
+        action_type=ActionType.EMAIL,
+        status=ActionLogStatus.COMPLETED,
+    )
+
+
+def test_action_log_writer_flushes_batches_and_drains_on_stop(db: Session) -> None:
+    user = create_random_user(db)
+    campaign = _create_campaign(db)
+    writer = _writer()
+    writer.start()
+    receipts = [
+        writer.submit(_queued_log(user.id, campaign), timeout=1) for _ in range(25)
+    ]
+    writer.stop()
+
+    assert not writer.running
+    assert all(receipt.wait(0) for receipt in receipts)
+    stats = writer.stats()
+    assert stats.written == 25
+    assert stats.failed == 0
+    assert 3 <= stats.batches < 25
+    written = db.exec(
+        select(func.count())
+        .select_from(UserActionLog)
+        .where(col(UserActionLog.user_id) == user.id)
+    ).one()
+    assert written == 25
+    assert _streaks(db, user.id)[None].current_streak == 1
+
+
+def test_action_log_writer_pushes_back_when_full(db: Session) -> None:
+    user = create_random_user(db)
+    campaign = _create_campaign(db)
+    release = threading.Event()
+
+    def blocked_session() -> Session:
+        release.wait(5)
+        return Session(engine)
+
+    writer = _writer(session_factory=blocked_session, max_queue_rows=2, flush_rows=1)
+    writer.start()
+    receipts: list[IngestReceipt] = []
+    with pytest.raises(IngestQueueFull):
+        for _ in range(10):
+            receipts.append(writer.submit(_queued_log(user.id, campaign), timeout=0.05))
+    # One log held by the blocked flusher plus a full queue of two.
+    assert 2 <= len(receipts) <= 3
+
+    release.set()
+    writer.stop()
+    assert all(receipt.wait(0) for receipt in receipts)
+    with pytest.raises(RuntimeError):
+        writer.submit(_queued_log(user.id, campaign), timeout=0)
+
+
+def test_action_log_writer_only_drops_failing_rows(db: Session) -> None:
+    user = create_random_user(db)
+    campaign = _create_campaign(db)
+    writer = _writer()
+    writer.start()
+    good = writer.submit(_queued_log(user.id, campaign), timeout=1)
+    orphan = _queued_log(user.id, campaign)
+    orphan.campaign_id = uuid.uuid4()
+    bad = writer.submit(orphan, timeout=1)
+    writer.stop()
+
+    assert good.wait(0)
+    with pytest.raises(IntegrityError):
+        bad.wait(0)
+    assert writer.stats().written == 1
+    assert writer.stats().failed == 1
+
+
+def test_action_log_writer_writes_logs_submitted_while_stopping(db: Session) -> None:
+    user = create_random_user(db)
+    campaign = _create_campaign(db)
+    writer = _writer()
+    writer.start()
+    putting = threading.Event()
+    release = threading.Event()
+    put = writer._queue.put
+
+    def slow_put(receipt: IngestReceipt, timeout: float | None = None) -> None:
+        # Hold the submission between its running check and the put.
+        putting.set()
+        release.wait(5)
+        put(receipt, timeout=timeout)
+
+    writer._queue.put = slow_put  # type: ignore[method-assign]
+    receipts: list[IngestReceipt] = []
+    submitter = threading.Thread(
+        target=lambda: receipts.append(
+            writer.submit(_queued_log(user.id, campaign), timeout=1)
+        )
+    )
+    submitter.start()
+    assert putting.wait(5)
+    stopper = threading.Thread(target=writer.stop)
+    stopper.start()
+    stopper.join(0.1)
+    # The flusher is gone, but stop waits for the submission in flight.
+    assert stopper.is_alive()
+
+    release.set()
+    submitter.join(5)
+    stopper.join(5)
+    assert not stopper.is_alive()
+    [receipt] = receipts
+    assert receipt.wait(0)
+    assert writer.stats().written == 1
+
+
+def test_action_log_writer_fails_queued_logs_when_stop_times_out(
+    db: Session,
+) -> None:
+    user = create_random_user(db)
+    campaign = _create_campaign(db)
+    release = threading.Event()
+
+    def blocked_session() -> Session:
+        release.wait(5)
+        return Session(engine)
+
+    writer = _writer(session_factory=blocked_session, flush_rows=1)
+    writer.start()
+    receipts = [
+        writer.submit(_queued_log(user.id, campaign), timeout=1) for _ in range(3)
+    ]
+    writer.stop(timeout=0.1)
+
+    # The flusher holds one log; the rest are failed rather than left queued.
+    failed = [receipt for receipt in receipts if receipt.done.is_set()]
+    assert len(failed) == 2
+    for receipt in failed:
+        with pytest.raises(IngestStopped):
+            receipt.wait(0)
+    assert writer.stats().failed == 2
+    assert writer.stats().queued == 0
+
+    release.set()
+    assert [receipt for receipt in receipts if receipt not in failed][0].wait(5)
@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app import partitions
+
+
+def test_legacy_partition_has_a_single_primary_key_index(db: Session) -> None:
+    indexes = db.execute(
+        text(
+            """
+            SELECT index_class.relname, pg_index.indisprimary
+            FROM pg_index
+            JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid
+            WHERE pg_index.indrelid = to_regclass('useractionlog_legacy')
+              AND pg_get_indexdef(pg_index.indexrelid) LIKE '%(id, created_at)'
+            """
+        )
+    ).all()
+
+    assert indexes == [("useractionlog_legacy_pkey", True)]
+
+
+def test_only_partition_names_are_left_out_of_autogenerate() -> None:
+    month = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    for name in [
+        "useractionlog_legacy",
+        "useractionlog_default",
+        partitions.partition_name(month),
+    ]:
+        assert partitions.is_partition(name)
+    for name in [
+        "useractionlog",
+        "useractionlog_archive",
+        "useractionlog_y2026m03_backup",
+        "action_log_idempotency_key",
+    ]:
+        assert not partitions.is_partition(name)
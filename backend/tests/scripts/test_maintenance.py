@@ -0,0 +1,308 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlmodel import Session, col, func, select, update
+
+from app import crud, partitions, rollups, sketches
+from app.analytics import day_start
+from app.core.hll import STANDARD_ERROR
+from app.maintenance import main
+from app.models import (
+    ActionLogIdempotencyKey,
+    ActionLogStatus,
+    ActionType,
+    Campaign,
+    CampaignCreate,
+    CampaignStatus,
+    ImpactDailyRollup,
+    ImpactDailySketch,
+    LeaderboardEntry,
+    User,
+    UserActionLog,
+    UserActionLogCreate,
+    UserPrivacySettings,
+)
+from tests.utils.user import create_random_user
+
+
+def _create_campaign(db: Session) -> Campaign:
+    campaign = Campaign.model_validate(
+        CampaignCreate(
+            slug=f"rollup-{uuid.uuid4().hex[:8]}",
+            title="Rollup Campaign",
+            description="Campaign for rollup maintenance tests",
+            policy_topic="test",
+            status=CampaignStatus.ACTIVE,
+        )
+    )
+    db.add(campaign)
+    db.commit()
+    db.refresh(campaign)
+    return campaign
+
+
+def test_rollups_track_action_logs_and_backfill_repairs_drift(db: Session) -> None:
+    campaign = _create_campaign(db)
+    user = create_random_user(db)
+    for action_type in (ActionType.CALL, ActionType.CALL, ActionType.EMAIL):
+        crud.create_action_log(
+            session=db,
+            action_log_in=UserActionLogCreate(
+                campaign_id=campaign.id,
+                action_type=action_type,
+                status=ActionLogStatus.COMPLETED,
+            ),
+            user_id=user.id,
+        )
+
+    today = datetime.now(timezone.utc).date()
+    rows = db.exec(
+        select(ImpactDailyRollup).where(ImpactDailyRollup.campaign_id == campaign.id)
+    ).all()
+    counts = {row.action_type: row.action_count for row in rows}
+    assert counts == {ActionType.CALL: 2, ActionType.EMAIL: 1}
+    assert all(row.day == today for row in rows)
+    assert rollups.check_consistency(db, start_day=today, end_day=today) == []
+
+    drifted = next(row for row in rows if row.action_type == ActionType.CALL)
+    drifted.action_count += 5
+    db.add(drifted)
+    db.commit()
+    mismatches = rollups.check_consistency(db, start_day=today, end_day=today)
+    assert [(m.campaign_id, m.rollup_count, m.raw_count) for m in mismatches] == [
+        (campaign.id, 7, 2)
+    ]
+    assert main(["check-rollups", "--days", "1", "--lookback-days", "1"]) == 1
+
+    assert main(["backfill-rollups", "--days", "1"]) == 0
+    db.expire_all()
+    assert rollups.check_consistency(db, start_day=today, end_day=today) == []
+    assert main(["check-rollups", "--days", "1", "--lookback-days", "1"]) == 0
+    repaired = db.exec(
+        select(ImpactDailyRollup).where(
+            ImpactDailyRollup.campaign_id == campaign.id,
+            col(ImpactDailyRollup.action_type) == ActionType.CALL,
+        )
+    ).one()
+    assert repaired.action_count == 2
+
+
+def _log_for_new_users(db: Session, campaign: Campaign, count: int) -> None:
+    for _ in range(count):
+        user = User(email=f"{uuid.uuid4().hex}@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        crud.create_action_log(
+            session=db,
+            action_log_in=UserActionLogCreate(
+                campaign_id=campaign.id,
+                action_type=ActionType.EMAIL,
+                status=ActionLogStatus.COMPLETED,
+            ),
+            user_id=user.id,
+        )
+
+
+def test_sketches_are_exact_for_small_days(db: Session) -> None:
+    campaign = _create_campaign(db)
+    _log_for_new_users(db, campaign, 3)
+    start = day_start(datetime.now(timezone.utc).date())
+
+    assert sketches.unique_participants(db, start=start, campaign_id=campaign.id) == 3
+    sketch = db.exec(
+        select(ImpactDailySketch).where(
+            ImpactDailySketch.campaign_id == campaign.id,
+            col(ImpactDailySketch.target_id).is_(None),
+        )
+    ).one()
+    assert sketch.exact
+    assert len(sketch.members) == 3
+
+
+def test_sketches_fall_back_to_hyperloglog_and_backfill_matches(db: Session) -> None:
+    campaign = _create_campaign(db)
+    user_count = sketches.EXACT_MEMBER_LIMIT + 12
+    _log_for_new_users(db, campaign, user_count)
+    start = day_start(datetime.now(timezone.utc).date())
+
+    sketch = db.exec(
+        select(ImpactDailySketch).where(
+            ImpactDailySketch.campaign_id == campaign.id,
+            col(ImpactDailySketch.target_id).is_(None),
+        )
+    ).one()
+    assert not sketch.exact
+    assert sketch.members == []
+    registers = sketch.registers
+    estimate = sketches.unique_participants(db, start=start, campaign_id=campaign.id)
+    assert abs(estimate - user_count) <= 4 * STANDARD_ERROR * user_count
+
+    assert main(["backfill-sketches", "--days", "0"]) == 0
+    db.expire_all()
+    rebuilt = db.exec(
+        select(ImpactDailySketch).where(
+            ImpactDailySketch.campaign_id == campaign.id,
+            col(ImpactDailySketch.target_id).is_(None),
+        )
+    ).one()
+    assert rebuilt.registers == registers
+    assert (
+        sketches.unique_participants(db, start=start, campaign_id=campaign.id)
+        == estimate
+    )
+
+
+def test_platform_participants_merge_campaign_sketches(db: Session) -> None:
+    user = create_random_user(db)
+    for campaign in (_create_campaign(db), _create_campaign(db)):
+        crud.create_action_log(
+            session=db,
+            action_log_in=UserActionLogCreate(
+                campaign_id=campaign.id,
+                action_type=ActionType.EMAIL,
+                status=ActionLogStatus.COMPLETED,
+            ),
+            user_id=user.id,
+        )
+    start = day_start(datetime.now(timezone.utc).date())
+
+    day_sketches = db.exec(
+        select(ImpactDailySketch).where(ImpactDailySketch.day == start.date())
+    ).all()
+    assert all(sketch.campaign_id is not None for sketch in day_sketches)
+    participants = db.exec(
+        select(func.count(col(UserActionLog.user_id).distinct())).where(
+            col(UserActionLog.created_at) >= start
+        )
+    ).one()
+    estimate = sketches.unique_participants(db, start=start)
+    if all(sketch.exact for sketch in day_sketches):
+        assert estimate == participants
+    else:
+        assert abs(estimate - participants) <= 4 * STANDARD_ERROR * participants
+
+
+def test_rebuild_leaderboards_ranks_platform_and_campaign_boards(db: Session) -> None:
+    campaign = _create_campaign(db)
+    user = create_random_user(db)
+    db.add(UserPrivacySettings(user_id=user.id, show_on_leaderboard=True))
+    db.commit()
+    crud.create_action_log(
+        session=db,
+        action_log_in=UserActionLogCreate(
+            campaign_id=campaign.id,
+            action_type=ActionType.CALL,
+            status=ActionLogStatus.COMPLETED,
+        ),
+        user_id=user.id,
+    )
+
+    assert main(["rebuild-leaderboards"]) == 0
+    db.expire_all()
+    entries = db.exec(
+        select(LeaderboardEntry).where(LeaderboardEntry.user_id == user.id)
+    ).all()
+    assert {(entry.window_days, entry.campaign_id) for entry in entries} == {
+        (window_days, scope)
+        for window_days in (7, 30, 365)
+        for scope in (None, campaign.id)
+    }
+    campaign_entry = next(
+        entry for entry in entries if entry.campaign_id == campaign.id
+    )
+    assert (campaign_entry.rank, campaign_entry.score) == (1, 1)
+
+
+def test_expire_idempotency_keys_clears_keys_past_their_ttl(db: Session) -> None:
+    user = create_random_user(db)
+    campaign = _create_campaign(db)
+    keys = {}
+    # A log backdated past the TTL keeps its key until the key itself is old.
+    for name in ("fresh", "backdated", "stale"):
+        log = UserActionLog(
+            user_id=user.id,
+            campaign_id=campaign.id,
+            action_type=ActionType.EMAIL,
+            status=ActionLogStatus.COMPLETED,
+            idempotency_key=str(uuid.uuid4()),
+            created_at=datetime.now(timezone.utc)
+            - timedelta(hours=1 if name == "fresh" else 72),
+        )
+        crud.create_action_logs(session=db, action_logs=[log])
+        keys[name] = log.id
+    db.execute(
+        update(ActionLogIdempotencyKey)
+        .where(col(ActionLogIdempotencyKey.log_id) == keys["stale"])
+        .values(claimed_at=datetime.now(timezone.utc) - timedelta(hours=72))
+    )
+    db.commit()
+
+    assert main(["expire-idempotency-keys", "--ttl-hours", "48"]) == 0
+
+    claimed = db.exec(
+        select(ActionLogIdempotencyKey.log_id).where(
+            col(ActionLogIdempotencyKey.log_id).in_(keys.values())
+        )
+    ).all()
+    assert set(claimed) == {keys["fresh"], keys["backdated"]}
+
+
+def test_create_partitions_covers_the_coming_months(db: Session) -> None:
+    # Creating a partition locks the parent table, so end the open reads.
+    db.commit()
+    assert main(["create-partitions", "--months-ahead", "5"]) == 0
+
+    last_month = partitions.add_months(
+        partitions.month_start(datetime.now(timezone.utc)), 5
+    )
+    covered = partitions.partitions(db)
+    assert covered[0].start is None
+    assert covered[-1].end is not None and covered[-1].end > last_month
+    for earlier, later in zip(covered, covered[1:], strict=False):
+        assert earlier.end == later.start
+    assert partitions.ensure(db, months_ahead=5) == []
+
+
+def test_detach_partitions_leaves_old_months_as_tables(db: Session) -> None:
+    table = "scratch_log"
+    db.execute(
+        text(
+            f"CREATE TABLE {table} (id integer, created_at timestamptz NOT NULL) "
+            "PARTITION BY RANGE (created_at)"
+        )
+    )
+    db.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+    db.commit()
+    try:
+        january = datetime(2026, 1, 15, tzinfo=timezone.utc)
+        created = partitions.ensure(db, months_ahead=2, now=january, table=table)
+        assert created == [
+            "scratch_log_y2026m01",
+            "scratch_log_y2026m02",
+            "scratch_log_y2026m03",
+        ]
+        assert partitions.ensure(db, months_ahead=2, now=january, table=table) == []
+        db.execute(
+            text(
+                f"INSERT INTO {table} VALUES "
+                "(1, '2026-01-20T00:00:00Z'), (2, '2026-03-05T00:00:00Z')"
+            )
+        )
+        db.commit()
+
+        march = datetime(2026, 3, 10, tzinfo=timezone.utc)
+        detached = partitions.detach(db, older_than_months=1, now=march, table=table)
+
+        assert detached == ["scratch_log_y2026m01"]
+        assert [p.name for p in partitions.partitions(db, table=table)] == [
+            "scratch_log_y2026m02",
+            "scratch_log_y2026m03",
+        ]
+        assert db.execute(text(f"SELECT id FROM {table}")).scalars().all() == [2]
+        archived = db.execute(text("SELECT id FROM scratch_log_y2026m01"))
+        assert archived.scalars().all() == [1]
+    finally:
+        db.rollback()
+        db.execute(text(f"DROP TABLE IF EXISTS {table}, scratch_log_y2026m01"))
+        db.commit()